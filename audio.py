@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe ServiceAudio. Le service démarre le son du jeu (le module pygame,
+son mélangeur et la musique) dans un processus léger, pour que la fenêtre du jeu s'affiche sans attendre. Si
+pygame n'est pas installé, s'il n'y a pas de périphérique audio ou s'il manque un fichier, le jeu continue
+simplement sans son.
+
+Les effets sonores sont joués par le même processus léger, à partir d'une file de demandes, sur un nombre fixe
+de canaux alloués au démarrage. Le nombre de voix d'un même effet est limité: lorsqu'un clic en demande une de
+trop (ou que tous les canaux sont occupés), on abandonne la demande ou on vole le canal de la voix la plus
+ancienne, selon la politique choisie.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+import os
+import threading
+from queue import Queue, Full, Empty
+
+# Nombre de canaux du mélangeur réservés aux effets sonores
+NOMBRE_CANAUX = 8
+
+# Nombre maximal de voix simultanées d'un même effet sonore
+VOIX_MAX_PAR_EFFET = 2
+
+# Nombre maximal de demandes en attente dans la file (les suivantes sont abandonnées)
+TAILLE_FILE = 32
+
+# Politiques lorsqu'un effet n'a plus de canal: abandonner la demande, ou voler le canal de la voix la plus ancienne
+ABANDONNER = 'abandonner'
+VOLER = 'voler'
+
+
+class CanalFactice:
+    """
+    Canal du mode factice (sans périphérique audio, par exemple pour les tests), qui offre les mêmes méthodes
+    qu'un canal de pygame.mixer: il est occupé du moment où on y joue un son jusqu'à ce qu'on l'arrête.
+
+    Attributes:
+        son (object): Le son en cours (ou None)
+    """
+
+    def __init__(self):
+        """
+        Initialisation d'un canal libre.
+        """
+        self.son = None
+
+    def play(self, son):
+        """
+        Joue un son sur le canal.
+
+        Args:
+            son (object): Le son
+        """
+        self.son = son
+
+    def stop(self):
+        """
+        Arrête le son en cours.
+        """
+        self.son = None
+
+    def get_busy(self):
+        """
+        Vérifie si un son est en cours sur le canal.
+
+        Returns:
+            bool: True si le canal est occupé, False autrement
+        """
+        return self.son is not None
+
+
+class ServiceAudio:
+    """
+    Service qui joue la musique et les effets sonores du jeu. Les effets sont demandés par jouer(), qui ne fait
+    qu'ajouter la demande à une file: le jeu n'attend jamais après le son. Tant que le son n'est pas prêt (ou
+    s'il n'est pas disponible), les demandes sont abandonnées.
+
+    Attributes:
+        ressources (RegistreRessources): Le registre qui charge les sons
+        musique (str): Le chemin du fichier de la musique du jeu (ou None)
+        effets (tuple): Les chemins des effets sonores à charger d'avance
+        nombre_canaux (int): Nombre de canaux réservés aux effets sonores
+        voix_max (int): Nombre maximal de voix simultanées d'un même effet
+        politique (str): ABANDONNER ou VOLER, lorsqu'un effet n'a plus de canal
+        factice (bool): True pour le mode factice, sans pygame ni périphérique audio (les canaux sont des
+                        CanalFactice)
+        pret (Event): Signalé lorsque le démarrage est terminé (avec ou sans son)
+        disponible (bool): True si le son a démarré correctement
+        erreur (Exception): L'erreur qui a empêché le son de démarrer (ou None)
+        mixer (module): Le module pygame.mixer, une fois le son démarré (None en mode factice)
+        canaux (list): Les canaux des effets sonores, alloués au démarrage
+        effets_canaux (list): L'effet joué en dernier sur chacun des canaux
+        debuts (list): Numéro d'ordre du dernier effet joué sur chacun des canaux (pour trouver le plus ancien)
+        demandes (Queue): Les effets à jouer (None pour arrêter le processus léger)
+        statistiques (dict): Nombre d'effets joués, abandonnés, joués en volant un canal, et qui ont échoué
+                             (erreur du mélangeur)
+        verrou (Lock): Protège les statistiques, modifiées par la fenêtre et par le processus léger
+        processus_leger (Thread): Le processus léger qui démarre le son et joue les effets
+    """
+
+    def __init__(self, ressources, musique=None, effets=(), differe=True, nombre_canaux=NOMBRE_CANAUX,
+                 voix_max=VOIX_MAX_PAR_EFFET, politique=VOLER, factice=False):
+        """
+        Initialisation du service. Le son démarre dans un processus léger; si differe est False, on attend la
+        fin du démarrage avant de continuer.
+
+        Args:
+            ressources (RegistreRessources): Le registre qui charge les sons
+            musique (str): Le chemin du fichier de la musique, jouée en boucle (par défaut, aucune musique)
+            effets (iterable): Les chemins des effets sonores à charger d'avance
+            differe (bool): True pour démarrer le son en arrière-plan (par défaut), False pour l'attendre
+            nombre_canaux (int): Nombre de canaux réservés aux effets sonores (par défaut, NOMBRE_CANAUX)
+            voix_max (int): Nombre maximal de voix d'un même effet (par défaut, VOIX_MAX_PAR_EFFET)
+            politique (str): ABANDONNER ou VOLER (par défaut), lorsqu'un effet n'a plus de canal
+            factice (bool): True pour le mode factice, sans périphérique audio (par défaut, False)
+        """
+        self.ressources = ressources
+        self.musique = musique
+        self.effets = tuple(effets)
+        self.nombre_canaux = nombre_canaux
+        self.voix_max = voix_max
+        self.politique = politique
+        self.factice = factice
+        self.pret = threading.Event()
+        self.disponible = False
+        self.erreur = None
+        self.mixer = None
+        self.canaux = []
+        self.effets_canaux = [None] * nombre_canaux
+        self.debuts = [0] * nombre_canaux
+        self.demandes = Queue(TAILLE_FILE)
+        self.statistiques = {'joues': 0, 'abandonnes': 0, 'voles': 0, 'erreurs': 0}
+        self.verrou = threading.Lock()
+
+        self.processus_leger = threading.Thread(target=self.executer, name='service_audio', daemon=True)
+        self.processus_leger.start()
+        if not differe:
+            self.pret.wait()
+
+    def demarrer(self):
+        """
+        Importe pygame, démarre le mélangeur, alloue les canaux, charge les effets sonores et lance la musique.
+        En cas d'erreur, le service reste silencieux.
+        """
+        try:
+            if self.factice:
+                self.canaux = [CanalFactice() for _ in range(self.nombre_canaux)]
+
+            else:
+                import pygame
+
+                pygame.mixer.init()
+                pygame.mixer.set_num_channels(self.nombre_canaux)
+                self.canaux = [pygame.mixer.Channel(numero) for numero in range(self.nombre_canaux)]
+                for effet in self.effets:
+                    self.ressources.obtenir_son(effet)
+
+                if self.musique is not None and os.path.exists(self.musique):
+                    pygame.mixer.music.load(self.musique)
+                    pygame.mixer.music.play(-1)
+
+                self.mixer = pygame.mixer
+
+            self.disponible = True
+
+        except Exception as erreur:
+            self.erreur = erreur
+
+        finally:
+            self.pret.set()
+
+    def compter(self, statistique):
+        """
+        Incrémente une statistique (depuis la fenêtre ou le processus léger).
+
+        Args:
+            statistique (str): 'joues', 'abandonnes', 'voles' ou 'erreurs'
+        """
+        with self.verrou:
+            self.statistiques[statistique] += 1
+
+    def executer(self):
+        """
+        Boucle du processus léger: on démarre le son, puis on joue les effets demandés jusqu'à l'arrêt. Une
+        erreur en jouant un effet est comptée, sans arrêter le processus léger (la file continuerait sinon à se
+        remplir sans jamais être vidée).
+        """
+        self.demarrer()
+
+        while True:
+            chemin = self.demandes.get()
+            if chemin is None:
+                self.demandes.task_done()
+                return
+
+            if self.disponible:
+                try:
+                    self.jouer_effet(chemin)
+                except Exception:
+                    self.compter('erreurs')
+            else:
+                self.compter('abandonnes')
+            self.demandes.task_done()
+
+    def attendre(self, delai=None):
+        """
+        Attend la fin du démarrage du son.
+
+        Args:
+            delai (float): Nombre maximal de secondes à attendre (par défaut, aucune limite)
+
+        Returns:
+            bool: True si le son est disponible, False autrement
+        """
+        self.pret.wait(delai)
+        return self.disponible
+
+    def jouer(self, chemin):
+        """
+        Demande de jouer un effet sonore, sans attendre. La demande est abandonnée si le son n'est pas
+        disponible ou si la file est pleine.
+
+        Args:
+            chemin (str): Le chemin du fichier de l'effet sonore
+
+        Returns:
+            bool: True si la demande a été ajoutée à la file, False autrement
+        """
+        if not self.disponible:
+            self.compter('abandonnes')
+            return False
+
+        try:
+            self.demandes.put_nowait(chemin)
+        except Full:
+            self.compter('abandonnes')
+            return False
+        return True
+
+    def jouer_effet(self, chemin):
+        """
+        Joue un effet sonore sur un canal (dans le processus léger): un canal libre si l'effet n'a pas atteint
+        son nombre maximal de voix, sinon celui de sa voix la plus ancienne (politique VOLER). Si tous les
+        canaux sont occupés, on vole le canal de la voix la plus ancienne, tous effets confondus (politique
+        VOLER). Avec la politique ABANDONNER, l'effet n'est pas joué dans ces deux cas.
+
+        Args:
+            chemin (str): Le chemin du fichier de l'effet sonore
+        """
+        try:
+            son = chemin if self.factice else self.ressources.obtenir_son(chemin)
+        except Exception:
+            self.compter('abandonnes')
+            return
+
+        occupes = [numero for numero, canal in enumerate(self.canaux) if canal.get_busy()]
+        voix = [numero for numero in occupes if self.effets_canaux[numero] == chemin]
+        libres = [numero for numero in range(self.nombre_canaux) if numero not in occupes]
+
+        if len(voix) >= self.voix_max:
+            candidats = voix
+        elif libres:
+            candidats = None
+        else:
+            candidats = occupes
+
+        if candidats is None:
+            numero = libres[0]
+        elif self.politique == VOLER:
+            numero = min(candidats, key=self.debuts.__getitem__)
+            self.canaux[numero].stop()
+            self.compter('voles')
+        else:
+            self.compter('abandonnes')
+            return
+
+        self.canaux[numero].play(son)
+        self.effets_canaux[numero] = chemin
+        self.compter('joues')
+        self.debuts[numero] = self.statistiques['joues']
+
+    def fermer(self):
+        """
+        Arrête le processus léger, puis le son (le mélangeur de pygame), s'il avait démarré. On n'attend jamais
+        plus d'une seconde: si la file est pleine, les demandes en attente sont abandonnées pour faire place à
+        la demande d'arrêt.
+        """
+        disponible, self.disponible = self.disponible, False
+        while True:
+            try:
+                self.demandes.put_nowait(None)
+                break
+            except Full:
+                try:
+                    self.demandes.get_nowait()
+                    self.demandes.task_done()
+                    self.compter('abandonnes')
+                except Empty:
+                    pass
+        self.processus_leger.join(1)
+        if disponible and self.mixer is not None:
+            self.mixer.quit()
+
+
+#### Tests unitaires ###
+
+def test_son_absent():
+
+    class RegistreSansSon:
+        def obtenir_son(self, chemin):
+            raise FileNotFoundError(chemin)
+
+    # sans pygame (ou avec un son illisible), le service reste silencieux et jouer ne fait rien
+    service = ServiceAudio(RegistreSansSon(), musique='absente.mp3', effets=('absent.wav',))
+    service.attendre(5)
+    assert service.pret.is_set()
+    if not service.disponible:
+        assert service.erreur is not None
+        assert not service.jouer('absent.wav')
+    service.fermer()
+
+def test_voix_max():
+
+    # au plus deux voix du même effet: la troisième vole le canal de la plus ancienne, ou est abandonnée
+    for politique, joues, voles, abandonnes in ((VOLER, 3, 1, 0), (ABANDONNER, 2, 0, 1)):
+        service = ServiceAudio(None, nombre_canaux=4, voix_max=2, politique=politique, factice=True, differe=False)
+        for _ in range(3):
+            assert service.jouer('sword_blade.wav')
+        service.demandes.join()
+        assert service.statistiques == {'joues': joues, 'abandonnes': abandonnes, 'voles': voles, 'erreurs': 0}
+        assert [canal.son for canal in service.canaux].count('sword_blade.wav') == 2
+        service.fermer()
+
+def test_canaux_occupes():
+
+    # tous les canaux sont occupés: on vole le canal le plus ancien, et un canal libéré est réutilisé
+    service = ServiceAudio(None, nombre_canaux=2, voix_max=2, factice=True, differe=False)
+    for effet in ('a.wav', 'b.wav', 'c.wav'):
+        service.jouer(effet)
+    service.demandes.join()
+    assert [canal.son for canal in service.canaux] == ['c.wav', 'b.wav']
+    assert service.statistiques['voles'] == 1
+
+    service.canaux[1].stop()
+    service.jouer('d.wav')
+    service.demandes.join()
+    assert [canal.son for canal in service.canaux] == ['c.wav', 'd.wav']
+    assert service.statistiques == {'joues': 4, 'abandonnes': 0, 'voles': 1, 'erreurs': 0}
+
+    # une fois le service fermé, les demandes sont abandonnées
+    service.fermer()
+    assert not service.jouer('a.wav')
+
+def test_erreur_et_file_pleine():
+
+    class CanalDefectueux(CanalFactice):
+        def play(self, son):
+            raise RuntimeError('mélangeur en panne')
+
+    # une erreur du mélangeur est comptée, et le processus léger continue de vider la file
+    service = ServiceAudio(None, nombre_canaux=1, factice=True, differe=False)
+    service.canaux = [CanalDefectueux()]
+    for _ in range(3):
+        service.jouer('a.wav')
+    service.demandes.join()
+    assert service.statistiques['erreurs'] == 3 and service.processus_leger.is_alive()
+    service.fermer()
+    assert not service.processus_leger.is_alive()
+
+    # même si le processus léger est arrêté et que la file est pleine, fermer n'attend pas indéfiniment
+    service = ServiceAudio(None, factice=True, differe=False)
+    service.demandes.put(None)
+    service.processus_leger.join(1)
+    for _ in range(TAILLE_FILE):
+        service.demandes.put_nowait('a.wav')
+    service.fermer()
+    assert service.statistiques['abandonnes'] >= 1
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_son_absent()
+    test_voix_max()
+    test_canaux_occupes()
+    test_erreur_et_file_pleine()
+    print('Tests réussis!')
@@ -0,0 +1,696 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant les bancs d'essai (mesures de performance) du jeu de démineur. Chaque banc d'essai
+est une fonction qui affiche ses mesures à l'écran. On peut les lancer tous, ou seulement certains:
+
+    python banc_essai.py
+    python banc_essai.py memoire
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+from case import Case
+from tableau import Tableau
+from tableau_infini import TableauInfini
+from reserve_tableaux import ReserveTableaux
+from generation_lot import generer_lot
+from audio import ServiceAudio
+
+
+def mesurer_memoire(fonction, *args):
+    """
+    Mesure le temps d'exécution et la mémoire maximale allouée par un appel de fonction.
+
+    Args:
+        fonction (callable): La fonction à mesurer
+        *args: Les arguments passés à la fonction
+
+    Returns:
+        tuple: Le résultat de la fonction, la durée (s) et le pic de mémoire allouée (octets)
+    """
+    tracemalloc.start()
+    debut = perf_counter()
+    resultat = fonction(*args)
+    duree = perf_counter() - debut
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultat, duree, pic
+
+
+def generer_tableau(dimension_rangee, dimension_colonne, nombre_mines):
+    """
+    Crée un tableau et y place immédiatement les mines (sans attendre le premier dévoilement).
+
+    Args:
+        dimension_rangee (int): Nombre de rangées du tableau
+        dimension_colonne (int): Nombre de colonnes du tableau
+        nombre_mines (int): Nombre de mines du tableau
+
+    Returns:
+        Tableau: Le tableau généré
+    """
+    tableau = Tableau(dimension_rangee, dimension_colonne, nombre_mines)
+    tableau.initialiser_tableau()
+    return tableau
+
+
+def banc_premier_clic():
+    """
+    Compare le temps de création d'un tableau (avant que la partie soit jouable) au temps du premier clic,
+    qui place les mines.
+    """
+    print('Création paresseuse du tableau (10 % de mines)')
+    for cote in (20, 200, 2000):
+        debut = perf_counter()
+        tableau = Tableau(cote, cote, cote * cote // 10)
+        duree_creation = perf_counter() - debut
+        debut = perf_counter()
+        tableau.devoiler_case(cote // 2, cote // 2)
+        duree_clic = perf_counter() - debut
+        print(f'  {cote:>4} x {cote:<4}: création {duree_creation * 1e6:8.1f} us, premier clic {duree_clic * 1e3:8.1f} ms')
+
+
+def banc_reserve():
+    """
+    Compare le temps jusqu'au premier dévoilement d'une nouvelle partie (création et premier clic) avec et
+    sans la réserve de tableaux, et affiche le taux de succès de la réserve.
+    """
+    print('Réserve de tableaux (premier clic d\'une nouvelle partie)')
+    for prereglage in ((19, 19, 60), (200, 200, 8000)):
+        debut = perf_counter()
+        Tableau(*prereglage).devoiler_case(1, 1)
+        duree_sans_reserve = perf_counter() - debut
+
+        reserve = ReserveTableaux([prereglage])
+        reserve.attendre()
+        debut = perf_counter()
+        reserve.obtenir_tableau(*prereglage).devoiler_case(1, 1)
+        duree_avec_reserve = perf_counter() - debut
+        reserve.attendre()
+        taux_succes = reserve.taux_succes()
+        reserve.fermer()
+
+        print(f'  {prereglage}: sans réserve {duree_sans_reserve * 1e3:7.2f} ms, '
+              f'avec réserve {duree_avec_reserve * 1e3:7.2f} ms (taux de succès {taux_succes:.0%})')
+
+
+def banc_lot():
+    """
+    Mesure le débit de la génération par lots (tableaux par seconde) selon le nombre de processus, jusqu'au
+    nombre de processeurs, ainsi que la mémoire maximale du processus principal.
+    """
+    nombre_tableaux = 2000
+    print(f'Génération par lots ({nombre_tableaux} tableaux 30 x 16, 99 mines, {os.cpu_count()} processeurs)')
+    nombre_processus = 1
+    while True:
+        def consommer():
+            return sum(1 for _ in generer_lot(nombre_tableaux, 30, 16, 99, graine=1, nombre_processus=nombre_processus))
+
+        _, duree, pic = mesurer_memoire(consommer)
+        print(f'  {nombre_processus:>3} processus: {nombre_tableaux / duree:9,.0f} tableaux/s, {pic / 2**10:7.1f} Ko')
+        if nombre_processus >= (os.cpu_count() or 1):
+            break
+        nombre_processus = min(2 * nombre_processus, os.cpu_count())
+
+
+def banc_canevas():
+    """
+    Mesure le temps de création du canevas et la latence d'un clic (du dévoilement jusqu'à ce que Tk ait
+    repeint le canevas) sur des tableaux de plus en plus grands, en redessinant après chaque clic toute la
+    partie visible (redessiner) ou seulement les cases dévoilées (dessiner_cases), puis le temps d'affichage de
+    la solution et le nombre d'images chargées. Comme seule la partie visible est dessinée, ces temps ne
+    doivent presque pas dépendre de la taille du tableau. Nécessite un affichage.
+    """
+    from tkinter import Tk, TclError
+    from canevas_tableau import CanevasTableau
+    from ressources import RegistreRessources
+
+    try:
+        racine = Tk()
+    except TclError:
+        print('Canevas: aucun affichage disponible, banc d\'essai ignoré')
+        return
+
+    print('Canevas du tableau (clic jusqu\'au rafraîchissement, 10 % de mines)')
+    ressources = RegistreRessources(racine)
+    for cote in (20, 200, 1000):
+        for mode in ('redessiner', 'dessiner_cases'):
+            tableau = Tableau(cote, cote, cote * cote // 10, graine=1)
+            debut = perf_counter()
+            canevas = CanevasTableau(racine, tableau, ressources, width=800, height=560)
+            canevas.pack()
+            racine.update()
+            duree_creation = perf_counter() - debut
+
+            latences = []
+            for rangee_x in range(1, cote + 1, max(1, cote // 20)):
+                for colonne_y in range(1, cote + 1, max(1, cote // 20)):
+                    debut = perf_counter()
+                    cases_devoilees = tableau.devoiler_case(rangee_x, colonne_y)
+                    if cases_devoilees:
+                        if mode == 'redessiner':
+                            canevas.redessiner()
+                        else:
+                            canevas.dessiner_cases(cases_devoilees)
+                        racine.update_idletasks()
+                        latences.append(perf_counter() - debut)
+
+            latences.sort()
+            print(f'  {cote:>3} x {cote:<3} ({mode:>14}): création {duree_creation * 1e3:7.1f} ms, clic médian '
+                  f'{latences[len(latences) // 2] * 1e3:6.2f} ms, pire clic {latences[-1] * 1e3:6.2f} ms')
+
+            debut = perf_counter()
+            canevas.afficher_solution()
+            racine.update_idletasks()
+            duree_solution = perf_counter() - debut
+            canevas.destroy()
+
+        print(f'  {cote:>3} x {cote:<3}: solution ({tableau.nombre_mines} mines) {duree_solution * 1e3:7.1f} ms, '
+              f'{ressources.chargements} images chargées au total')
+
+    ressources.liberer()
+    racine.destroy()
+
+
+def banc_parties():
+    """
+    Enchaîne 1000 nouvelles parties de dimensions variées sur le même canevas, et suit le nombre d'éléments
+    graphiques, de widgets et la mémoire allouée: ils doivent rester bornés. Nécessite un affichage.
+    """
+    from random import Random
+    from tkinter import Tk, TclError
+    from canevas_tableau import CanevasTableau
+
+    try:
+        racine = Tk()
+    except TclError:
+        print('Parties consécutives: aucun affichage disponible, banc d\'essai ignoré')
+        return
+
+    print('1000 parties consécutives (de 3 x 3 à 30 x 30, un clic et la solution par partie)')
+    hasard = Random(1)
+    canevas = CanevasTableau(racine, Tableau(), width=800, height=560)
+    canevas.pack()
+    tracemalloc.start()
+    debut = perf_counter()
+    for partie in range(1, 1001):
+        rangees, colonnes = hasard.randint(3, 30), hasard.randint(3, 30)
+        tableau = Tableau(rangees, colonnes, rangees * colonnes // 6)
+        canevas.changer_tableau(tableau)
+        canevas.dessiner_cases(tableau.devoiler_case(1, 1))
+        canevas.afficher_solution()
+        racine.update_idletasks()
+
+        if partie % 250 == 0:
+            print(f'  {partie:>4} parties: {canevas.compter_elements():5} éléments, '
+                  f'{len(racine.winfo_children())} widget(s), {tracemalloc.get_traced_memory()[0] / 2**10:7.1f} Ko, '
+                  f'{(perf_counter() - debut) * 1e3 / partie:5.2f} ms/partie')
+    tracemalloc.stop()
+    racine.destroy()
+
+
+def banc_demarrage():
+    """
+    Mesure le démarrage à froid du jeu (comme principal.py, dans un nouveau processus): le temps jusqu'à ce que
+    la fenêtre soit affichée, avec le son démarré en arrière-plan ou en attendant le son. Nécessite un affichage.
+    """
+    import subprocess
+
+    script = ('from time import perf_counter\n'
+              'debut = perf_counter()\n'
+              'from interface_partie import InterfacePartie\n'
+              'fenetre = InterfacePartie(audio_differe={})\n'
+              'fenetre.update()\n'
+              'print(perf_counter() - debut)\n'
+              'fenetre.fermer()\n')
+
+    print('Démarrage à froid du jeu (jusqu\'à l\'affichage de la fenêtre)')
+    for audio_differe in (False, True):
+        resultat = subprocess.run([sys.executable, '-c', script.format(audio_differe)], capture_output=True,
+                                  text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if resultat.returncode != 0:
+            print(f'  échec du démarrage: {resultat.stderr.strip().splitlines()[-1]}')
+            return
+        mode = 'son en arrière-plan' if audio_differe else 'en attendant le son'
+        print(f'  {mode:>20}: {float(resultat.stdout.split()[0]) * 1e3:7.1f} ms')
+
+
+def banc_audio():
+    """
+    Simule des clics très rapides (10 000 demandes d'effets sonores) sur le service audio en mode factice:
+    mesure le temps d'une demande du point de vue du jeu, et compte les effets joués, volés et abandonnés.
+    """
+    print('Service audio (mode factice, 8 canaux, 2 voix par effet)')
+    for politique in ('voler', 'abandonner'):
+        service = ServiceAudio(None, politique=politique, factice=True, differe=False)
+        effets = ('sword_blade.wav', 'sword_blade.wav', 'sword_blade.wav', 'explosion.wav')
+        debut = perf_counter()
+        for numero in range(10000):
+            service.jouer(effets[numero % len(effets)])
+        duree = perf_counter() - debut
+        service.demandes.join()
+        print(f'  {politique:>10}: {duree * 1e6 / 10000:5.2f} us/demande, {service.statistiques}')
+        service.fermer()
+
+
+def banc_memoire():
+    """
+    Mesure la mémoire occupée par des tableaux de plus en plus grands, jusqu'à 10 000 x 10 000 cases.
+    """
+    print('Mémoire du tableau (1 % de mines)')
+    for cote in (100, 1000, 3000, 10000):
+        nombre_cases = cote * cote
+        tableau, duree, pic = mesurer_memoire(generer_tableau, cote, cote, nombre_cases // 100)
+        print(f'  {cote:>5} x {cote:<5}: {pic / 2**20:9.1f} Mo ({pic / nombre_cases:5.2f} octets/case) '
+              f'en {duree:6.2f} s')
+        del tableau
+
+
+def banc_case():
+    """
+    Mesure la mémoire occupée par une case (objet Case) lorsqu'on en crée un grand nombre.
+    """
+    nombre_cases = 100000
+    cases, duree, pic = mesurer_memoire(lambda: [Case() for _ in range(nombre_cases)])
+    print(f'Mémoire d\'un objet Case: {pic / nombre_cases:5.1f} octets/case (liste incluse)')
+    del cases
+
+
+def banc_cascade():
+    """
+    Mesure le débit du dévoilement en cascade (cases dévoilées par seconde) sur des tableaux sans mine
+    de 10^4 à 10^7 cases, où un seul clic dévoile tout le tableau.
+    """
+    print('Dévoilement en cascade (tableau sans mine)')
+    for rangees, colonnes in ((100, 100), (1000, 100), (1000, 1000), (10000, 1000)):
+        tableau = generer_tableau(rangees, colonnes, 0)
+        debut = perf_counter()
+        cases_devoilees = tableau.devoiler_case(1, 1)
+        duree = perf_counter() - debut
+        print(f'  {rangees * colonnes:>9} cases: {len(cases_devoilees) / duree:12,.0f} cases/s ({duree:6.2f} s)')
+        del tableau, cases_devoilees
+
+
+def banc_cascade_progressive():
+    """
+    Mesure la plus longue interruption de la boucle d'évènements lors d'un dévoilement en cascade de tout le
+    tableau (sans mine): d'un seul bloc (devoiler_case) ou par tranches (devoiler_par_tranches, puis
+    DevoilementProgressif). Sans affichage, seule la durée des tranches du tableau est mesurée.
+    """
+    from tkinter import Tk, TclError
+    from canevas_tableau import CanevasTableau
+    from devoilement_progressif import DevoilementProgressif
+
+    print('Dévoilement en cascade par tranches (tableau sans mine)')
+    for rangees, colonnes in ((1000, 100), (1000, 1000), (3000, 1000)):
+        tableau = generer_tableau(rangees, colonnes, 0)
+        debut = perf_counter()
+        tableau.devoiler_case(1, 1)
+        duree_bloc = perf_counter() - debut
+
+        tableau = generer_tableau(rangees, colonnes, 0)
+        durees = []
+        debut = perf_counter()
+        for _ in tableau.devoiler_par_tranches(1, 1):
+            durees.append(perf_counter() - debut)
+            debut = perf_counter()
+        print(f'  {rangees * colonnes:>8} cases: d\'un bloc {duree_bloc * 1e3:7.1f} ms, {len(durees):4} tranches, '
+              f'pire tranche {max(durees) * 1e3:5.2f} ms, total {sum(durees) * 1e3:7.1f} ms')
+        del tableau
+
+    try:
+        racine = Tk()
+    except TclError:
+        print('  Boucle d\'évènements: aucun affichage disponible, banc d\'essai ignoré')
+        return
+
+    # un battement planifié à chaque milliseconde mesure le plus long intervalle sans traitement d'évènements
+    for mode in ('bloc', 'tranches'):
+        tableau = generer_tableau(1000, 1000, 0)
+        canevas = CanevasTableau(racine, tableau, width=800, height=560)
+        canevas.pack()
+        racine.update()
+        devoilement = DevoilementProgressif(racine, canevas.dessiner_cases)
+        intervalles = []
+        dernier_battement = [perf_counter()]
+        clic_fait = []
+
+        def battement():
+            maintenant = perf_counter()
+            intervalles.append(maintenant - dernier_battement[0])
+            dernier_battement[0] = maintenant
+            if devoilement.en_cours or not clic_fait:
+                racine.after(1, battement)
+            else:
+                racine.quit()
+
+        def cliquer():
+            if mode == 'bloc':
+                canevas.dessiner_cases(tableau.devoiler_case(1, 1))
+            else:
+                tranches = tableau.devoiler_par_tranches(1, 1)
+                canevas.dessiner_cases(next(tranches))
+                devoilement.ajouter(tranches)
+            clic_fait.append(True)
+
+        debut = perf_counter()
+        racine.after(1, battement)
+        racine.after(5, cliquer)
+        racine.mainloop()
+        print(f'  1000000 cases ({mode:>8}): plus long intervalle entre deux battements '
+              f'{max(intervalles) * 1e3:7.1f} ms, dévoilement complet {(perf_counter() - debut) * 1e3:7.1f} ms')
+        canevas.destroy()
+
+    racine.destroy()
+
+
+def banc_evenements():
+    """
+    Mesure le coût des évènements du tableau: un dévoilement en cascade de tout le tableau (sans mine) et
+    10 000 drapeaux, sans abonné puis avec un abonné. Comme les évènements d'une action sont publiés ensemble,
+    l'abonné n'est appelé qu'une fois par tranche de cascade et par drapeau.
+    """
+    from evenements import BusEvenements
+
+    print('Évènements du tableau (1000 x 1000, sans mine)')
+    for abonne in (False, True):
+        actions = []
+        bus = BusEvenements()
+        if abonne:
+            bus.abonner(actions.append)
+
+        tableau = generer_tableau(1000, 1000, 0)
+        tableau.evenements = bus
+        debut = perf_counter()
+        for _ in tableau.devoiler_par_tranches(1, 1):
+            pass
+        duree_cascade = perf_counter() - debut
+
+        tableau = generer_tableau(100, 100, 0)
+        tableau.evenements = bus
+        debut = perf_counter()
+        for rangee_x in range(1, 101):
+            for colonne_y in range(1, 101):
+                tableau.basculer_drapeau(rangee_x, colonne_y)
+        duree_drapeaux = perf_counter() - debut
+
+        mode = 'avec abonné' if abonne else 'sans abonné'
+        print(f'  {mode:>11}: cascade {duree_cascade * 1e3:7.1f} ms, 10 000 drapeaux {duree_drapeaux * 1e3:6.1f} ms, '
+              f'{len(actions)} appels de l\'abonné')
+
+
+def banc_sauvegarde():
+    """
+    Compare la taille et le temps de chargement des sauvegardes binaires (voir le module sauvegarde) à ceux de
+    l'ancien format en texte (importé avec importer_partie_texte), sur des tableaux de plus en plus grands
+    (15 % de mines, une cascade dévoilée). L'ancien format n'est mesuré que jusqu'à 10^5 cases.
+    """
+    from sauvegarde import encoder_partie, decoder_partie, exporter_partie_texte, importer_partie_texte
+
+    print('Sauvegarde de la partie (binaire contre ancien format en texte)')
+    for cote in (100, 300, 1000, 3000):
+        tableau = generer_tableau(cote, cote, cote * cote * 15 // 100)
+        tableau.devoiler_case(cote // 2, cote // 2)
+
+        debut = perf_counter()
+        donnees = encoder_partie(tableau, 10, 100)
+        duree_ecriture = perf_counter() - debut
+        debut = perf_counter()
+        decoder_partie(donnees)
+        duree_lecture = perf_counter() - debut
+        print(f'  {cote * cote:>8} cases,   binaire: {len(donnees) / 2**10:10,.1f} Ko, écriture '
+              f'{duree_ecriture * 1e3:8.1f} ms, chargement {duree_lecture * 1e3:8.1f} ms')
+
+        if cote <= 300:
+            debut = perf_counter()
+            texte = exporter_partie_texte(tableau, 10, 100)
+            duree_ecriture = perf_counter() - debut
+            debut = perf_counter()
+            importer_partie_texte(texte)
+            duree_lecture = perf_counter() - debut
+            print(f'  {cote * cote:>8} cases, ancien format: {len(texte) / 2**10:10,.1f} Ko, écriture '
+                  f'{duree_ecriture * 1e3:8.1f} ms, chargement {duree_lecture * 1e3:8.1f} ms')
+            del texte
+
+
+def banc_chargement():
+    """
+    Compare deux façons de rétablir le tableau d'une partie sauvegardée (15 % de mines, une cascade dévoilée):
+    l'ancienne, qui crée un tableau puis rétablit ses cases une à une (comme l'ancien retablir_sauvegarde), et
+    Tableau.depuis_etat, qui construit la grille d'un seul coup à partir des plans des cases. L'ancienne façon
+    n'est mesurée que jusqu'à 10^5 cases.
+    """
+    print('Rétablissement d\'un tableau sauvegardé (case par case contre Tableau.depuis_etat)')
+    for cote in (100, 300, 1000, 3000):
+        tableau = generer_tableau(cote, cote, cote * cote * 15 // 100)
+        tableau.devoiler_case(cote // 2, cote // 2)
+        nombre_mines = tableau.nombre_mines
+        cases = [(coordonnees, case.est_minee, case.est_devoilee, case.nombre_mines_voisines)
+                 for coordonnees, case in tableau.dictionnaire_cases.items()]
+        mines = bytes(est_minee for _, est_minee, _, _ in cases)
+        devoilees = bytes(est_devoilee for _, _, est_devoilee, _ in cases)
+
+        if cote <= 300:
+            debut = perf_counter()
+            tableau_case_par_case = Tableau(cote, cote, nombre_mines)
+            tableau_case_par_case.mines_placees = True
+            for coordonnees, est_minee, est_devoilee, nombre_mines_voisines in cases:
+                case = tableau_case_par_case.dictionnaire_cases[coordonnees]
+                case.est_minee = est_minee
+                case.est_devoilee = est_devoilee
+                case.nombre_mines_voisines = nombre_mines_voisines
+            duree = perf_counter() - debut
+            assert tableau_case_par_case.grille == tableau.grille
+            print(f'  {cote * cote:>8} cases, case par case: {duree * 1e3:8.1f} ms')
+
+        debut = perf_counter()
+        tableau_etat = Tableau.depuis_etat(cote, cote, nombre_mines, tableau.graine, mines=mines, devoilees=devoilees)
+        duree = perf_counter() - debut
+        assert tableau_etat.grille == tableau.grille
+        assert tableau_etat.nombre_cases_sans_mine_a_devoiler == tableau.nombre_cases_sans_mine_a_devoiler
+        print(f'  {cote * cote:>8} cases,  depuis_etat: {duree * 1e3:8.1f} ms')
+        del cases
+
+
+def banc_projection():
+    """
+    Compare l'ouverture d'une partie sauvegardée dans le format projetable, projetée en mémoire (PartieProjetee)
+    ou lue et copiée (charger_partie), selon la taille du tableau: temps d'ouverture jusqu'à la lecture d'une
+    fenêtre de 25 x 35 cases, et mémoire résidente ajoutée (Linux seulement). Avec la projection, ni l'un ni
+    l'autre ne doit dépendre de la taille du tableau. Chaque ouverture se fait dans un nouveau processus.
+    """
+    import subprocess
+    from tempfile import TemporaryDirectory
+    from sauvegarde import enregistrer_partie_projetable
+
+    script = ('import os, sys\n'
+              'from time import perf_counter\n'
+              'from sauvegarde import charger_partie, PartieProjetee\n'
+              'def memoire():\n'
+              '    with open("/proc/self/statm") as statm:\n'
+              '        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")\n'
+              'avant = memoire()\n'
+              'debut = perf_counter()\n'
+              'tableau = PartieProjetee(sys.argv[1]).tableau if sys.argv[2] == "projection" else '
+              'charger_partie(sys.argv[1])[0]\n'
+              'grille, largeur = tableau.grille, tableau.largeur\n'
+              'sum(grille[x * largeur + y] for x in range(1, 26) for y in range(1, 36))\n'
+              'print(perf_counter() - debut, memoire() - avant)\n')
+
+    print('Ouverture d\'une partie sauvegardée (format projetable)')
+    with TemporaryDirectory() as dossier:
+        for cote in (1000, 3000, 6000):
+            chemin = os.path.join(dossier, f'partie_{cote}.dmn')
+            tableau = generer_tableau(cote, cote, cote * cote * 15 // 100)
+            tableau.devoiler_case(cote // 2, cote // 2)
+            enregistrer_partie_projetable(chemin, tableau)
+            del tableau
+
+            for mode in ('projection', 'lecture'):
+                resultat = subprocess.run([sys.executable, '-c', script, chemin, mode], capture_output=True, text=True,
+                                          cwd=os.path.dirname(os.path.abspath(__file__)))
+                if resultat.returncode != 0:
+                    print(f'  échec de l\'ouverture: {resultat.stderr.strip().splitlines()[-1]}')
+                    return
+                duree, memoire = resultat.stdout.split()
+                print(f'  {cote * cote:>8} cases ({mode:>10}): {float(duree) * 1e3:8.2f} ms, '
+                      f'{int(memoire) / 2**20:7.1f} Mo résidents de plus')
+
+def banc_journal():
+    """
+    Mesure le journal des parties (voir le module journal): le coût d'une sauvegarde automatique (l'ajout d'une
+    action) comparé à celui d'une sauvegarde complète, puis la reprise d'une partie interrompue (à partir du
+    dernier instantané, ou en rejouant tout le journal) et le rejeu complet d'une partie, action par action.
+    """
+    from tempfile import TemporaryDirectory
+    from sauvegarde import enregistrer_partie
+    from journal import JournalPartie, recuperer_partie, rejouer_partie, jouer_partie, ACTION_POSER_DRAPEAU
+
+    print('Journal des parties')
+    with TemporaryDirectory() as dossier:
+        chemin_journal = os.path.join(dossier, 'journal.dmj')
+        chemin_sauvegarde = os.path.join(dossier, 'partie.dmn')
+
+        # sauvegarde automatique: une action ajoutée au journal, ou toute la partie écrite de nouveau
+        for cote in (100, 1000):
+            tableau = generer_tableau(cote, cote, cote * cote * 15 // 100)
+            tableau.devoiler_case(cote // 2, cote // 2)
+            journal = JournalPartie(chemin_journal, tableau, intervalle=10 ** 9)
+            nombre_actions = 10000
+            debut = perf_counter()
+            for numero in range(nombre_actions):
+                journal.ajouter(ACTION_POSER_DRAPEAU, 1 + numero % cote, 1, numero)
+            duree_ajout = (perf_counter() - debut) / nombre_actions
+            journal.fermer()
+
+            nombre_sauvegardes = 20
+            debut = perf_counter()
+            for _ in range(nombre_sauvegardes):
+                enregistrer_partie(chemin_sauvegarde, tableau)
+            duree_sauvegarde = (perf_counter() - debut) / nombre_sauvegardes
+            print(f'  {cote * cote:>8} cases: ajout d\'une action {duree_ajout * 1e6:7.1f} us, '
+                  f'sauvegarde complète {duree_sauvegarde * 1e6:10.1f} us')
+
+        # reprise et rejeu d'une partie de 2000 actions, avec ou sans instantanés
+        for intervalle in (100, 10 ** 9):
+            tableau = Tableau(300, 300, 300 * 300 * 15 // 100, graine=1)
+            journal = JournalPartie(chemin_journal, tableau, intervalle=intervalle)
+            jouer_partie(tableau, journal, 2000)
+            journal.fermer()
+            with open(chemin_journal, 'rb') as fichier:
+                donnees = fichier.read()
+
+            debut = perf_counter()
+            tableau_repris = recuperer_partie(chemin_journal)[0]
+            duree_reprise = perf_counter() - debut
+            assert tableau_repris.grille == tableau.grille
+
+            debut = perf_counter()
+            nombre_actions = sum(1 for _ in rejouer_partie(donnees))
+            duree_rejeu = perf_counter() - debut
+            instantanes = 'instantanés aux 100 actions' if intervalle == 100 else 'sans instantané'
+            print(f'     90000 cases, {nombre_actions} actions ({instantanes:>27}, {len(donnees) / 2**10:6.1f} Ko): '
+                  f'reprise {duree_reprise * 1e3:7.1f} ms, rejeu complet {duree_rejeu * 1e3:7.1f} ms '
+                  f'({nombre_actions / duree_rejeu:,.0f} actions/s)')
+
+
+def banc_coups():
+    """
+    Compare la sauvegarde par coups (voir le module journal) à la sauvegarde binaire complète, pour des parties
+    de 500 actions sur des tableaux de plus en plus grands (15 % de mines): taille du fichier, écriture et
+    chargement (la partie sauvegardée par coups est rejouée).
+    """
+    from tempfile import TemporaryDirectory
+    from sauvegarde import encoder_partie, decoder_partie
+    from journal import JournalPartie, jouer_partie, encoder_partie_coups, decoder_partie_coups
+
+    print('Sauvegarde par coups (graine et actions) contre sauvegarde complète')
+    with TemporaryDirectory() as dossier:
+        for cote in (100, 300, 1000):
+            tableau = Tableau(cote, cote, cote * cote * 15 // 100, graine=cote)
+            journal = JournalPartie(os.path.join(dossier, 'journal.dmj'), tableau, intervalle=10 ** 9)
+            compteur = jouer_partie(tableau, journal, 500)
+            journal.fermer()
+
+            for nom, encoder, decoder in (('complète', lambda: encoder_partie(tableau, compteur),
+                                           decoder_partie),
+                                          ('par coups', lambda: encoder_partie_coups(tableau, journal.actions,
+                                                                                     compteur),
+                                           decoder_partie_coups)):
+                debut = perf_counter()
+                donnees = encoder()
+                duree_ecriture = perf_counter() - debut
+                debut = perf_counter()
+                assert decoder(donnees)[0].grille == tableau.grille
+                duree_lecture = perf_counter() - debut
+                print(f'  {cote * cote:>8} cases, {len(journal.actions)} actions, {nom:>9}: '
+                      f'{len(donnees) / 2**10:8.1f} Ko, écriture {duree_ecriture * 1e3:7.2f} ms, '
+                      f'chargement {duree_lecture * 1e3:7.1f} ms')
+
+
+def banc_generation():
+    """
+    Mesure le temps de génération d'un tableau selon le nombre de cases et la densité de mines. Le temps
+    doit croître linéairement avec le nombre de cases, même lorsque presque toutes les cases sont minées.
+    """
+    print('Génération du tableau')
+    for cote in (300, 1000, 3000):
+        for densite in (0.1, 0.5, 0.9, 0.99, 1.0):
+            nombre_cases = cote * cote
+            debut = perf_counter()
+            generer_tableau(cote, cote, int(nombre_cases * densite))
+            duree = perf_counter() - debut
+            print(f'  {nombre_cases:>8} cases, {densite:4.0%} de mines: {duree:6.2f} s '
+                  f'({duree * 1e9 / nombre_cases:5.0f} ns/case)')
+
+
+def explorer_tableau_infini(tableau, nombre_morceaux):
+    """
+    Robot qui explore un tableau infini, morceau après morceau vers la droite, en dévoilant toutes les cases
+    sans mine (il triche en consultant contient_mine).
+
+    Args:
+        tableau (TableauInfini): Le tableau à explorer
+        nombre_morceaux (int): Nombre de morceaux à explorer
+
+    Returns:
+        int: Le nombre de cases dévoilées
+    """
+    taille = tableau.taille_morceau
+    nombre_devoilees = 0
+    for morceau_y in range(nombre_morceaux):
+        for rangee_x in range(taille):
+            for colonne_y in range(morceau_y * taille, (morceau_y + 1) * taille):
+                case = tableau.obtenir_case(rangee_x, colonne_y)
+                if not case.est_minee and not case.est_devoilee:
+                    nombre_devoilees += len(tableau.devoiler_case(rangee_x, colonne_y))
+    return nombre_devoilees
+
+
+def banc_tableau_infini():
+    """
+    Mesure la mémoire et le temps d'un robot qui explore des millions de cases d'un tableau infini. La mémoire
+    doit rester la même peu importe l'étendue explorée.
+    """
+    print('Exploration d\'un tableau infini (20 % de mines, morceaux de 64 x 64, 64 morceaux en mémoire)')
+    for nombre_morceaux in (16, 128, 1024):
+        tableau = TableauInfini(densite=0.2, graine=1, capacite=64)
+        nombre_devoilees, duree, pic = mesurer_memoire(explorer_tableau_infini, tableau, nombre_morceaux)
+        print(f'  {nombre_morceaux * 64 * 64:>8} cases explorées ({nombre_devoilees} dévoilées): '
+              f'{pic / 2**20:6.1f} Mo en {duree:6.2f} s, {tableau.statistiques["ecrits"]} morceaux écrits')
+        tableau.fermer()
+
+
+# Bancs d'essai disponibles, par nom
+BANCS_ESSAI = {
+    'memoire': banc_memoire,
+    'case': banc_case,
+    'cascade': banc_cascade,
+    'cascade_progressive': banc_cascade_progressive,
+    'evenements': banc_evenements,
+    'sauvegarde': banc_sauvegarde,
+    'chargement': banc_chargement,
+    'projection': banc_projection,
+    'journal': banc_journal,
+    'coups': banc_coups,
+    'generation': banc_generation,
+    'premier_clic': banc_premier_clic,
+    'reserve': banc_reserve,
+    'lot': banc_lot,
+    'canevas': banc_canevas,
+    'parties': banc_parties,
+    'demarrage': banc_demarrage,
+    'audio': banc_audio,
+    'tableau_infini': banc_tableau_infini,
+}
+
+
+if __name__ == '__main__':
+
+    noms = sys.argv[1:] or list(BANCS_ESSAI)
+    for nom in noms:
+        BANCS_ESSAI[nom]()
@@ -0,0 +1,550 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe CanevasTableau. Le canevas dessine toutes les cases d'un tableau
+de démineur sur un seul widget, plutôt qu'avec un bouton (et ses liaisons d'évènements) par case.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+from tkinter import Canvas
+from case import MASQUE_VOISINES, BIT_MINE, BIT_DEVOILEE, BIT_DRAPEAU, BIT_BORDURE
+from ressources import RegistreRessources
+
+# Côté d'une case, en pixels
+TAILLE_CASE = 24
+
+# Nombre de rangées et de colonnes dessinées au-delà de la partie visible, de chaque côté
+MARGE_FENETRE = 4
+
+# Couleurs du canevas
+COULEUR_CACHEE = '#d9d9d9'
+COULEUR_DEVOILEE = '#f0f0f0'
+COULEUR_LIGNES = '#808080'
+
+# Couleur du chiffre d'une case dévoilée, selon son nombre de mines voisines (les autres: COULEUR_CHIFFRE)
+COULEURS_CHIFFRES = {0: '#a3a3a3', 1: 'blue', 2: 'green', 3: 'red'}
+COULEUR_CHIFFRE = '#0C3B87'
+
+
+class CanevasTableau(Canvas):
+    """
+    Classe dérivée de Canvas qui dessine les cases d'un tableau. Le fond du canevas représente les cases
+    cachées: seules les cases dévoilées, celles qui ont un drapeau et, à la fin de la partie, les mines ont
+    leurs propres éléments graphiques. La case pointée par la souris se trouve par un simple calcul.
+
+    Pour ne redessiner que ce qui a changé, le canevas garde l'état des cases de la fenêtre tel qu'il a été
+    dessiné (etats_dessines): seules les cases dont l'état visible est différent sont redessinées, et Tk ne
+    repeint que les rectangles qu'elles occupent.
+
+    Les éléments graphiques ne sont pas détruits lorsqu'une case est redessinée ou qu'une partie commence: ils
+    sont cachés et gardés en réserve (elements_libres) pour être réutilisés. Au début d'une partie, seuls les
+    éléments en trop pour le nouveau tableau sont vraiment détruits.
+
+    Seules les cases de la fenêtre (la partie visible du canevas, plus MARGE_FENETRE rangées et colonnes de
+    chaque côté) sont dessinées, de même que les lignes qui les séparent. Lorsque le joueur fait défiler le
+    tableau, les éléments des cases qui sortent de la fenêtre servent à dessiner celles qui y entrent: le coût
+    du dessin dépend de la taille de l'écran, et non de celle du tableau.
+
+    Inheritance:
+        Canvas (class)
+
+    Attributes:
+        tableau (Tableau): Le tableau dessiné
+        taille_case (int): Côté d'une case, en pixels
+        solution (bool): True si la solution (toutes les cases, mines comprises) est affichée
+        etats_dessines (dict): État visible des cases dessinées, tel qu'il est dessiné, par indice de la grille
+                               (une case absente est dessinée cachée, sans drapeau)
+        elements_cases (dict): Les éléments graphiques de chacune des cases dessinées, par indice de la grille
+        elements_libres (dict): Les éléments cachés, prêts à être réutilisés, par type ('rectangle', 'text' ou
+                                'image')
+        lignes (list): Les lignes qui séparent les cases de la fenêtre
+        fenetre (tuple): La première et la dernière rangée, puis la première et la dernière colonne dessinées
+        barres_defilement (tuple): Les barres de défilement horizontale et verticale (ou None)
+        image_drapeau (PhotoImage): Image d'un drapeau (partagée par toutes les cases, voir RegistreRessources)
+        image_mine (PhotoImage): Image d'une mine (partagée par toutes les cases)
+    """
+
+    def __init__(self, parent, tableau, ressources=None, taille_case=TAILLE_CASE, **options):
+        """
+        Constructeur de la classe CanevasTableau.
+
+        Args:
+            parent (objet): widget/object Tkinter qui contient le canevas
+            tableau (Tableau): Le tableau à dessiner
+            ressources (RegistreRessources): Le registre qui fournit les images (par défaut, un nouveau registre)
+            taille_case (int): Côté d'une case, en pixels (par défaut, TAILLE_CASE)
+            **options: Options Tkinter du canevas (par exemple, ses dimensions visibles)
+        """
+        super().__init__(parent, background=COULEUR_CACHEE, highlightthickness=0, **options)
+        self.taille_case = taille_case
+        ressources = RegistreRessources(self) if ressources is None else ressources
+        self.image_drapeau = ressources.obtenir_image("png/flag_icon.gif")
+        self.image_mine = ressources.obtenir_image("png/mine.gif")
+        self.elements_cases = {}
+        self.elements_libres = {'rectangle': [], 'text': [], 'image': []}
+        self.lignes = []
+        self.fenetre = None
+        self.barres_defilement = (None, None)
+
+        # le canevas est averti de chaque déplacement de sa partie visible (défilement ou redimensionnement)
+        self.configure(xscrollcommand=lambda debut, fin: self.vue_deplacee(0, debut, fin),
+                       yscrollcommand=lambda debut, fin: self.vue_deplacee(1, debut, fin),
+                       xscrollincrement=taille_case, yscrollincrement=taille_case)
+
+        # la molette de la souris fait défiler le tableau
+        self.bind('<MouseWheel>', lambda event: self.yview_scroll(-1 if event.delta > 0 else 1, 'units'))
+        self.bind('<Button-4>', lambda event: self.yview_scroll(-1, 'units'))
+        self.bind('<Button-5>', lambda event: self.yview_scroll(1, 'units'))
+
+        self.changer_tableau(tableau)
+
+    def changer_tableau(self, tableau):
+        """
+        Efface le tableau dessiné et dessine un nouveau tableau (par exemple, au début d'une partie ou au
+        chargement d'une sauvegarde, dont certaines cases sont déjà dévoilées). Les éléments de l'ancien
+        tableau sont réutilisés: on ne détruit que ceux dont le nouveau tableau ne pourrait pas avoir besoin.
+
+        Args:
+            tableau (Tableau): Le nouveau tableau
+        """
+        for indice in list(self.elements_cases):
+            self.liberer_case(indice)
+
+        self.tableau = tableau
+        self.solution = False
+        self.etats_dessines = {}
+
+        self.configure(scrollregion=(0, 0, tableau.dimension_colonne * self.taille_case,
+                                     tableau.dimension_rangee * self.taille_case))
+        self.xview_moveto(0)
+        self.yview_moveto(0)
+
+        self.fenetre = None
+        self.mettre_a_jour_fenetre()
+
+        # chaque case de la fenêtre a au plus un élément de chaque type
+        nombre_cases = self.compter_cases_fenetre()
+        for elements in self.elements_libres.values():
+            if len(elements) > nombre_cases:
+                self.delete(*elements[nombre_cases:])
+                del elements[nombre_cases:]
+
+    def associer_barres_defilement(self, barre_horizontale, barre_verticale):
+        """
+        Associe des barres de défilement au canevas (le canevas garde ses propres commandes de défilement, pour
+        savoir quand sa partie visible se déplace).
+
+        Args:
+            barre_horizontale (Scrollbar): La barre de défilement horizontale
+            barre_verticale (Scrollbar): La barre de défilement verticale
+        """
+        self.barres_defilement = (barre_horizontale, barre_verticale)
+        barre_horizontale.configure(command=self.xview)
+        barre_verticale.configure(command=self.yview)
+
+    def vue_deplacee(self, axe, debut, fin):
+        """
+        Méthode appelée par Tk lorsque la partie visible du canevas se déplace: on met à jour la barre de
+        défilement, puis les cases dessinées.
+
+        Args:
+            axe (int): 0 pour un déplacement horizontal, 1 pour un déplacement vertical
+            debut (str): Fraction du tableau où commence la partie visible
+            fin (str): Fraction du tableau où finit la partie visible
+        """
+        barre = self.barres_defilement[axe]
+        if barre is not None:
+            barre.set(debut, fin)
+        self.mettre_a_jour_fenetre()
+
+    def calculer_fenetre(self):
+        """
+        Calcule les rangées et les colonnes à dessiner: celles de la partie visible du canevas, plus une marge.
+
+        Returns:
+            tuple: La première et la dernière rangée, puis la première et la dernière colonne à dessiner
+        """
+        largeur_visible = self.winfo_width() if self.winfo_width() > 1 else int(self.cget('width'))
+        hauteur_visible = self.winfo_height() if self.winfo_height() > 1 else int(self.cget('height'))
+        gauche, haut = int(self.canvasx(0)), int(self.canvasy(0))
+
+        return (max(1, haut // self.taille_case + 1 - MARGE_FENETRE),
+                min(self.tableau.dimension_rangee, (haut + hauteur_visible) // self.taille_case + 1 + MARGE_FENETRE),
+                max(1, gauche // self.taille_case + 1 - MARGE_FENETRE),
+                min(self.tableau.dimension_colonne, (gauche + largeur_visible) // self.taille_case + 1 + MARGE_FENETRE))
+
+    def mettre_a_jour_fenetre(self):
+        """
+        Recalcule la fenêtre: les cases qui en sortent sont libérées, les lignes sont replacées et les cases qui
+        y entrent sont dessinées.
+        """
+        fenetre = self.calculer_fenetre()
+        if fenetre == self.fenetre:
+            return
+        self.fenetre = fenetre
+
+        for indice in list(self.elements_cases):
+            if not self.est_dans_fenetre(indice):
+                self.liberer_case(indice)
+                self.etats_dessines.pop(indice, None)
+
+        self.dessiner_lignes()
+        self.redessiner()
+
+    def est_dans_fenetre(self, indice):
+        """
+        Vérifie si une case fait partie de la fenêtre (des cases à dessiner).
+
+        Args:
+            indice (int): L'indice de la case dans la grille du tableau
+
+        Returns:
+            bool: True si la case est dans la fenêtre, False autrement
+        """
+        rangee_x, colonne_y = divmod(indice, self.tableau.largeur)
+        premiere_rangee, derniere_rangee, premiere_colonne, derniere_colonne = self.fenetre
+        return premiere_rangee <= rangee_x <= derniere_rangee and premiere_colonne <= colonne_y <= derniere_colonne
+
+    def compter_cases_fenetre(self):
+        """
+        Compte les cases de la fenêtre (des cases à dessiner).
+
+        Returns:
+            int: Le nombre de cases de la fenêtre
+        """
+        premiere_rangee, derniere_rangee, premiere_colonne, derniere_colonne = self.fenetre
+        return (derniere_rangee - premiere_rangee + 1) * (derniere_colonne - premiere_colonne + 1)
+
+    def dessiner_lignes(self):
+        """
+        Dessine les lignes qui séparent les cases de la fenêtre, en déplaçant les lignes existantes et en créant
+        ou en détruisant seulement celles qui manquent ou qui sont en trop.
+        """
+        premiere_rangee, derniere_rangee, premiere_colonne, derniere_colonne = self.fenetre
+        taille = self.taille_case
+        gauche, droite = (premiere_colonne - 1) * taille, derniere_colonne * taille
+        haut, bas = (premiere_rangee - 1) * taille, derniere_rangee * taille
+
+        positions = [(gauche, rangee * taille, droite, rangee * taille)
+                     for rangee in range(premiere_rangee - 1, derniere_rangee + 1)]
+        positions += [(colonne * taille, haut, colonne * taille, bas)
+                      for colonne in range(premiere_colonne - 1, derniere_colonne + 1)]
+
+        if len(self.lignes) > len(positions):
+            self.delete(*self.lignes[len(positions):])
+            del self.lignes[len(positions):]
+        for ligne, position in zip(self.lignes, positions):
+            self.coords(ligne, *position)
+        for position in positions[len(self.lignes):]:
+            self.lignes.append(self.create_line(*position, fill=COULEUR_LIGNES))
+
+    def obtenir_element(self, genre):
+        """
+        Retourne un élément graphique visible d'un type donné, pris dans la réserve s'il y en a un, et créé
+        sinon. L'élément est placé au-dessus des autres; c'est à l'appelant de le positionner et de le configurer.
+
+        Args:
+            genre (str): Le type d'élément ('rectangle', 'text' ou 'image')
+
+        Returns:
+            int: L'identifiant de l'élément
+        """
+        elements = self.elements_libres[genre]
+        if elements:
+            element = elements.pop()
+            self.itemconfigure(element, state='normal')
+            self.tag_raise(element)
+            return element
+        if genre == 'rectangle':
+            return self.create_rectangle(0, 0, 0, 0)
+        if genre == 'text':
+            return self.create_text(0, 0)
+        return self.create_image(0, 0)
+
+    def liberer_case(self, indice):
+        """
+        Cache les éléments graphiques d'une case et les remet dans la réserve.
+
+        Args:
+            indice (int): L'indice de la case dans la grille du tableau
+        """
+        for genre, element in self.elements_cases.pop(indice, ()):
+            self.itemconfigure(element, state='hidden')
+            self.elements_libres[genre].append(element)
+
+    def compter_elements(self):
+        """
+        Compte les éléments graphiques du canevas (visibles ou en réserve).
+
+        Returns:
+            int: Le nombre d'éléments
+        """
+        return len(self.find_all())
+
+    def obtenir_case_pointee(self, x_pixel, y_pixel):
+        """
+        Trouve la case qui se trouve sous un point du canevas (par exemple, la position d'un clic).
+
+        Args:
+            x_pixel (int): Position horizontale du point dans la partie visible du canevas (event.x)
+            y_pixel (int): Position verticale du point dans la partie visible du canevas (event.y)
+
+        Returns:
+            tuple: Les coordonnées (x, y) de la case, ou None si le point est à l'extérieur du tableau
+        """
+        rangee_x = int(self.canvasy(y_pixel)) // self.taille_case + 1
+        colonne_y = int(self.canvasx(x_pixel)) // self.taille_case + 1
+
+        if not self.tableau.valider_coordonnees(rangee_x, colonne_y):
+            return None
+        return rangee_x, colonne_y
+
+    def obtenir_etat_visible(self, etat):
+        """
+        Calcule ce que le joueur doit voir d'une case: tout son état si elle est dévoilée (ou si la solution
+        est affichée), et seulement son drapeau sinon. La bordure de la grille n'est jamais dessinée.
+
+        Args:
+            etat (int): L'octet de la case dans la grille
+
+        Returns:
+            int: L'état visible de la case
+        """
+        if etat & BIT_BORDURE:
+            return 0
+        if self.solution:
+            return etat | BIT_DEVOILEE
+        if etat & BIT_DEVOILEE:
+            return etat
+        return etat & BIT_DRAPEAU
+
+    def dessiner_case(self, indice):
+        """
+        Redessine une case, si elle est dans la fenêtre et que son état visible a changé depuis la dernière fois
+        qu'elle a été dessinée.
+
+        Args:
+            indice (int): L'indice de la case dans la grille du tableau
+        """
+        if not self.est_dans_fenetre(indice):
+            return
+
+        etat = self.obtenir_etat_visible(self.tableau.grille[indice])
+        if etat == self.etats_dessines.get(indice, 0):
+            return
+        if etat:
+            self.etats_dessines[indice] = etat
+        else:
+            del self.etats_dessines[indice]
+
+        self.liberer_case(indice)
+
+        rangee_x, colonne_y = self.tableau.obtenir_coordonnees(indice)
+        gauche = (colonne_y - 1) * self.taille_case
+        haut = (rangee_x - 1) * self.taille_case
+        centre_x, centre_y = gauche + self.taille_case // 2, haut + self.taille_case // 2
+
+        elements = []
+
+        if etat & BIT_DEVOILEE:
+            rectangle = self.obtenir_element('rectangle')
+            self.coords(rectangle, gauche, haut, gauche + self.taille_case, haut + self.taille_case)
+            self.itemconfigure(rectangle, fill=COULEUR_DEVOILEE, outline=COULEUR_LIGNES)
+            elements.append(('rectangle', rectangle))
+
+            if etat & BIT_MINE:
+                image = self.obtenir_element('image')
+                self.coords(image, centre_x, centre_y)
+                self.itemconfigure(image, image=self.image_mine)
+                elements.append(('image', image))
+            else:
+                nombre_mines_voisines = etat & MASQUE_VOISINES
+                texte = self.obtenir_element('text')
+                self.coords(texte, centre_x, centre_y)
+                self.itemconfigure(texte, text=str(nombre_mines_voisines),
+                                   fill=COULEURS_CHIFFRES.get(nombre_mines_voisines, COULEUR_CHIFFRE))
+                elements.append(('text', texte))
+
+        elif etat & BIT_DRAPEAU:
+            image = self.obtenir_element('image')
+            self.coords(image, centre_x, centre_y)
+            self.itemconfigure(image, image=self.image_drapeau)
+            elements.append(('image', image))
+
+        if elements:
+            self.elements_cases[indice] = elements
+
+    def dessiner_cases(self, indices):
+        """
+        Redessine seulement les cases reçues en argument, par exemple les cases qu'un dévoilement vient
+        d'ouvrir (voir Tableau.devoiler_case), sans parcourir le reste du tableau. Les cases hors de la fenêtre
+        seront dessinées lorsqu'elles y entreront; s'il y a plus de cases que la fenêtre n'en contient, il est
+        donc moins coûteux de simplement redessiner la fenêtre.
+
+        Args:
+            indices (list): Les indices des cases à redessiner dans la grille du tableau
+        """
+        if len(indices) > self.compter_cases_fenetre():
+            self.redessiner()
+            return
+
+        for indice in indices:
+            self.dessiner_case(indice)
+
+    def redessiner(self):
+        """
+        Compare l'état de toutes les cases de la fenêtre à ce qui est dessiné et redessine celles qui ont changé.
+        Lorsqu'on sait quelles cases ont changé (et qu'elles sont peu nombreuses), dessiner_cases est moins coûteux.
+        """
+        obtenir_etat_visible = self.obtenir_etat_visible
+        etats_dessines = self.etats_dessines
+        grille = self.tableau.grille
+        premiere_rangee, derniere_rangee, premiere_colonne, derniere_colonne = self.fenetre
+
+        for rangee_x in range(premiere_rangee, derniere_rangee + 1):
+            debut_rangee = rangee_x * self.tableau.largeur
+            for indice in range(debut_rangee + premiere_colonne, debut_rangee + derniere_colonne + 1):
+                if obtenir_etat_visible(grille[indice]) != etats_dessines.get(indice, 0):
+                    self.dessiner_case(indice)
+
+    def afficher_solution(self):
+        """
+        Dévoile toutes les cases, mines comprises (à la fin de la partie). Les cases hors de la fenêtre seront
+        dévoilées lorsqu'elles y entreront.
+        """
+        self.solution = True
+        self.redessiner()
+
+
+#### Tests unitaires ###
+
+class CanevasTableauSansAffichage(CanevasTableau):
+    """
+    Remplace le widget Tkinter d'un CanevasTableau pour les tests: les éléments graphiques sont de simples
+    dictionnaires d'options, et la partie visible se déplace avec defiler().
+    """
+
+    def __init__(self, tableau, largeur_visible, hauteur_visible, taille_case=TAILLE_CASE):
+        self.largeur_visible, self.hauteur_visible = largeur_visible, hauteur_visible
+        self.vue = (0, 0)
+        self.elements = {}
+        self.taille_case = taille_case
+        self.image_drapeau, self.image_mine = 'drapeau', 'mine'
+        self.elements_cases = {}
+        self.elements_libres = {'rectangle': [], 'text': [], 'image': []}
+        self.lignes = []
+        self.fenetre = None
+        self.barres_defilement = (None, None)
+        self.changer_tableau(tableau)
+
+    def defiler(self, gauche, haut):
+        self.vue = (gauche, haut)
+        self.mettre_a_jour_fenetre()
+
+    def creer_element(self, genre):
+        element = max(self.elements, default=0) + 1
+        self.elements[element] = {'genre': genre, 'state': 'normal'}
+        return element
+
+    def create_rectangle(self, *position):
+        return self.creer_element('rectangle')
+
+    def create_text(self, *position):
+        return self.creer_element('text')
+
+    def create_image(self, *position):
+        return self.creer_element('image')
+
+    def create_line(self, *position, **options):
+        return self.creer_element('line')
+
+    def delete(self, *elements):
+        for element in elements:
+            del self.elements[element]
+
+    def itemconfigure(self, element, **options):
+        self.elements[element].update(options)
+
+    def find_all(self):
+        return tuple(self.elements)
+
+    def compter_visibles(self, genre):
+        return sum(1 for element in self.elements.values()
+                   if element['genre'] == genre and element['state'] == 'normal')
+
+    def configure(self, **options):
+        pass
+
+    def coords(self, element, *position):
+        pass
+
+    def tag_raise(self, element):
+        pass
+
+    def xview_moveto(self, fraction):
+        self.vue = (0, self.vue[1])
+
+    def yview_moveto(self, fraction):
+        self.vue = (self.vue[0], 0)
+
+    def winfo_width(self):
+        return self.largeur_visible
+
+    def winfo_height(self):
+        return self.hauteur_visible
+
+    def canvasx(self, x_pixel):
+        return self.vue[0] + x_pixel
+
+    def canvasy(self, y_pixel):
+        return self.vue[1] + y_pixel
+
+def test_fenetre():
+    from tableau import Tableau
+
+    tableau = Tableau(200, 300, 9000, graine=3)
+    canevas = CanevasTableauSansAffichage(tableau, 10 * TAILLE_CASE, 8 * TAILLE_CASE)
+
+    # seules les cases de la fenêtre (la partie visible et sa marge) sont dessinées et suivies
+    assert canevas.fenetre == (1, 8 + MARGE_FENETRE + 1, 1, 10 + MARGE_FENETRE + 1)
+    assert not canevas.etats_dessines and not canevas.elements_cases
+    tableau.devoiler_case(3, 3)
+    tableau.basculer_drapeau(12, 14)
+    canevas.redessiner()
+    devoilees = [indice for indice in canevas.etats_dessines if tableau.grille[indice] & BIT_DEVOILEE]
+    assert devoilees and all(canevas.est_dans_fenetre(indice) for indice in canevas.etats_dessines)
+    assert len(canevas.etats_dessines) == len(canevas.elements_cases) == len(devoilees) + 1
+    assert canevas.compter_visibles('rectangle') == len(devoilees) and canevas.compter_visibles('image') == 1
+    etats_dessines = dict(canevas.etats_dessines)
+
+    # en parcourant tout le tableau avec la solution affichée, les éléments des cases qui sortent de la fenêtre
+    # servent à celles qui y entrent: leur nombre ne dépend que de la taille de la fenêtre
+    # (chaque case dessinée a au plus un élément de chaque type)
+    canevas.afficher_solution()
+    plus_grande_fenetre = 0
+    for haut in range(0, 200 * TAILLE_CASE, 7 * TAILLE_CASE):
+        for gauche in range(0, 300 * TAILLE_CASE, 9 * TAILLE_CASE):
+            canevas.defiler(gauche, haut)
+            plus_grande_fenetre = max(plus_grande_fenetre, canevas.compter_cases_fenetre())
+            assert len(canevas.etats_dessines) == canevas.compter_cases_fenetre()
+            assert all(canevas.est_dans_fenetre(indice) for indice in canevas.etats_dessines)
+    for genre in ('rectangle', 'text', 'image'):
+        assert sum(1 for element in canevas.elements.values() if element['genre'] == genre) <= plus_grande_fenetre
+
+    # de retour au début, sans la solution, les mêmes cases sont dessinées
+    canevas.solution = False
+    canevas.defiler(0, 0)
+    assert canevas.etats_dessines == etats_dessines
+
+    # un nouveau tableau réutilise les éléments de l'ancien, cachés en attendant
+    nombre_elements = canevas.compter_elements()
+    canevas.changer_tableau(Tableau(1000, 1000, 150000))
+    assert not canevas.etats_dessines and canevas.compter_elements() <= nombre_elements
+    assert not any(canevas.compter_visibles(genre) for genre in ('rectangle', 'text', 'image'))
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_fenetre()
+    print('Tests réussis!')
@@ -6,42 +6,114 @@ et être dans différents états de dévoilement.
 Auteur: Pascal Germain
 """
 
+# Disposition des bits d'une case dans la grille compacte d'un Tableau (un octet par case)
+MASQUE_VOISINES = 0x0F   # nombre de mines voisines (0 à 8)
+BIT_MINE = 0x10          # la case contient une mine
+BIT_DEVOILEE = 0x20      # la case a été dévoilée
+BIT_DRAPEAU = 0x40       # un drapeau a été posé sur la case
+BIT_BORDURE = 0x80       # case sentinelle qui entoure le tableau (jamais jouable)
+
 
 class Case:
     """
-    Une case du tableau du jeu de démineur.
+    Une case du tableau du jeu de démineur. Tout l'état de la case est regroupé dans un seul petit entier
+    (etat), avec la même disposition de bits qu'un octet de la grille compacte d'un Tableau, et la classe
+    n'a pas de __dict__ (__slots__).
     
     Attributes:
+        etat (int): L'état de la case (nombre de mines voisines, BIT_MINE, BIT_DEVOILEE et BIT_DRAPEAU)
         est_minee (bool): True si la case contient une mine, False autrement
         est_devoilee (bool): True si la case a été dévoilée, False autrement
+        a_drapeau (bool): True si un drapeau a été posé sur la case, False autrement
         nombre_mines_voisines (int): Le nombre de mines présentes dans le voisinage de la case.
     """
+    __slots__ = ('etat',)
 
-    def __init__(self):
+    def __init__(self, etat=0):
         """ 
         Initialisation de la classe avec des valeurs par défaut.
+
+        Args:
+            etat (int): L'état initial de la case (par défaut, une case vide et cachée)
+        """
+        self.etat = etat
+
+    def changer_bit(self, bit, valeur):
+        """
+        Méthode qui active ou désactive un des bits de l'état de la case.
+
+        Args:
+            bit (int): Le bit à modifier (BIT_MINE, BIT_DEVOILEE ou BIT_DRAPEAU)
+            valeur (bool): True pour activer le bit, False pour le désactiver
         """
-        self.est_minee = False
-        self.est_devoilee = False
-        self.nombre_mines_voisines = 0
+        if valeur:
+            self.etat |= bit
+        else:
+            self.etat &= ~bit
+
+    @property
+    def est_minee(self):
+        """bool: True si la case contient une mine, False autrement"""
+        return bool(self.etat & BIT_MINE)
+
+    @est_minee.setter
+    def est_minee(self, valeur):
+        self.changer_bit(BIT_MINE, valeur)
+
+    @property
+    def est_devoilee(self):
+        """bool: True si la case a été dévoilée, False autrement"""
+        return bool(self.etat & BIT_DEVOILEE)
+
+    @est_devoilee.setter
+    def est_devoilee(self, valeur):
+        self.changer_bit(BIT_DEVOILEE, valeur)
+
+    @property
+    def a_drapeau(self):
+        """bool: True si un drapeau a été posé sur la case, False autrement"""
+        return bool(self.etat & BIT_DRAPEAU)
+
+    @a_drapeau.setter
+    def a_drapeau(self, valeur):
+        self.changer_bit(BIT_DRAPEAU, valeur)
+
+    @property
+    def nombre_mines_voisines(self):
+        """int: Le nombre de mines présentes dans le voisinage de la case"""
+        return self.etat & MASQUE_VOISINES
+
+    @nombre_mines_voisines.setter
+    def nombre_mines_voisines(self, valeur):
+        self.etat = (self.etat & ~MASQUE_VOISINES) | int(valeur)
 
     def devoiler(self):
         """
         Cette méthode modifie le statut de la case lorsque son contenu est dévoilé.
         """
-        self.est_devoilee = True
+        self.etat |= BIT_DEVOILEE
 
     def ajouter_mine(self):
         """
-        Cette méthode permet d'ajouter une mine à la case en modifiant un attribut.
+        Cette méthode permet d'ajouter une mine à la case en modifiant son état.
+        """
+        self.etat |= BIT_MINE
+
+    def basculer_drapeau(self):
         """
-        self.est_minee = True 
-        
+        Méthode qui pose un drapeau sur la case, ou qui l'enlève s'il y en avait déjà un.
+
+        Returns:
+            bool: True si la case a maintenant un drapeau, False autrement.
+        """
+        self.etat ^= BIT_DRAPEAU
+        return self.a_drapeau
+
     def ajouter_une_mine_voisine(self):
         """
-        Méthode qui incrémente l'attribut nombre_mines_voisines
+        Méthode qui incrémente le nombre de mines voisines
         """
-        self.nombre_mines_voisines += 1
+        self.etat += 1
 
     def est_voisine_d_une_mine(self):
         """
@@ -49,9 +121,42 @@ class Case:
         Returns:
             bool: True si la case est voisine d'une mine, False autrement.
         """
-        return self.nombre_mines_voisines > 0
-    
-    
+        return self.etat & MASQUE_VOISINES > 0
+
+
+class VueCase(Case):
+    """
+    Vue légère sur une case conservée dans la grille compacte (bytearray) d'un Tableau. Elle offre la même
+    interface que la classe Case, mais son état est l'octet de la case dans la grille: chaque lecture et
+    chaque modification se fait directement dans la grille.
+
+    Attributes:
+        grille (bytearray): La grille compacte du tableau qui contient la case
+        indice (int): Position de l'octet de la case dans la grille
+    """
+    __slots__ = ('grille', 'indice')
+
+    def __init__(self, grille, indice):
+        """
+        Initialisation de la vue sur l'octet de la case.
+
+        Args:
+            grille (bytearray): La grille compacte du tableau
+            indice (int): Position de la case dans la grille
+        """
+        self.grille = grille
+        self.indice = indice
+
+    @property
+    def etat(self):
+        """int: L'octet de la case dans la grille"""
+        return self.grille[self.indice]
+
+    @etat.setter
+    def etat(self, valeur):
+        self.grille[self.indice] = valeur
+
+
 if __name__ == '__main__':
     print('Tests unitaires...')
     
@@ -71,5 +176,32 @@ if __name__ == '__main__':
         une_case.ajouter_une_mine_voisine()
         assert une_case.nombre_mines_voisines == i
         assert une_case.est_voisine_d_une_mine()
+
+    assert not une_case.a_drapeau
+    assert une_case.basculer_drapeau()
+    assert une_case.a_drapeau and une_case.est_minee and une_case.nombre_mines_voisines == 4
+    assert not une_case.basculer_drapeau()
+    assert une_case.etat == BIT_MINE | BIT_DEVOILEE | 4
+    assert not hasattr(une_case, '__dict__')
+
+    grille = bytearray(3)
+    une_vue = VueCase(grille, 1)
+    assert not une_vue.est_minee
+    assert not une_vue.est_devoilee
+    assert une_vue.nombre_mines_voisines == 0
+
+    une_vue.devoiler()
+    une_vue.ajouter_mine()
+    for i in range(1, 9):
+        une_vue.ajouter_une_mine_voisine()
+        assert une_vue.nombre_mines_voisines == i
+    assert une_vue.est_devoilee and une_vue.est_minee
+    assert grille[0] == grille[2] == 0
+
+    une_vue.est_minee = False
+    une_vue.nombre_mines_voisines = 2
+    assert not une_vue.est_minee and une_vue.est_devoilee
+    assert une_vue.nombre_mines_voisines == 2
+    assert une_vue.basculer_drapeau() and grille[1] & BIT_DRAPEAU
     
     print('Tests réussis!')
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe DevoilementProgressif. Un très grand dévoilement en cascade est
+fait par tranches (voir Tableau.devoiler_par_tranches), réparties sur plusieurs tours de la boucle d'évènements
+de Tk: entre deux étapes, la fenêtre peut se redessiner, répondre aux clics et faire avancer le chronomètre.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+from time import perf_counter
+
+# Durée maximale (en secondes) d'une étape du dévoilement progressif, pour que la fenêtre reste fluide
+BUDGET_ETAPE = 0.012
+
+# Délai (en millisecondes) entre deux étapes, pendant lequel Tk traite les autres évènements
+DELAI_ETAPE = 1
+
+
+class DevoilementProgressif:
+    """
+    Ordonnanceur des dévoilements en cascade en cours. À chaque étape, planifiée avec la méthode after d'un
+    widget, on prend des tranches des dévoilements en cours tant que le budget de l'étape n'est pas écoulé,
+    puis on passe toutes les cases dévoilées à une fonction de rappel (par exemple, pour les dessiner).
+
+    Attributes:
+        widget (Misc): Le widget Tkinter dont la méthode after planifie les étapes
+        a_chaque_etape (callable): Fonction appelée à la fin de chaque étape avec la liste des cases dévoilées
+                                   (ou None, si on suit plutôt les évènements du tableau)
+        budget (float): Durée maximale d'une étape, en secondes
+        devoilements (list): Les dévoilements en cours (générateurs de tranches), dans l'ordre des clics
+        tache (str): L'identifiant de la prochaine étape planifiée (ou None)
+        duree_max_etape (float): Durée de l'étape la plus longue, en secondes
+        nombre_etapes (int): Nombre d'étapes exécutées
+    """
+
+    def __init__(self, widget, a_chaque_etape=None, budget=BUDGET_ETAPE):
+        """
+        Initialisation d'un ordonnanceur sans dévoilement en cours.
+
+        Args:
+            widget (Misc): Le widget Tkinter dont la méthode after planifie les étapes
+            a_chaque_etape (callable): Fonction appelée avec la liste des cases dévoilées à chaque étape (par
+                                       défaut, aucune: les tranches sont aussi publiées par le tableau)
+            budget (float): Durée maximale d'une étape, en secondes (par défaut, BUDGET_ETAPE)
+        """
+        self.widget = widget
+        self.a_chaque_etape = a_chaque_etape
+        self.budget = budget
+        self.devoilements = []
+        self.tache = None
+        self.duree_max_etape = 0.0
+        self.nombre_etapes = 0
+
+    @property
+    def en_cours(self):
+        """bool: True s'il reste des tranches à dévoiler"""
+        return bool(self.devoilements)
+
+    def ajouter(self, tranches):
+        """
+        Ajoute un dévoilement dont la première tranche a déjà été traitée; la suite sera dévoilée aux
+        prochaines étapes.
+
+        Args:
+            tranches (generator): Les tranches restantes du dévoilement (voir Tableau.devoiler_par_tranches)
+        """
+        self.devoilements.append(tranches)
+        if self.tache is None:
+            self.tache = self.widget.after(DELAI_ETAPE, self.executer_etape)
+
+    def executer_etape(self):
+        """
+        Exécute une étape: dévoile des tranches jusqu'à ce que le budget soit écoulé ou qu'il n'y ait plus de
+        dévoilement en cours, passe les cases dévoilées à a_chaque_etape, puis planifie l'étape suivante.
+        """
+        self.tache = None
+        debut = perf_counter()
+        cases_devoilees = []
+
+        # au moins une tranche par étape, même si le budget est déjà écoulé
+        while self.devoilements:
+            tranche = next(self.devoilements[0], None)
+            if tranche is None:
+                self.devoilements.pop(0)
+            else:
+                cases_devoilees += tranche
+                if perf_counter() - debut >= self.budget:
+                    break
+
+        if self.a_chaque_etape is not None:
+            self.a_chaque_etape(cases_devoilees)
+
+        self.nombre_etapes += 1
+        self.duree_max_etape = max(self.duree_max_etape, perf_counter() - debut)
+
+        # les dévoilements peuvent avoir été annulés pendant l'étape (par exemple, à la fin de la partie)
+        if self.devoilements and self.tache is None:
+            self.tache = self.widget.after(DELAI_ETAPE, self.executer_etape)
+
+    def terminer(self):
+        """
+        Dévoile immédiatement tout ce qui reste (sans étapes), par exemple avant de sauvegarder la partie.
+        """
+        while self.devoilements:
+            self.executer_etape()
+
+    def annuler(self):
+        """
+        Abandonne les dévoilements en cours et l'étape planifiée (par exemple, au début d'une nouvelle partie).
+        """
+        self.devoilements.clear()
+        if self.tache is not None:
+            self.widget.after_cancel(self.tache)
+            self.tache = None
+
+
+#### Tests unitaires ###
+
+class WidgetSansAffichage:
+    """
+    Remplace un widget Tkinter pour les tests: les fonctions planifiées avec after sont gardées dans une liste
+    et exécutées par executer().
+    """
+
+    def __init__(self):
+        self.planifiees = {}
+
+    def after(self, delai, fonction):
+        identifiant = str(len(self.planifiees) + 1)
+        self.planifiees[identifiant] = fonction
+        return identifiant
+
+    def after_cancel(self, identifiant):
+        del self.planifiees[identifiant]
+
+    def executer(self):
+        while self.planifiees:
+            self.planifiees.pop(next(iter(self.planifiees)))()
+
+
+def test_devoilement_progressif():
+    from tableau import Tableau
+
+    tableau = Tableau(200, 200, 0)
+    widget = WidgetSansAffichage()
+    etapes = []
+    devoilement = DevoilementProgressif(widget, etapes.append, budget=0)
+
+    tranches = tableau.devoiler_par_tranches(1, 1, 1000)
+    premiere_tranche = next(tranches)
+    devoilement.ajouter(tranches)
+    assert devoilement.en_cours and tableau.contient_cases_a_devoiler()
+
+    # avec un budget nul, chaque étape ne dévoile qu'une tranche; à la fin, tout le tableau est dévoilé
+    widget.executer()
+    assert not devoilement.en_cours and not tableau.contient_cases_a_devoiler()
+    assert len(premiere_tranche) + sum(map(len, etapes)) == 200 * 200
+    assert devoilement.nombre_etapes == len(etapes) > 10
+
+def test_annuler():
+    from tableau import Tableau
+
+    tableau = Tableau(100, 100, 0)
+    widget = WidgetSansAffichage()
+    devoilement = DevoilementProgressif(widget, budget=0)
+    tranches = tableau.devoiler_par_tranches(1, 1, 100)
+    next(tranches)
+    devoilement.ajouter(tranches)
+
+    devoilement.annuler()
+    assert not devoilement.en_cours and not widget.planifiees
+
+    # terminer dévoile tout ce qui reste, sans attendre la boucle d'évènements
+    devoilement.ajouter(tranches)
+    devoilement.terminer()
+    assert not devoilement.en_cours and not tableau.contient_cases_a_devoiler()
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_devoilement_progressif()
+    test_annuler()
+    print('Tests réussis!')
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant les évènements publiés par un tableau (voir Tableau.evenements) et la classe BusEvenements,
+qui les transmet aux abonnés. Une interface (Tk, texte, réseau) ou un enregistreur de parties s'abonne aux
+évènements qui l'intéressent plutôt que de parcourir le tableau pour trouver ce qui a changé.
+
+Les évènements d'une même action du joueur (un clic, ou une tranche d'un dévoilement progressif) sont publiés
+ensemble, en une seule liste: chaque abonné n'est appelé qu'une fois par action.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+from collections import namedtuple
+
+# Des cases ont été dévoilées (indices dans la grille du tableau, sans doublon)
+CasesDevoilees = namedtuple('CasesDevoilees', 'indices')
+
+# Un drapeau a été posé (drapeau est True) ou enlevé (drapeau est False) sur une case
+DrapeauBascule = namedtuple('DrapeauBascule', 'indice drapeau')
+
+# Toutes les cases sans mine ont été dévoilées
+PartieGagnee = namedtuple('PartieGagnee', '')
+
+# Le joueur a tenté de dévoiler une case minée
+PartiePerdue = namedtuple('PartiePerdue', 'indice')
+
+# Un nouveau tableau remplace l'ancien (nouvelle partie ou partie sauvegardée rétablie)
+TableauReinitialise = namedtuple('TableauReinitialise', 'tableau')
+
+
+class BusEvenements:
+    """
+    Bus qui transmet les évènements d'un tableau à ses abonnés. Un abonné est une fonction qui reçoit la liste
+    des évènements d'une action, en ne gardant que les types d'évènements auxquels il s'est abonné.
+
+    Attributes:
+        abonnes (list): Les abonnés, sous forme de tuples (fonction, types d'évènements); un tuple de types
+                        vide veut dire tous les types
+    """
+
+    def __init__(self):
+        """
+        Initialisation d'un bus sans abonné.
+        """
+        self.abonnes = []
+
+    def abonner(self, fonction, *types):
+        """
+        Abonne une fonction aux évènements de certains types (par défaut, de tous les types).
+
+        Args:
+            fonction (callable): Fonction appelée avec la liste des évènements d'une action
+            *types (type): Les types d'évènements reçus (par exemple, CasesDevoilees, PartieGagnee)
+        """
+        self.abonnes.append((fonction, types))
+
+    def desabonner(self, fonction):
+        """
+        Retire tous les abonnements d'une fonction.
+
+        Args:
+            fonction (callable): La fonction abonnée
+        """
+        self.abonnes = [(abonne, types) for abonne, types in self.abonnes if abonne != fonction]
+
+    def publier(self, evenements):
+        """
+        Transmet les évènements d'une action à chacun des abonnés (dans l'ordre des abonnements). Un abonné
+        n'est pas appelé si aucun des évènements n'est d'un type qui l'intéresse.
+
+        Args:
+            evenements (list): Les évènements de l'action, dans l'ordre où ils se sont produits
+        """
+        for fonction, types in tuple(self.abonnes):
+            recus = [evenement for evenement in evenements if isinstance(evenement, types)] if types else evenements
+            if recus:
+                fonction(recus)
+
+
+#### Tests unitaires ###
+
+def test_bus():
+
+    bus = BusEvenements()
+    tous, fins = [], []
+    bus.abonner(tous.append)
+    bus.abonner(fins.append, PartieGagnee, PartiePerdue)
+
+    # chaque abonné reçoit une seule liste par action, filtrée selon ses types
+    bus.publier([CasesDevoilees([8, 9]), PartieGagnee()])
+    bus.publier([DrapeauBascule(10, True)])
+    assert tous == [[CasesDevoilees([8, 9]), PartieGagnee()], [DrapeauBascule(10, True)]]
+    assert fins == [[PartieGagnee()]]
+
+    # un abonné retiré ne reçoit plus rien
+    bus.desabonner(tous.append)
+    bus.publier([PartiePerdue(12)])
+    assert len(tous) == 2 and fins == [[PartieGagnee()], [PartiePerdue(12)]]
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_bus()
+    print('Tests réussis!')
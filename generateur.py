@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe GenerateurMines. Le générateur choisit les cases minées d'un
+tableau à partir d'une graine, sans état: il mélange les numéros de case avec une permutation pseudo-aléatoire
+(un réseau de Feistel) et les mines sont les cases dont le rang est le plus petit. On peut donc savoir si une
+case est minée sans générer le reste du tableau, et générer des régions d'un même tableau en parallèle
+(voir tableau.generer_region).
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+MASQUE_64 = (1 << 64) - 1
+
+# Multiplicateur (impair) de la fonction de tour du réseau de Feistel
+MULTIPLICATEUR = 0x9E3779B97F4A7C15
+
+# Nombre de tours du réseau de Feistel
+NOMBRE_TOURS = 4
+
+
+def melanger(valeur):
+    """
+    Fonction de mélange d'un entier de 64 bits (finaliseur de SplitMix64).
+
+    Args:
+        valeur (int): L'entier à mélanger
+
+    Returns:
+        int: Un entier de 64 bits qui dépend de tous les bits de la valeur
+    """
+    valeur = (valeur + 0x9E3779B97F4A7C15) & MASQUE_64
+    valeur = ((valeur ^ (valeur >> 30)) * 0xBF58476D1CE4E5B9) & MASQUE_64
+    valeur = ((valeur ^ (valeur >> 27)) * 0x94D049BB133111EB) & MASQUE_64
+    return valeur ^ (valeur >> 31)
+
+
+class GenerateurMines:
+    """
+    Générateur de mines basé sur une permutation des numéros de case. Les cases d'un tableau sont numérotées
+    de 0 à nombre_cases - 1, rangée par rangée: la case (x, y) a le numéro (x - 1) * dimension_colonne + y - 1.
+    La permutation donne à chaque case un rang unique, et un tableau de M mines contient les M cases de plus
+    petit rang (en excluant les cases protégées autour du premier clic, voir calculer_seuil).
+
+    Attributes:
+        graine (int): La graine qui détermine la permutation
+        nombre_cases (int): Nombre de cases du tableau
+        bits_gauche (int): Nombre de bits de la moitié de gauche du réseau de Feistel
+        bits_droite (int): Nombre de bits de la moitié de droite (bits_gauche ou bits_gauche + 1)
+        cles (tuple): Clé de chacun des tours, dérivées de la graine
+    """
+
+    def __init__(self, graine, nombre_cases):
+        """
+        Initialisation du générateur.
+
+        Args:
+            graine (int): La graine du tableau
+            nombre_cases (int): Nombre de cases du tableau
+        """
+        self.graine = graine
+        self.nombre_cases = nombre_cases
+
+        # le réseau de Feistel permute les entiers du plus petit nombre de bits qui couvre tous les numéros de
+        # case; si ce nombre est impair, la moitié de droite a un bit de plus que celle de gauche
+        bits = max(2, (nombre_cases - 1).bit_length())
+        self.bits_gauche = bits // 2
+        self.bits_droite = bits - self.bits_gauche
+
+        cle = graine & MASQUE_64
+        self.cles = tuple(melanger(cle ^ melanger(tour)) for tour in range(NOMBRE_TOURS))
+
+    def permuter(self, valeur):
+        """
+        Applique une fois le réseau de Feistel à un entier. À chaque tour, les deux moitiés sont échangées (et
+        leurs tailles aussi); comme le nombre de tours est pair, elles retrouvent leur taille à la fin.
+
+        Args:
+            valeur (int): Un entier de bits_gauche + bits_droite bits
+
+        Returns:
+            int: L'entier permuté
+        """
+        bits_gauche, bits_droite = self.bits_gauche, self.bits_droite
+        gauche, droite = valeur >> bits_droite, valeur & ((1 << bits_droite) - 1)
+        for cle in self.cles:
+            # fonction de tour: les bits de poids fort du produit de la moitié de droite (mêlée à la clé)
+            gauche, droite = droite, gauche ^ ((((droite ^ cle) * MULTIPLICATEUR) & MASQUE_64) >> (64 - bits_gauche))
+            bits_gauche, bits_droite = bits_droite, bits_gauche
+        return (gauche << bits_droite) | droite
+
+    def permuter_inverse(self, valeur):
+        """
+        Applique une fois l'inverse du réseau de Feistel à un entier.
+
+        Args:
+            valeur (int): Un entier de bits_gauche + bits_droite bits
+
+        Returns:
+            int: L'entier tel que permuter(entier) == valeur
+        """
+        bits_gauche, bits_droite = self.bits_gauche, self.bits_droite
+        gauche, droite = valeur >> bits_droite, valeur & ((1 << bits_droite) - 1)
+        for cle in reversed(self.cles):
+            gauche, droite = droite ^ ((((gauche ^ cle) * MULTIPLICATEUR) & MASQUE_64) >> (64 - bits_droite)), gauche
+            bits_gauche, bits_droite = bits_droite, bits_gauche
+        return (gauche << bits_droite) | droite
+
+    def obtenir_rang(self, numero_case):
+        """
+        Calcule le rang d'une case. Comme le réseau de Feistel permute un intervalle plus grand que le nombre de
+        cases, on le réapplique tant que le résultat n'est pas un numéro de case valide.
+
+        Args:
+            numero_case (int): Le numéro de la case (entre 0 et nombre_cases - 1)
+
+        Returns:
+            int: Le rang de la case (entre 0 et nombre_cases - 1)
+        """
+        rang = self.permuter(numero_case)
+        while rang >= self.nombre_cases:
+            rang = self.permuter(rang)
+        return rang
+
+    def obtenir_numero_case(self, rang):
+        """
+        Trouve la case qui a un rang donné (l'inverse de obtenir_rang).
+
+        Args:
+            rang (int): Le rang de la case (entre 0 et nombre_cases - 1)
+
+        Returns:
+            int: Le numéro de la case
+        """
+        numero_case = self.permuter_inverse(rang)
+        while numero_case >= self.nombre_cases:
+            numero_case = self.permuter_inverse(numero_case)
+        return numero_case
+
+    def calculer_seuil(self, nombre_mines, numeros_proteges):
+        """
+        Calcule le rang sous lequel les cases sont minées. Sans case protégée, c'est le nombre de mines; chaque
+        case protégée dont le rang est sous le seuil le repousse d'une case, pour qu'il y ait exactement
+        nombre_mines cases minées parmi les cases non protégées.
+
+        Args:
+            nombre_mines (int): Nombre de mines du tableau
+            numeros_proteges (list): Numéros des cases qui ne doivent pas être minées
+
+        Returns:
+            int: Le seuil: une case non protégée est minée si et seulement si son rang est plus petit
+        """
+        seuil = nombre_mines
+        for rang in sorted(self.obtenir_rang(numero_case) for numero_case in numeros_proteges):
+            if rang < seuil:
+                seuil += 1
+        return seuil
+
+
+#### Tests unitaires ###
+
+def test_permutation():
+
+    for nombre_cases in (1, 2, 3, 25, 400, 1000):
+        generateur = GenerateurMines(42, nombre_cases)
+        rangs = [generateur.obtenir_rang(numero_case) for numero_case in range(nombre_cases)]
+        assert sorted(rangs) == list(range(nombre_cases))
+        assert all(generateur.obtenir_numero_case(rang) == numero_case for numero_case, rang in enumerate(rangs))
+
+    # la permutation dépend de la graine
+    assert [GenerateurMines(1, 400).obtenir_rang(numero) for numero in range(20)] != \
+           [GenerateurMines(2, 400).obtenir_rang(numero) for numero in range(20)]
+
+def test_calculer_seuil():
+
+    generateur = GenerateurMines(3, 100)
+    numeros_proteges = [generateur.obtenir_numero_case(rang) for rang in (0, 5, 50)]
+    seuil = generateur.calculer_seuil(10, numeros_proteges)
+    assert seuil == 12
+    mines = [numero for numero in range(100)
+             if generateur.obtenir_rang(numero) < seuil and numero not in numeros_proteges]
+    assert len(mines) == 10
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_permutation()
+    test_calculer_seuil()
+    print('Tests réussis!')
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la génération de tableaux par lots (pour des tournois ou pour comparer des solveurs).
+Les tableaux d'un lot sont générés par paquets, répartis entre plusieurs processus, et retournés au fur et à
+mesure sous forme compacte: la grille d'octets de chaque tableau (voir Tableau.grille), plutôt que des objets
+Tableau ou Case. Seuls quelques paquets sont en cours à la fois, pour que la mémoire reste la même peu importe
+la taille du lot.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from random import getrandbits
+from generateur import melanger, MASQUE_64
+from tableau import Tableau
+
+
+def obtenir_graine_tableau(graine_lot, numero_tableau):
+    """
+    Calcule la graine d'un tableau d'un lot. Un lot est donc entièrement déterminé par sa graine, peu importe
+    le nombre de processus qui le génèrent.
+
+    Args:
+        graine_lot (int): La graine du lot
+        numero_tableau (int): Le numéro du tableau dans le lot (à partir de 0)
+
+    Returns:
+        int: La graine du tableau
+    """
+    return melanger((graine_lot ^ melanger(numero_tableau)) & MASQUE_64)
+
+
+def generer_paquet(dimension_rangee, dimension_colonne, nombre_mines, graines):
+    """
+    Génère un paquet de tableaux (sans zone protégée, voir Tableau.pregenerer) et colle leurs grilles bout à
+    bout. C'est la fonction exécutée par les processus: un seul bloc d'octets est retourné par paquet.
+
+    Args:
+        dimension_rangee (int): Nombre de rangées des tableaux
+        dimension_colonne (int): Nombre de colonnes des tableaux
+        nombre_mines (int): Nombre de mines des tableaux
+        graines (list): La graine de chacun des tableaux du paquet
+
+    Returns:
+        bytes: Les grilles des tableaux du paquet, l'une après l'autre
+    """
+    grilles = bytearray()
+    for graine in graines:
+        tableau = Tableau(dimension_rangee, dimension_colonne, nombre_mines, graine)
+        tableau.pregenerer()
+        grilles += tableau.grille
+    return bytes(grilles)
+
+
+def generer_lot(nombre_tableaux, dimension_rangee, dimension_colonne, nombre_mines, graine=None,
+                nombre_processus=None, taille_paquet=64):
+    """
+    Génère un lot de tableaux, dans l'ordre, en les retournant au fur et à mesure (générateur). Chaque tableau
+    est retourné avec sa graine: Tableau(dimension_rangee, dimension_colonne, nombre_mines, graine) suivi de
+    pregenerer() redonne exactement la même grille.
+
+    Args:
+        nombre_tableaux (int): Nombre de tableaux du lot
+        dimension_rangee (int): Nombre de rangées des tableaux
+        dimension_colonne (int): Nombre de colonnes des tableaux
+        nombre_mines (int): Nombre de mines des tableaux
+        graine (int): La graine du lot (par défaut, choisie au hasard)
+        nombre_processus (int): Nombre de processus (par défaut, le nombre de processeurs); avec 1 processus,
+                                les tableaux sont générés directement, sans processus supplémentaire
+        taille_paquet (int): Nombre de tableaux générés par chaque tâche envoyée à un processus
+
+    Returns:
+        generator: Des tuples (graine, grille), où grille est une vue (memoryview) sur les octets de la
+                   grille compacte du tableau
+    """
+    graine = getrandbits(64) if graine is None else graine
+    nombre_processus = nombre_processus or os.cpu_count() or 1
+    taille_grille = (dimension_rangee + 2) * (dimension_colonne + 2)
+
+    paquets = ([obtenir_graine_tableau(graine, numero)
+                for numero in range(debut, min(debut + taille_paquet, nombre_tableaux))]
+               for debut in range(0, nombre_tableaux, taille_paquet))
+
+    def decouper(graines, grilles):
+        vue = memoryview(grilles)
+        for position, graine_tableau in enumerate(graines):
+            yield graine_tableau, vue[position * taille_grille:(position + 1) * taille_grille]
+
+    if nombre_processus == 1:
+        for graines in paquets:
+            yield from decouper(graines, generer_paquet(dimension_rangee, dimension_colonne, nombre_mines, graines))
+        return
+
+    # au plus deux paquets en cours par processus: le lot n'est jamais entièrement en mémoire
+    with ProcessPoolExecutor(nombre_processus) as executeur:
+        en_cours = deque()
+        for graines in paquets:
+            en_cours.append((graines, executeur.submit(generer_paquet, dimension_rangee, dimension_colonne,
+                                                       nombre_mines, graines)))
+            if len(en_cours) >= 2 * nombre_processus:
+                graines_pretes, resultat = en_cours.popleft()
+                yield from decouper(graines_pretes, resultat.result())
+
+        while en_cours:
+            graines_pretes, resultat = en_cours.popleft()
+            yield from decouper(graines_pretes, resultat.result())
+
+
+#### Tests unitaires ###
+
+def test_generer_lot():
+
+    lot = list(generer_lot(10, 8, 6, 10, graine=4, nombre_processus=1, taille_paquet=3))
+    assert len(lot) == 10
+    assert len({graine for graine, _ in lot}) == 10
+
+    # chaque grille est celle du tableau de même graine
+    for graine, grille in lot:
+        tableau = Tableau(8, 6, 10, graine)
+        tableau.pregenerer()
+        assert grille == tableau.grille
+
+def test_generer_lot_parallele():
+
+    # le lot ne dépend que de sa graine, pas du nombre de processus ni de la taille des paquets
+    sequentiel = [(graine, bytes(grille)) for graine, grille in generer_lot(20, 5, 5, 5, graine=9, nombre_processus=1)]
+    parallele = [(graine, bytes(grille)) for graine, grille in generer_lot(20, 5, 5, 5, graine=9, nombre_processus=2,
+                                                                        taille_paquet=3)]
+    assert sequentiel == parallele
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_generer_lot()
+    test_generer_lot_parallele()
+    print('Tests réussis!')
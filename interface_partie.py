@@ -8,11 +8,51 @@ Auteurs: Pascal Germain, Kevin Jobin, Bruce Bouchard, François Dufour
 """
 
 # Importation des modules
+import os
+import shutil
 from tkinter import *
 from tkinter import messagebox, filedialog
+from time import monotonic
 from tableau import Tableau
-from bouton_case import BoutonCase
-import pygame
+from evenements import BusEvenements, CasesDevoilees, DrapeauBascule, PartieGagnee, TableauReinitialise
+from reserve_tableaux import ReserveTableaux
+from canevas_tableau import CanevasTableau
+from ressources import RegistreRessources
+from audio import ServiceAudio
+from devoilement_progressif import DevoilementProgressif
+from ordonnanceur_affichage import OrdonnanceurAffichage
+from sauvegarde import enregistrer_partie, enregistrer_partie_projetable, charger_partie, est_partie_projetable, \
+    PartieProjetee
+from journal import JournalPartie, recuperer_partie, enregistrer_partie_coups, charger_partie_coups, \
+    est_partie_coups, ACTION_DEVOILER, ACTION_POSER_DRAPEAU, ACTION_ENLEVER_DRAPEAU
+
+# Préréglages (rangées, colonnes, mines) gardés prêts dans la réserve de tableaux
+PREREGLAGES = ((5, 5, 5), (10, 10, 15), (19, 19, 60))
+
+# Nombre maximal de rangées et de colonnes d'une partie (seule la partie visible du tableau est dessinée)
+DIMENSION_MAX = 1000
+
+# Dimensions maximales (en pixels) de la partie visible du canevas: au-delà, on fait défiler le tableau
+LARGEUR_MAX_CANEVAS = 800
+HAUTEUR_MAX_CANEVAS = 560
+
+# Musique du jeu et effets sonores, chargés en arrière-plan par le service audio
+MUSIQUE = "super_lalonde.mp3"
+EFFETS_SONORES = ("sword_blade.wav", "victory-trumpets.wav", "explosion.wav")
+
+# Extension et types des fichiers de sauvegarde (les anciennes sauvegardes .txt peuvent encore être ouvertes).
+# Une partie enregistrée avec l'extension .dmc est sauvegardée par ses coups seulement (voir le module journal).
+EXTENSION_SAUVEGARDE = ".dmn"
+EXTENSION_COUPS = ".dmc"
+TYPES_SAUVEGARDE = (("Parties de démineur", "*.dmn"), ("Parties de démineur (coups seulement)", "*.dmc"),
+                    ("Anciennes sauvegardes", "*.txt"), ("Tous les fichiers", "*"))
+
+# Nombre de cases à partir duquel une partie est sauvegardée dans le format projetable (voir PartieProjetee)
+TAILLE_MIN_PROJECTION = 250000
+
+# Journal de la partie en cours (voir le module journal): il n'existe plus après une fermeture normale du jeu, et
+# permet de reprendre la partie après un arrêt brutal
+FICHIER_JOURNAL = os.path.join(os.path.expanduser("~"), ".demineur_journal.dmj")
 
 # Classe de l'interface
 class InterfacePartie(Tk):
@@ -33,8 +73,17 @@ class InterfacePartie(Tk):
         # Icône de l'interface
        self.iconphoto(Bool, image): Contient la photo de l'icône de l'application.
 
+        # Images et sons
+       self.ressources (RegistreRessources): Registre qui charge chaque image et chaque son une seule fois,
+                                             pour toutes les parties.
+       self.audio (ServiceAudio): Service qui démarre le son en arrière-plan et joue la musique et les effets
+                                  sonores (le jeu reste silencieux si le son n'est pas disponible).
+
         # Chronomètre
        self.chrono (int): Nombre (en secondes) de temps de jeu d'une partie.
+       self.debut_chrono (float): Moment (horloge monotone) où le chronomètre était à 0. Le chronomètre est
+                                  calculé à partir de ce moment: il ne dérive pas si la fenêtre est occupée.
+       self.tache_chrono (str): Identifiant du prochain appel planifié de la méthode incremente.
        self.label_chrono (Label): Étiquette qui contient le chronomèetre.
 
         # Compteur de tour
@@ -46,21 +95,37 @@ class InterfacePartie(Tk):
        self.score_label (Label): Étiquette qui contient le score de la partie précédente.
 
         # Tableau du jeu
-       self.cadre (Frame): Cadre qui contient toutes les cases du jeu.
+       self.reserve_tableaux (ReserveTableaux): Réserve de tableaux préparés en arrière-plan pour les
+                                                préréglages les plus courants.
+       self.cadre (Frame): Cadre qui contient le canevas du jeu et ses barres de défilement.
        self.tableau_mines (Tableau): Instance de la classe Tableau, c'est lui qui contient la logique du
                                      jeu de démineur. (voir docstring Tableau() )
-
-       self.dictionnaire_boutons (Dict): Un dictionnaire qui contient les cases (qui sont instances de
-                                         la classe BoutonCase). Chaque clé correspond aux coordonnées (x,y)
-                                         de la case et est associée à une case (objet BoutonCase).
-
-                                         Ex: { (1,1) : <objet BoutonCase> , ... (x,y) : <objet BoutonCase> }
+       self.partie_projetee (PartieProjetee): La sauvegarde (dans le format projetable) qui sert de grille au
+                                              tableau de la partie en cours, ou None. Les cases dévoilées y
+                                              sont écrites sur place.
+       self.journal (JournalPartie): Le journal de la partie en cours, auquel chaque action du joueur est
+                                     ajoutée (sauvegarde automatique), ou None s'il n'a pas pu être créé.
+       self.evenements (BusEvenements): Bus sur lequel le tableau de la partie en cours publie ses évènements;
+                                        l'interface y est abonnée (voir recevoir_evenements).
+
+       self.canevas (CanevasTableau): Le canevas sur lequel toutes les cases du jeu sont dessinées. Un clic
+                                      sur le canevas est associé à une case par sa position.
+       self.devoilement (DevoilementProgressif): Ordonnanceur qui dévoile les grandes cascades par tranches,
+                                                 sur plusieurs tours de la boucle d'évènements, pour que la
+                                                 fenêtre reste fluide.
+       self.affichage (OrdonnanceurAffichage): Ordonnanceur qui regroupe les changements de l'affichage (textes
+                                               du compteur, du chronomètre et du score, cases du canevas) et
+                                               les applique au plus une fois par image.
 
     """
 
-    def __init__(self):
+    def __init__(self, audio_differe=True):
         """
-        Initialisation (constructeur) de l'objet InterfacePartie(Tk) avec des valeurs par défaut (aucun argument).
+        Initialisation (constructeur) de l'objet InterfacePartie(Tk) avec des valeurs par défaut.
+
+        Args:
+            audio_differe (bool): True pour démarrer le son en arrière-plan, sans retarder l'affichage de la
+                                  fenêtre (par défaut), False pour l'attendre (voir le banc d'essai demarrage)
         """
         # On appele le constructeur de la classe mère Tk
         super().__init__()
@@ -72,14 +137,17 @@ class InterfacePartie(Tk):
         self.geometry("400x400")
         self.resizable(0, 0)
 
+        # Registre des images et des sons du jeu, chargés une seule fois
+        self.ressources = RegistreRessources(self)
+
         # Icone de l'application
-        icon_top = PhotoImage(file="png/smile.png")
-        self.iconphoto(True, icon_top)
+        self.iconphoto(True, self.ressources.obtenir_image("png/smile.png"))
+
+        # À la fermeture de la fenêtre, on libère les ressources du jeu
+        self.protocol("WM_DELETE_WINDOW", self.fermer)
 
-        # Musique du jeu (fonctions du module pygame)
-        pygame.mixer.init()
-        pygame.mixer.music.load("super_lalonde.mp3")
-        pygame.mixer.music.play(-1)
+        # Musique et effets sonores du jeu, démarrés en arrière-plan (la fenêtre s'affiche sans les attendre)
+        self.audio = ServiceAudio(self.ressources, MUSIQUE, EFFETS_SONORES, differe=audio_differe)
 
         # Cadre qui contient les boutons principaux du menu de la partie
         bouton_frame = Frame(self)
@@ -113,7 +181,8 @@ class InterfacePartie(Tk):
         self.chrono = 0
 
         # On part le chronomètre après une seconde
-        self.after(1000, self.incremente)
+        self.debut_chrono = monotonic()
+        self.tache_chrono = self.after(1000, self.incremente)
 
         # Label (étiquette) du Chrono
         self.label_chrono = Button(frame_compteurs, text="Temps: " + str(self.chrono) + " secs", state='disabled')
@@ -137,31 +206,47 @@ class InterfacePartie(Tk):
         self.cadre = Frame(self, padx=20, pady=10)
         self.cadre.pack()
 
-        # Dictionnaire dans lequel on retrouve toutes les cases du jeu
-        self.dictionnaire_boutons = {}
+        # Réserve de tableaux, préparés en arrière-plan pour que les nouvelles parties débutent sans attente
+        self.reserve_tableaux = ReserveTableaux(PREREGLAGES)
 
         # Initialisation du tableau qui contient l'information des cases
         self.tableau_mines = Tableau()
-
-        # pour chaque rangée de 0 à (nb. de rangée - 1)
-        for i in range(self.tableau_mines.dimension_rangee):
-
-            # pour chaque colonne de 0 à (nb. de colonne - 1)
-            for j in range(self.tableau_mines.dimension_colonne):
-
-                # On va placer une case qui sera une instance de BoutonCase (widget bouton)
-                bouton = BoutonCase(self.cadre, i + 1, j + 1)
-                bouton.grid(row=i, column=j)
-
-                # On 'bind' le clic gauche de la souris à la fonction qui dévoile la case
-                bouton.bind('<Button-1>', self.devoiler_case)
-
-                # On 'bind' le clic droit de la souris à la fonction qui met ou enlève un drapeau
-                bouton.bind('<Button-2>', self.mettre_drapeau)
-                bouton.bind('<Button-3>', self.mettre_drapeau)
-
-                # On place la case/bouton dans le dictionnaire de bouton
-                self.dictionnaire_boutons[(i + 1, j + 1)] = bouton
+        self.partie_projetee = None
+
+        # Le canevas sur lequel on dessine toutes les cases du jeu, avec ses barres de défilement
+        self.canevas = CanevasTableau(self.cadre, self.tableau_mines, self.ressources)
+        self.canevas.grid(row=0, column=0)
+        barre_verticale = Scrollbar(self.cadre, orient=VERTICAL)
+        barre_verticale.grid(row=0, column=1, sticky=NS)
+        barre_horizontale = Scrollbar(self.cadre, orient=HORIZONTAL)
+        barre_horizontale.grid(row=1, column=0, sticky=EW)
+        self.canevas.associer_barres_defilement(barre_horizontale, barre_verticale)
+        self.ajuster_canevas()
+
+        # Les changements de l'affichage sont regroupés et appliqués au plus une fois par image
+        self.affichage = OrdonnanceurAffichage(self.canevas)
+
+        # Les grandes cascades sont dévoilées par tranches (le tableau publie les cases de chaque tranche)
+        self.devoilement = DevoilementProgressif(self)
+
+        # On suit les évènements du tableau (cases dévoilées, drapeaux, fin de la partie) plutôt que de le
+        # parcourir pour trouver ce qui a changé
+        self.evenements = BusEvenements()
+        self.evenements.abonner(self.recevoir_evenements)
+        self.tableau_mines.associer_evenements(self.evenements)
+
+        # On journalise la partie; si le jeu a été interrompu brutalement, on propose d'abord de reprendre la
+        # partie interrompue à partir de son journal
+        self.journal = None
+        if not self.reprendre_partie_interrompue():
+            self.commencer_journal()
+
+        # On 'bind' le clic gauche de la souris à la fonction qui dévoile la case
+        self.canevas.bind('<Button-1>', self.devoiler_case)
+
+        # On 'bind' le clic droit de la souris à la fonction qui met ou enlève un drapeau
+        self.canevas.bind('<Button-2>', self.mettre_drapeau)
+        self.canevas.bind('<Button-3>', self.mettre_drapeau)
 
     def nouvelle_partie(self):
         """
@@ -171,11 +256,6 @@ class InterfacePartie(Tk):
         command: le clic du bouton_nouvelle_partie (Button) déclenche la méthode
         """
 
-        # On initialise le compteur de tour à 0
-        self.compteur = 0
-        self.bouton_compteur['text'] = 'Tour: ' + str(self.compteur)
-        self.bouton_compteur.pack(side=TOP)
-
         # On ouvre une fenêtre secondaire d'options de jeu
         self.fenetre_options = Toplevel(self)
         self.fenetre_options.title("Options de Jeu")
@@ -245,13 +325,26 @@ class InterfacePartie(Tk):
         bouton_frame.pack(side=TOP, padx=20, pady=20)
 
         # Bouton oui
-        bouton_oui = Button(bouton_frame, text="Oui", padx=10, pady=10, command=self.quit)
+        bouton_oui = Button(bouton_frame, text="Oui", padx=10, pady=10, command=self.fermer)
         bouton_oui.pack(side=LEFT)
 
         # Bouton non
         bouton_non = Button(bouton_frame, text="Non", padx=10, pady=10, command=self.fenetre_quitter.destroy)
         bouton_non.pack(side=LEFT)
 
+    def fermer(self):
+        """
+        Méthode qui termine le jeu: on arrête la réserve de tableaux, on ferme la partie projetée (s'il y a
+        lieu) et on supprime le journal (il n'y a pas de partie interrompue à reprendre), on libère les
+        images et les sons, on arrête le son, puis on quitte la boucle principale de la fenêtre.
+        """
+        self.reserve_tableaux.fermer()
+        self.fermer_partie_projetee()
+        self.fermer_journal(supprimer=True)
+        self.ressources.liberer()
+        self.audio.fermer()
+        self.quit()
+
     def valider_dimensions(self, rangee, colonne, mines):
         """
         Fonction qui valide les coordonnées entrées par l'utilisateur et affiche un message d'erreur si ce
@@ -267,8 +360,8 @@ class InterfacePartie(Tk):
 
         # Message d'erreur si les entrées sont invalides
         message_erreur = """S'il vous plait, entrez des dimensions valides de jeu:\n
-        - Le nombre de rangée/colonne entre 3 et 20\n
-        - Le nombre de mines ne doit pas être nul ou excédé le nombre de cases"""
+        - Le nombre de rangée/colonne entre 3 et {}\n
+        - Le nombre de mines ne doit pas être nul ou excédé le nombre de cases""".format(DIMENSION_MAX)
 
         # Bloc de gestion de l'exception
         try:
@@ -276,9 +369,11 @@ class InterfacePartie(Tk):
             # On convertit les choix en nombre, si l'utilisateur a entré des chiffres. Sinon, on demander de recommencer.
             rangee, colonne, mines = int(rangee), int(colonne), int(mines)
 
-            # On vérifie que les choix soient entre 3 et 20 et que le nombre de mines ne dépasse pas le nombre de cases.
+            # On vérifie que les choix soient entre 3 et DIMENSION_MAX et que le nombre de mines ne dépasse pas le
+            # nombre de cases.
 
-            if rangee >= 20 or colonne >= 20 or (mines > rangee * colonne) or rangee < 3 or colonne < 3 or mines < 1:
+            if rangee > DIMENSION_MAX or colonne > DIMENSION_MAX or (mines > rangee * colonne) or rangee < 3 \
+                    or colonne < 3 or mines < 1:
 
                 # si c'est le cas, les entrées ne sont pas valide et on doit recommencer
                 messagebox.showerror("Erreur de dimensions", message_erreur)
@@ -322,225 +417,245 @@ class InterfacePartie(Tk):
 
         """
 
-        # On ajuste la grosseur de la fenêtre en fonction du nombre de case
-        grandeur_colonne = int(colonne) * 80
-        grandeur_rangee = int(rangee) * 80
-        grandeur = "{}x{}".format(grandeur_rangee, grandeur_colonne)
-        self.geometry(grandeur)
-
-        # On efface l'ancienne partie, puis on commencer la nouvelle
-        if hasattr(self, 'tableau_mines'):
-            for i in range(self.tableau_mines.dimension_rangee):
-                for j in range(self.tableau_mines.dimension_colonne):
-                    self.dictionnaire_boutons[(i + 1, j + 1)].grid_forget()
-            del self.dictionnaire_boutons
-            del self.tableau_mines
-            self.cadre.grid_forget()
-
-        # Initialisation du tableau de mines du jeu et du dictonnaire_boutons
-        self.tableau_mines = Tableau(int(rangee), int(colonne), int(mines))
-        self.dictionnaire_boutons = {}
-
-        # pour chaque rangée de 0 à (nb. de rangée - 1)
-        for i in range(self.tableau_mines.dimension_rangee):
-            # pour chaque colonne de 0 à (nb. de colonne - 1)
-            for j in range(self.tableau_mines.dimension_colonne):
-                # On va placer une case qui sera un widget bouton
-                bouton = BoutonCase(self.cadre, i + 1, j + 1)
-                bouton.grid(row=i, column=j)
-                bouton.bind('<Button-1>', self.devoiler_case)
-                bouton.bind('<Button-2>', self.mettre_drapeau)
-                bouton.bind('<Button-3>', self.mettre_drapeau)
-                self.dictionnaire_boutons[(i + 1, j + 1)] = bouton
+        # Initialisation du tableau de mines du jeu (pris dans la réserve), qui remplace l'ancienne partie. On
+        # le branche sur le bus d'évènements de l'interface, qui dessine alors le nouveau tableau.
+        self.tableau_mines = self.reserve_tableaux.obtenir_tableau(int(rangee), int(colonne), int(mines))
+        self.tableau_mines.associer_evenements(self.evenements)
+        self.fermer_partie_projetee()
 
-        # Si le chronomètre n'est pas déjà à 0, on le redémarre
-        if self.chrono != 0:
-            self.chrono = 0
+        # On initialise le compteur de tour à 0 et on redémarre le chronomètre à 0
+        self.compteur = 0
+        self.affichage.changer_texte(self.bouton_compteur, 'Tour: ' + str(self.compteur))
+        self.redemarrer_chrono(0)
 
-    def retablir_sauvegarde(self, contenu_partie):
+        # On commence le journal de la nouvelle partie
+        self.commencer_journal()
 
+    def retablir_sauvegarde(self, tableau, compteur, chrono, partie_projetee=None, actions=None):
         """
-        Méthode qui reçoit une sauvegarde de partie, quitte la partie en cours et charge la partie
-        sauvegardée dans la fenêtre principale du jeu.
+        Méthode qui reçoit une partie sauvegardée (voir le module sauvegarde), quitte la partie en cours et
+        charge la partie sauvegardée dans la fenêtre principale du jeu.
 
         Args:
-                contenu_partie (dict): Un dictionnaire qui contient une sauvegarde de
-                                      la partie.
-
+            tableau (Tableau): Le tableau de la partie sauvegardée, avec ses cases déjà rétablies
+            compteur (int): Nombre de tours joués
+            chrono (int): Temps de jeu, en secondes
+            partie_projetee (PartieProjetee): La sauvegarde projetée qui sert de grille au tableau (ou None)
+            actions (list): Les actions qui ont mené au tableau, pour une partie sauvegardée par ses coups (ou None)
         """
 
-        # On rétablit les valeurs du compteur de tour et du chronomètre
-        self.chrono, self.compteur = contenu_partie['chrono'],\
-                                     contenu_partie['compteur']
-        self.bouton_compteur['text'] = 'Tour: ' + str(self.compteur)
-        self.bouton_compteur.pack(side=LEFT)
-
-        # On convertit les valeurs des options de jeu en nombre (int)
-        rangee, colonne, nombre_mines = int(contenu_partie['dimension_rangee']),\
-                                        int(contenu_partie['dimension_colonne']),\
-                                        int(contenu_partie['nombre_mines'])
-
-        # On reconvertit le dictionnaire de case (str) en objet Dict
-        dictionnaire_info_case = dict(contenu_partie['dictionnaire'])
+        # On branche le tableau rétabli sur le bus d'évènements de l'interface, qui le dessine (avec les cases
+        # préalablement dévoilées), puis on ferme l'ancienne partie projetée, s'il y a lieu
+        self.tableau_mines = tableau
+        self.tableau_mines.associer_evenements(self.evenements)
+        self.fermer_partie_projetee()
+        self.partie_projetee = partie_projetee
 
-        # On ajuste la grosseur de la fenêtre en fonction du nombre de case
-        grandeur_colonne = int(colonne) * 80
-        grandeur_rangee = int(rangee) * 80
-        grandeur = "{}x{}".format(grandeur_rangee, grandeur_colonne)
-        self.geometry(grandeur)
-
-        # On efface l'ancienne partie, puis on commencer la nouvelle
-        if hasattr(self, 'tableau_mines'):
-            for i in range(self.tableau_mines.dimension_rangee):
-                for j in range(self.tableau_mines.dimension_colonne):
-                    self.dictionnaire_boutons[(i + 1, j + 1)].grid_forget()
-            del self.dictionnaire_boutons
-            del self.tableau_mines
-            self.cadre.grid_forget()
-
-        # Initialisation du tableau de mines du jeu et du dictonnaire_boutons
-        self.tableau_mines = Tableau(rangee, colonne, nombre_mines)
-
-        # On rétablit l'état de chacun des cases du jeu
-        for case in dictionnaire_info_case:
+        # On rétablit les valeurs du compteur de tour et du chronomètre
+        self.compteur = compteur
+        self.affichage.changer_texte(self.bouton_compteur, 'Tour: ' + str(self.compteur))
+        self.redemarrer_chrono(chrono)
 
-            # On va chercher dans le tableau l'objet case correspondante aux coordonnées données par le dictionnaire
-            objet_case = self.tableau_mines.dictionnaire_cases[case]
+        # On commence le journal de la partie rétablie (par ses coups s'ils sont connus, sinon par un instantané
+        # si elle est déjà commencée)
+        self.commencer_journal(actions)
 
-            # True si c'est une mine, False sinon
-            objet_case.est_minee = dictionnaire_info_case[case][0]
+    def fermer_partie_projetee(self):
+        """
+        Méthode qui écrit le compteur de tour et le chronomètre dans la partie projetée (s'il y a lieu), puis
+        la ferme. Elle est appelée lorsqu'un autre tableau remplace celui de la partie projetée.
+        """
+        if self.partie_projetee is not None:
+            self.partie_projetee.enregistrer(self.compteur, self.chrono)
+            self.partie_projetee.fermer()
+            self.partie_projetee = None
 
-            # True si la case est dévoilée, False sinon
-            objet_case.est_devoilee = dictionnaire_info_case[case][1]
+    def commencer_journal(self, actions=None):
+        """
+        Méthode qui remplace le journal par celui de la partie en cours. Si le journal ne peut pas être créé
+        (par exemple, un dossier personnel en lecture seule), la partie continue sans journal. Le journal d'une
+        partie projetée fait seulement référence à son fichier, qui contient déjà la grille.
 
-            # On rétablit la valeur du nombre de mines voisines
-            objet_case.nombre_mines_voisines = dictionnaire_info_case[case][2]
+        Args:
+            actions (list): Les actions déjà jouées depuis le tableau neuf, s'il y a lieu (voir JournalPartie)
+        """
+        self.fermer_journal()
+        try:
+            self.journal = JournalPartie(FICHIER_JOURNAL, self.tableau_mines, self.compteur, self.chrono,
+                                         actions=actions, partie_projetee=self.partie_projetee)
+        except OSError:
+            self.journal = None
 
-        # On réinitialise le dictionnaire de bouton pour le remplir avec les cases sauvegardées
-        self.dictionnaire_boutons = {}
+    def fermer_journal(self, supprimer=False):
+        """
+        Méthode qui ferme le journal de la partie en cours, s'il y a lieu.
 
-        # pour chaque rangée de 0 à (nb. de rangée - 1)
-        for i in range(self.tableau_mines.dimension_rangee):
-            # pour chaque colonne de 0 à (nb. de colonne - 1)
-            for j in range(self.tableau_mines.dimension_colonne):
-                # On va placer une case qui sera un widget bouton
-                bouton = BoutonCase(self.cadre, i + 1, j + 1)
-                bouton.grid(row=i, column=j)
-                bouton.bind('<Button-1>', self.devoiler_case)
-                bouton.bind('<Button-2>', self.mettre_drapeau)
-                bouton.bind('<Button-3>', self.mettre_drapeau)
-                self.dictionnaire_boutons[(i + 1, j + 1)] = bouton
+        Args:
+            supprimer (bool): True pour supprimer aussi le fichier du journal (à la fermeture du jeu)
+        """
+        if self.journal is not None:
+            self.journal.fermer()
+            self.journal = None
+            if supprimer:
+                try:
+                    os.remove(FICHIER_JOURNAL)
+                except OSError:
+                    pass
+
+    def journaliser(self, type_action, rangee_x, colonne_y):
+        """
+        Méthode qui ajoute une action du joueur au journal, avec le temps du chronomètre en millisecondes. Un
+        instantané de la partie est ajouté de temps en temps, lorsqu'aucun dévoilement progressif n'est en
+        cours (le tableau est alors dans un état stable).
 
-        # On dévoile chacun des cases qui étaient préalablement dévoilées
-        for element in self.dictionnaire_boutons:
+        Args:
+            type_action (int): ACTION_DEVOILER, ACTION_POSER_DRAPEAU ou ACTION_ENLEVER_DRAPEAU
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+        """
+        if self.journal is None:
+            return
 
-            bouton_a_devoiler = self.dictionnaire_boutons[element]
-            case_a_verifie = self.tableau_mines.dictionnaire_cases[
-                bouton_a_devoiler.rangee_x, bouton_a_devoiler.colonne_y]
+        try:
+            self.journal.ajouter(type_action, rangee_x, colonne_y, int((monotonic() - self.debut_chrono) * 1000))
+            if self.journal.instantane_du and not self.devoilement.en_cours:
+                self.journal.ecrire_instantane(self.tableau_mines, self.compteur, self.chrono)
 
-            if case_a_verifie.est_devoilee:
+        # Si le journal ne peut plus être écrit (disque plein), la partie continue sans journal
+        except OSError:
+            self.fermer_journal()
 
-                bouton_a_devoiler['text'] = str(case_a_verifie.nombre_mines_voisines)
+    def reprendre_partie_interrompue(self):
+        """
+        Méthode qui vérifie si le jeu a été interrompu brutalement (le journal de la dernière partie existe
+        encore) et, si le joueur le veut, reprend cette partie à partir de son journal.
 
-                if case_a_verifie.nombre_mines_voisines == 0:
-                    bouton_a_devoiler['text'] = '0'
-                    bouton_a_devoiler['state'] = 'disabled'
+        Returns:
+            bool: True si la partie interrompue a été reprise, False autrement
+        """
+        if not os.path.exists(FICHIER_JOURNAL):
+            return False
 
-                elif case_a_verifie.nombre_mines_voisines == 1:
-                    bouton_a_devoiler['state'] = 'disabled'
-                    bouton_a_devoiler['disabledforeground'] = 'blue'
+        if not messagebox.askyesno(title='Partie interrompue',
+                                   message='Le jeu a été interrompu. Voulez-vous reprendre la dernière partie?'):
+            return False
 
-                elif case_a_verifie.nombre_mines_voisines == 2:
-                    bouton_a_devoiler['state'] = 'disabled'
-                    bouton_a_devoiler['disabledforeground'] = 'green'
+        try:
+            tableau, compteur, chrono, partie_projetee = recuperer_partie(FICHIER_JOURNAL)
+        except (OSError, ValueError) as erreur:
+            messagebox.showerror(title='Partie interrompue',
+                                 message='La partie n\'a pas pu être reprise: ' + str(erreur))
+            return False
 
-                elif case_a_verifie.nombre_mines_voisines == 3:
-                    bouton_a_devoiler['state'] = 'disabled'
-                    bouton_a_devoiler['disabledforeground'] = 'red'
+        self.retablir_sauvegarde(tableau, compteur, chrono, partie_projetee)
+        return True
 
-                else:
-                    bouton_a_devoiler['state'] = 'disabled'
-                    bouton_a_devoiler['disabledforeground'] = '#0C3B87'
+    def ajuster_canevas(self):
+        """
+        Ajuste la partie visible du canevas à la taille du tableau, jusqu'à LARGEUR_MAX_CANEVAS par
+        HAUTEUR_MAX_CANEVAS pixels (on fait défiler le reste), puis la grosseur de la fenêtre à son contenu.
+        """
+        taille_case = self.canevas.taille_case
+        self.canevas.configure(width=min(self.tableau_mines.dimension_colonne * taille_case, LARGEUR_MAX_CANEVAS),
+                               height=min(self.tableau_mines.dimension_rangee * taille_case, HAUTEUR_MAX_CANEVAS))
+        self.geometry('')
 
     def sauvegarde(self):
         """
         Méthode qui ouvre une fenêtre permettant à l'utilisateur de sauvegarder sa partie en cours. Il
-        demande à l'utilsateur de choisir un nom et un emplacement pour le fichier et l'enregistre en
-        fichier texte (.txt)
+        demande à l'utilsateur de choisir un nom et un emplacement pour le fichier et l'enregistre dans le
+        format de sauvegarde binaire (voir le module sauvegarde), ou par ses coups seulement si le nom du
+        fichier se termine par EXTENSION_COUPS (voir le module journal). Une partie projetée est plutôt
+        enregistrée sur place, dans le fichier qu'on a ouvert; on peut en enregistrer une copie ailleurs.
 
         command: le bouton_sauvegarde (Button) contenu dans la fenêtre principale
         """
 
-        # Dictionnaire qui va contenir la sauvegarde des éléments de l'interface
-        dictionnaire_partie = {}
-
-        # Dictionnaire qui va contenir la sauvegarde de l'état des cases
-        dictionnaire_info_case = {}
-
-        # On sauvegarde chacune des cases et leur état et on l'associe a une coordonnée du tableau
-        for case in self.tableau_mines.dictionnaire_cases:
-
-            # Attributs de l'objet Case
-            est_minee = self.tableau_mines.dictionnaire_cases[case].est_minee
-            est_devoilee = self.tableau_mines.dictionnaire_cases[case].est_devoilee
-            nombre_mines_voisines = self.tableau_mines.dictionnaire_cases[case].nombre_mines_voisines
-
-            # On ajoute l'élément au dictionnaire { ... (x,y) : [Bool, Bool, Int], ... }
-            dictionnaire_info_case[case] = [est_minee, est_devoilee, nombre_mines_voisines]
-
-        # Sauvegarde du Tableau
-        dictionnaire_partie['dimension_colonne'] = self.tableau_mines.dimension_colonne
-        dictionnaire_partie['dimension_rangee'] = self.tableau_mines.dimension_rangee
-        dictionnaire_partie['nombre_mines'] = self.tableau_mines.nombre_mines
-        dictionnaire_partie['dictionnaire'] = dictionnaire_info_case
+        # On termine d'abord le dévoilement en cours, s'il y a lieu
+        self.devoilement.terminer()
+
+        # Une partie projetée est déjà dans son fichier: on écrit seulement le compteur de tour et le chronomètre,
+        # puis on propose d'en copier le fichier ailleurs
+        if self.partie_projetee is not None:
+            try:
+                self.partie_projetee.enregistrer(self.compteur, self.chrono)
+                if messagebox.askyesno(title='Sauvegarde',
+                                       message='La partie est enregistrée sur place, dans ' +
+                                               self.partie_projetee.chemin + '.\n\nVoulez-vous aussi en '
+                                               'enregistrer une copie ailleurs?'):
+                    chemin = filedialog.asksaveasfilename(defaultextension=EXTENSION_SAUVEGARDE,
+                                                          filetypes=TYPES_SAUVEGARDE[:1])
+                    if chemin:
+                        shutil.copyfile(self.partie_projetee.chemin, chemin)
+
+            # Gestion de l'exception si le fichier ne peut pas être écrit (ou si la copie le remplacerait)
+            except OSError as erreur:
+                messagebox.showerror(title='Sauvegarde',
+                                     message='La partie n\'a pas pu être sauvegardée: ' + str(erreur))
+            return
 
-        # Sauvegarde du temps
-        dictionnaire_partie['compteur'] = self.compteur
-        dictionnaire_partie['chrono'] = self.chrono
+        # Fenêtre de sauvegarde (le nom est vide si l'utilisateur annule la sauvegarde)
+        chemin = filedialog.asksaveasfilename(defaultextension=EXTENSION_SAUVEGARDE, filetypes=TYPES_SAUVEGARDE)
+        if not chemin:
+            return
 
-        # Fenêtre de sauvegarde
-        fenetre_sauvegarde = filedialog.asksaveasfile(mode="w")
+        # Une partie sauvegardée par ses coups: il faut les connaître depuis le début de la partie (ce n'est pas
+        # le cas d'une partie ouverte à partir d'une sauvegarde complète)
+        coups_seulement = chemin.lower().endswith(EXTENSION_COUPS)
+        if coups_seulement and (self.journal is None or self.journal.actions is None):
+            messagebox.showerror(title='Sauvegarde', message='Les coups de cette partie ne sont pas tous connus: '
+                                                             'sauvegardez-la plutôt au complet (' +
+                                                             EXTENSION_SAUVEGARDE + ').')
+            return
 
-        # On sauvegarde la partie sous forme de dictionnaire dans un fichier .txt
+        # On sauvegarde le tableau (ou ses coups), le compteur de tour et le chronomètre (les très grands
+        # tableaux, dans le format projetable)
         try:
-            fenetre_sauvegarde.write(str(dictionnaire_partie))
-            fenetre_sauvegarde.close()
-
-        # Gestion de l'exception si l'utilisateur cancel la sauvegarde
-        except:
+            if coups_seulement:
+                enregistrer_partie_coups(chemin, self.tableau_mines, self.journal.actions, self.compteur,
+                                         self.chrono)
+            elif self.tableau_mines.nombre_cases >= TAILLE_MIN_PROJECTION:
+                enregistrer_partie_projetable(chemin, self.tableau_mines, self.compteur, self.chrono)
+            else:
+                enregistrer_partie(chemin, self.tableau_mines, self.compteur, self.chrono)
 
-            return
+        # Gestion de l'exception si le fichier ne peut pas être écrit
+        except OSError as erreur:
+            messagebox.showerror(title='Sauvegarde', message='La partie n\'a pas pu être sauvegardée: ' + str(erreur))
 
     def ouvrir(self):
         """
         Méthode qui ouvre une fenêtre permettant à l'utilisateur de charger une partie sauvegardée. Il
-        demande à l'utilsateur de choisir un nom et un emplacement de fichier et convertit le contenu en
-        un dictionnaire de type string.
+        demande à l'utilsateur de choisir un fichier, le lit d'un seul coup et rétablit la partie. Les
+        anciennes sauvegardes en texte (.txt) sont importées.
 
         command: le bouton_chargement (Button) contenu dans la fenêtre principale
         """
 
+        # On se sert de filedialog pour choisir le fichier de sauvegarde (le nom est vide si l'utilisateur annule)
+        chemin = filedialog.askopenfilename(filetypes=TYPES_SAUVEGARDE)
+        if not chemin:
+            return
 
-        # On se sert de filedialog pour ouvrir une fenêtre de sauvegarde de fichier .txt
-        fenetre_sauvegarde = filedialog.askopenfile(mode="r")
-
-        # Gestion de l'exception d'ouverture de fichier
-
+        # Gestion de l'exception d'ouverture de fichier. Une sauvegarde dans le format projetable est projetée
+        # en mémoire plutôt que lue; une sauvegarde par coups est rejouée (on garde ses coups pour le journal).
+        partie_projetee, actions = None, None
         try:
-            # On charge le contenu du fichier dans notre variable de sauvegarde
-            contenu_partie = fenetre_sauvegarde.read()
-            fenetre_sauvegarde.close()
-
-            # On convertit le contenu de la partie (de type string) en dictionnaire
-            contenu_partie = eval(contenu_partie)
-
-            # On appelle la fonction qui charge la partie sauvegardée dans la fenêtre principale
-            self.retablir_sauvegarde(contenu_partie)
-
-        except:
+            if est_partie_projetable(chemin):
+                partie_projetee = PartieProjetee(chemin)
+                tableau, compteur, chrono = partie_projetee.tableau, partie_projetee.compteur, partie_projetee.chrono
+            elif est_partie_coups(chemin):
+                tableau, compteur, chrono, actions = charger_partie_coups(chemin)
+            else:
+                tableau, compteur, chrono = charger_partie(chemin)
 
+        except (OSError, ValueError, UnicodeDecodeError) as erreur:
+            messagebox.showerror(title='Ouvrir', message='La partie n\'a pas pu être ouverte: ' + str(erreur))
             return
 
+        # On appelle la fonction qui charge la partie sauvegardée dans la fenêtre principale
+        self.retablir_sauvegarde(tableau, compteur, chrono, partie_projetee, actions)
+
     def instructions(self):
         """
         Méthode qui ouvre une fenêtre affichant les instructions du jeu.
@@ -587,117 +702,94 @@ class InterfacePartie(Tk):
     def mettre_drapeau(self, event):
         """
         Méthode qui affiche une image de drapeau sur une case lorsqu'un clique droit est exécuté sur
-        le bouton correspondant de la case.
+        la case, dans le canevas du jeu.
 
         Args:
-             event (object): Un clique gauche de souris (<'Button-2'>) sur un bouton d'une case de jeu.
-
-        command: le bouton (BoutonCase) contenu dans le cadre du jeu
+             event (object): Un clique gauche de souris (<'Button-2'>) sur le canevas du jeu.
         """
 
-        # Widget associé à l'évènement (dans notre cas, un boutoncase)
-        bouton = event.widget
-
-        # Fichier contenant l'image du drapeau
-        photo_drapeau = PhotoImage(file="png/flag_icon.gif").subsample(1, 1)
-
-        # S'il n'y a pas d'image sur la case lorsqu'on clique droit, on l'ajoute
-        if 'pyimage' not in bouton['image']:
-            bouton['image'] = photo_drapeau
-            bouton['compound'] = 'center'
-            bouton.image = photo_drapeau
+        # On trouve la case pointée par le clic sur le canevas
+        coordonnees = self.canevas.obtenir_case_pointee(event.x, event.y)
+        if coordonnees is None:
+            return
 
-        # Sinon, on l'enlève
-        else:
-            bouton['image'] = ''
+        # On pose ou on enlève le drapeau dans le tableau (la case est redessinée à la réception de l'évènement),
+        # puis on journalise le changement, s'il y a lieu
+        a_drapeau = self.tableau_mines.obtenir_case(*coordonnees).a_drapeau
+        if self.tableau_mines.basculer_drapeau(*coordonnees) != a_drapeau:
+            self.journaliser(ACTION_ENLEVER_DRAPEAU if a_drapeau else ACTION_POSER_DRAPEAU, *coordonnees)
 
     def devoiler_case(self, event):
         """
-        Méthode qui dévoile le contenu de la case lorsque le joueur clique sur un bouton du jeu.
+        Méthode qui dévoile le contenu de la case lorsque le joueur clique sur une case du canevas.
         Si la case est une mine, on affiche la solution ainsi qu'un message de défaite. En cas de victoire,
         on affiche aussi la solution ainsi qu'un message de victoire.
 
         Args:
-           event (object): Un clique droit de souris (<'Button-1'>) sur un bouton d'une case de jeu.
+           event (object): Un clique droit de souris (<'Button-1'>) sur le canevas du jeu.
         """
 
-        # Widget associé à l'évènement (dans notre cas, un widget de type BoutonCase)
-        bouton = event.widget
+        # On trouve la case pointée par le clic sur le canevas
+        coordonnees = self.canevas.obtenir_case_pointee(event.x, event.y)
+        if coordonnees is None:
+            return
+        rangee_x, colonne_y = coordonnees
 
         # On trouve la case qui y est associée dans le tableau de l'interface
-        case = self.tableau_mines.obtenir_case(bouton.rangee_x, bouton.colonne_y)
+        case = self.tableau_mines.obtenir_case(rangee_x, colonne_y)
 
-        # On vérifie d'abord si la case n'est pas minée
-        if not case.est_minee and not case.est_devoilee:
+        # On va aller dévoiler la case voulue. Au premier clic, c'est le tableau qui s'assure que la case n'est
+        # pas minée: on vérifie donc la présence d'une mine seulement après le dévoilement. Seule la première
+        # tranche d'une grande cascade est dévoilée tout de suite; la suite l'est par self.devoilement. Le
+        # dessin des cases et la fin de la partie suivent les évènements publiés par le tableau.
+        tranches = self.tableau_mines.devoiler_par_tranches(rangee_x, colonne_y)
+        cases_devoilees = next(tranches, None)
 
-            # On va incrémenter le compteur de tour de 1
+        # Si des cases ont été dévoilées (ou si c'est une mine), on incrémente le compteur de tour de 1
+        if cases_devoilees or case.est_minee:
             self.compteur += 1
-            self.bouton_compteur['text'] = 'Tour: ' + str(self.compteur)
-            self.bouton_compteur.pack(side=TOP)
-
-            # On va aller dévoiler la case voulue
-            self.tableau_mines.devoiler_case(bouton.rangee_x, bouton.colonne_y)
-
-            # Musique de dévoilement de case
-            devoilement_sound = pygame.mixer.Sound("sword_blade.wav")
-            devoilement_sound.play()
-
-            # On vérifie si la partie est terminée (si le joueur a gagné)
-            if self.tableau_mines.nombre_cases_sans_mine_a_devoiler == 0:
+            self.affichage.changer_texte(self.bouton_compteur, 'Tour: ' + str(self.compteur))
 
-                # On affiche la solution et le message de victoire
-                victoire = True
-                self.afficher_solution(victoire)
+        # Si la partie continue, on joue la musique de dévoilement de case et on laisse le reste de la cascade
+        # à l'ordonnanceur
+        if cases_devoilees and self.tableau_mines.contient_cases_a_devoiler():
+            self.audio.jouer("sword_blade.wav")
+            self.devoilement.ajouter(tranches)
 
-            # On va dévoiler la case et ses voisins en effet cascade, s'il y a lieu
+        # Seuls les dévoilements qui comptent pour un tour sont journalisés (la suite d'une cascade se déduit
+        # du tableau)
+        if cases_devoilees or case.est_minee:
+            self.journaliser(ACTION_DEVOILER, rangee_x, colonne_y)
 
-            for element in self.dictionnaire_boutons:
-
-                bouton_a_devoiler = self.dictionnaire_boutons[element]
-                case_a_verifie = self.tableau_mines.dictionnaire_cases[bouton_a_devoiler.rangee_x, bouton_a_devoiler.colonne_y]
-
-                # On va aussi afficher le chiffre correspond au nombre de mines sur la case
-
-                if case_a_verifie.est_devoilee:
-                    bouton_a_devoiler['text'] = str(case_a_verifie.nombre_mines_voisines)
-
-                    if case_a_verifie.nombre_mines_voisines == 0:
-                        bouton_a_devoiler['text'] = '0'
-                        bouton_a_devoiler['state'] = 'disabled'
-
-                    elif case_a_verifie.nombre_mines_voisines == 1:
-                        bouton_a_devoiler['state'] = 'disabled'
-                        bouton_a_devoiler['disabledforeground'] = 'blue'
-
-                    elif case_a_verifie.nombre_mines_voisines == 2:
-                        bouton_a_devoiler['state'] = 'disabled'
-                        bouton_a_devoiler['disabledforeground'] = 'green'
+    def recevoir_evenements(self, evenements):
+        """
+        Méthode appelée avec les évènements publiés par le tableau pour une action du joueur (voir le module
+        evenements): on redessine les cases qui ont changé (à la prochaine image), on dessine le nouveau
+        tableau, ou on affiche la solution à la fin de la partie.
 
-                    elif case_a_verifie.nombre_mines_voisines == 3:
-                        bouton_a_devoiler['state'] = 'disabled'
-                        bouton_a_devoiler['disabledforeground'] = 'red'
+        Args:
+            evenements (list): Les évènements de l'action, dans l'ordre où ils se sont produits
+        """
+        for evenement in evenements:
 
-                    else:
-                        bouton_a_devoiler['state'] = 'disabled'
-                        bouton_a_devoiler['disabledforeground'] = '#0C3B87'
+            if isinstance(evenement, CasesDevoilees):
+                self.affichage.ajouter_cases(evenement.indices)
 
-        # si c'est une mine, on finit le tour et on va dévoilé la mine et la solution
-        elif case.est_minee:
+            elif isinstance(evenement, DrapeauBascule):
+                self.affichage.ajouter_cases([evenement.indice])
 
-            # on incrémente le compteur de tour quand même
-            self.compteur += 1
-            self.bouton_compteur['text'] = 'Tour: ' + str(self.compteur)
-            self.bouton_compteur.pack(side=TOP)
+            elif isinstance(evenement, TableauReinitialise):
 
-            # On affiche l'image de la mine sur le bouton
-            photo_mine = PhotoImage(file="png/mine.gif").subsample(1, 1)
-            bouton['image'] = photo_mine
-            bouton['compound'] = 'center'
-            bouton.image = photo_mine
+                # On abandonne le dévoilement et les cases à redessiner de l'ancienne partie, puis on dessine le
+                # nouveau tableau et on ajuste la grosseur de la fenêtre en fonction du nombre de case
+                self.devoilement.annuler()
+                self.affichage.oublier_cases()
+                self.canevas.changer_tableau(evenement.tableau)
+                self.ajuster_canevas()
 
-            # on affiche la solution et le message de défaite
-            victoire = False
-            self.afficher_solution(victoire)
+            # Partie gagnée ou perdue: on affiche la solution et le message de victoire ou de défaite
+            else:
+                self.afficher_solution(isinstance(evenement, PartieGagnee))
 
     def afficher_solution(self, victoire):
         """
@@ -709,76 +801,59 @@ class InterfacePartie(Tk):
            victoire (Bool): True si le joueur remporte la partie, False sinon.
         """
 
-        # On affiche la solution en dévoilant tous les boutons
-        for element in self.dictionnaire_boutons:
-
-            bouton = self.dictionnaire_boutons[element]
-            case = self.tableau_mines.dictionnaire_cases[element]
-
-            if case.est_minee:
-                photo1 = PhotoImage(file="png/mine.gif")
-                bouton['image'] = photo1
-                bouton['compound'] = 'center'
-                bouton.image = photo1
+        # La partie est terminée: on abandonne le reste des dévoilements en cours
+        self.devoilement.annuler()
 
-            else:
-
-                bouton['text'] = str(case.nombre_mines_voisines)
-
-                if case.nombre_mines_voisines == 0:
-                    bouton['text'] = '0'
-                    bouton['state'] = 'disabled'
-
-                elif case.nombre_mines_voisines == 1:
-                    bouton['state'] = 'disabled'
-                    bouton['disabledforeground'] = 'blue'
-
-                elif case.nombre_mines_voisines == 2:
-                    bouton['state'] = 'disabled'
-                    bouton['disabledforeground'] = 'green'
-
-                elif case.nombre_mines_voisines == 3:
-                    bouton['state'] = 'disabled'
-                    bouton['disabledforeground'] = 'red'
-
-                else:
-                    bouton['state'] = 'disabled'
-                    bouton['disabledforeground'] = '#0C3B87'
+        # On affiche la solution en dévoilant toutes les cases du canevas (les cases qui restaient à
+        # redessiner le sont du même coup)
+        self.affichage.oublier_cases()
+        self.canevas.afficher_solution()
 
         # On affiche le message de victoire si la variable est True
         if victoire:
-            victory_sound = pygame.mixer.Sound('victory-trumpets.wav')
-            victory_sound.play()
+            self.audio.jouer('victory-trumpets.wav')
             self.message_victoire = messagebox.showinfo(title='Victoire',
                                                            message='Félicitation, vous avez remporté la partie! :)')
 
             # On affiche le score qui est égal au temps écoulé depuis le début de la partie
             self.score = self.chrono
-            self.score_label['text'] = 'Score précédent: ' + str(self.chrono)
-            self.score_label.pack(side=BOTTOM, padx=10, pady=10)
+            self.affichage.changer_texte(self.score_label, 'Score précédent: ' + str(self.score))
 
         # Sinon, on affiche le message de défaite
         else:
-            defeat_sound = pygame.mixer.Sound('explosion.wav')
-            defeat_sound.play()
+            self.audio.jouer('explosion.wav')
             self.message_defaite = messagebox.showwarning(title='Défaite',
                                                 message='Oh non... vous avez touché une mine! Recommencez :(')
             # On met le score à 0 car on a perdu
             self.score = 0
-            self.score_label['text'] = 'Score précédent: ' + str(self.score)
-            self.score_label.pack(side=BOTTOM, padx=10, pady=10)
+            self.affichage.changer_texte(self.score_label, 'Score précédent: ' + str(self.score))
+
+    def redemarrer_chrono(self, secondes):
+        """
+        Méthode qui remet le chronomètre à un nombre de secondes (0 au début d'une partie, ou le temps d'une
+        partie sauvegardée) et le fait repartir de là.
+
+        Args:
+            secondes (int): Le nouveau temps du chronomètre, en secondes
+        """
+        self.after_cancel(self.tache_chrono)
+        self.debut_chrono = monotonic() - secondes
+        self.chrono = None
+        self.incremente()
 
     def incremente(self):
         """
-        Une méthode récursive qui incrémente le compteur à chaque seconde (1000ms) dès qu'une partie débute.
+        Une méthode récursive qui met à jour le chronomètre à chaque seconde dès qu'une partie débute. Le temps
+        est calculé avec une horloge monotone: même si un appel est en retard, le chronomètre reste exact.
         """
 
-        # On incrémente le chrono de 1
-        self.chrono += 1
+        # On calcule le temps écoulé depuis le début du chronomètre
+        ecoule = monotonic() - self.debut_chrono
 
-        # Étiquette qui affiche le chronomètre dans la fenêtre principale
-        self.label_chrono['text'] = "Temps: " + str(self.chrono) + " secs"
-        self.label_chrono.pack(side=LEFT)
+        # Étiquette qui affiche le chronomètre dans la fenêtre principale (seulement si la seconde a changé)
+        if int(ecoule) != self.chrono:
+            self.chrono = int(ecoule)
+            self.affichage.changer_texte(self.label_chrono, "Temps: " + str(self.chrono) + " secs")
 
-        # On appelle la méthode after de manière récursive à toutes les secondes (1000ms)
-        self.after(1000, self.incremente)
+        # On appelle la méthode after de manière récursive, juste après le début de la prochaine seconde
+        self.tache_chrono = self.after(int((1 - ecoule % 1) * 1000) + 1, self.incremente)
@@ -0,0 +1,679 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant le journal des parties. Plutôt que d'écrire tout le tableau à chaque sauvegarde, on ajoute
+chaque action du joueur (dévoiler une case, poser ou enlever un drapeau) à la fin d'un fichier, avec le temps
+du chronomètre: une sauvegarde automatique ne coûte qu'une écriture de quelques octets. De temps en temps, on
+ajoute aussi au journal un instantané de la partie, dans le format de sauvegarde binaire (voir le module
+sauvegarde).
+
+Les mines sont placées à partir de la graine du tableau et de la première case dévoilée: rejouer les actions
+sur un tableau neuf redonne donc exactement la même partie (voir rejouer_partie). Après un arrêt brutal, on
+reprend la partie à partir du dernier instantané, en rejouant seulement les actions qui le suivent (voir
+recuperer_partie); une action écrite à moitié est ignorée. Le journal ne garde que le dernier instantané: à
+chaque instantané, il est réécrit (les actions, puis l'instantané) plutôt que de grossir indéfiniment.
+
+Une partie projetée en mémoire (voir PartieProjetee) n'a pas d'instantané: son fichier de sauvegarde contient
+déjà la grille à jour. Le journal y fait seulement référence, et une reprise rouvre ce fichier.
+
+Pour la même raison, une partie peut être sauvegardée par ses coups seulement (voir encoder_partie_coups):
+l'en-tête d'une sauvegarde (dimensions, mines, graine), suivi de la liste des actions du joueur, quatre octets
+par action. La taille de la sauvegarde dépend du nombre d'actions plutôt que du nombre de cases; à l'ouverture,
+la partie est rejouée.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+import os
+from collections import namedtuple
+from struct import Struct
+from tableau import Tableau
+from sauvegarde import encoder_partie, decoder_partie, valider_dimensions, SIGNATURE, ENTETE, VERSION_COUPS, \
+    PartieProjetee
+
+# Les quatre premiers octets d'un journal
+SIGNATURE_JOURNAL = b'DMNJ'
+
+# Version du format du journal (à incrémenter à chaque changement de l'en-tête ou des enregistrements)
+VERSION_JOURNAL = 1
+
+# En-tête: signature, version, rangées, colonnes, mines et graine du tableau de la partie
+ENTETE_JOURNAL = Struct('<4sHIIIQ')
+
+# Une action: type, rangée, colonne et temps du chronomètre (en millisecondes)
+ENREGISTREMENT_ACTION = Struct('<BIII')
+
+# Un instantané: type et taille de la sauvegarde binaire qui suit
+ENREGISTREMENT_INSTANTANE = Struct('<BI')
+
+# Une référence à une partie projetée: type, compteur de tours, chronomètre et taille du chemin (en UTF-8) qui suit
+ENREGISTREMENT_PARTIE_PROJETEE = Struct('<BIIH')
+
+# Types des enregistrements
+ACTION_DEVOILER = 1
+ACTION_POSER_DRAPEAU = 2
+ACTION_ENLEVER_DRAPEAU = 3
+TYPE_INSTANTANE = 4
+TYPE_PARTIE_PROJETEE = 5
+TYPES_ACTIONS = (ACTION_DEVOILER, ACTION_POSER_DRAPEAU, ACTION_ENLEVER_DRAPEAU)
+
+# Nombre d'actions entre deux instantanés (une reprise rejoue au plus ce nombre d'actions)
+INTERVALLE_INSTANTANES = 100
+
+# Un coup est le numéro de la case (à partir de 0, rangée par rangée) et le type de l'action, dans un entier de
+# quatre octets: numero_case << BITS_TYPE_COUP | type
+BITS_TYPE_COUP = 2
+
+# Une action du joueur, telle qu'écrite dans le journal
+Action = namedtuple('Action', 'type rangee_x colonne_y temps')
+
+# Un instantané de la partie (le contenu d'une sauvegarde binaire, voir decoder_partie)
+Instantane = namedtuple('Instantane', 'donnees')
+
+# Une référence à la sauvegarde projetée qui contient la grille de la partie, avec le compteur de tours et le
+# chronomètre au début du journal
+ReferencePartieProjetee = namedtuple('ReferencePartieProjetee', 'chemin compteur chrono')
+
+
+class JournalPartie:
+    """
+    Journal d'une partie, ouvert en écriture: chaque action est ajoutée à la fin du fichier en une seule
+    écriture, sans tampon, et survit donc à un arrêt brutal du jeu. Un instantané remplace plutôt le fichier
+    (voir ecrire_instantane).
+
+    Attributes:
+        chemin (str): Le chemin du fichier du journal
+        fichier (file): Le fichier du journal, ouvert en ajout sans tampon
+        intervalle (int): Nombre d'actions entre deux instantanés (None si la partie n'a pas d'instantané)
+        debut (bytes): Le début du journal, gardé à chaque réécriture: l'en-tête, suivi du premier instantané
+                       ou de la référence à la partie projetée, s'il y a lieu
+        enregistrements_actions (bytearray): Toutes les actions écrites, telles qu'elles sont dans le fichier
+        actions_depuis_instantane (int): Nombre d'actions écrites depuis le dernier instantané (ou le début)
+        actions (list): Toutes les actions de la partie, depuis le tableau neuf (pour une sauvegarde par coups),
+                        ou None si le journal commence par un instantané ou une partie projetée
+    """
+
+    def __init__(self, chemin, tableau, compteur=0, chrono=0, intervalle=INTERVALLE_INSTANTANES, actions=None,
+                 partie_projetee=None):
+        """
+        Création du journal d'une partie (un journal existant est remplacé). Si la partie est déjà commencée
+        (par exemple, une partie sauvegardée qu'on vient d'ouvrir), on écrit tout de suite un instantané: les
+        actions qui l'ont menée là ne sont pas connues, sauf si on les reçoit (par exemple, celles d'une
+        sauvegarde par coups), auquel cas on les écrit plutôt. Pour une partie projetée, on écrit seulement une
+        référence à son fichier, et jamais d'instantané: il faudrait lire toute sa grille.
+
+        Args:
+            chemin (str): Le chemin du fichier
+            tableau (Tableau): Le tableau de la partie
+            compteur (int): Nombre de tours joués
+            chrono (int): Temps de jeu, en secondes
+            intervalle (int): Nombre d'actions entre deux instantanés (par défaut, INTERVALLE_INSTANTANES)
+            actions (list): Les actions qui ont mené au tableau à partir du tableau neuf (par défaut, inconnues)
+            partie_projetee (PartieProjetee): La partie projetée dont le tableau est la grille (ou None)
+        """
+        self.chemin = chemin
+        self.intervalle = intervalle
+        self.enregistrements_actions = bytearray()
+        self.actions_depuis_instantane = 0
+        self.actions = []
+        self.debut = ENTETE_JOURNAL.pack(SIGNATURE_JOURNAL, VERSION_JOURNAL, tableau.dimension_rangee,
+                                         tableau.dimension_colonne, tableau.nombre_mines, tableau.graine)
+
+        if partie_projetee is not None:
+            chemin_partie = os.path.abspath(partie_projetee.chemin).encode('utf-8')
+            self.debut += ENREGISTREMENT_PARTIE_PROJETEE.pack(TYPE_PARTIE_PROJETEE, compteur, chrono,
+                                                              len(chemin_partie)) + chemin_partie
+            self.intervalle, self.actions = None, None
+        elif actions is None and tableau.mines_placees and not tableau.premier_clic_en_attente:
+            self.debut += self.encoder_instantane(tableau, compteur, chrono)
+            self.actions = None
+
+        self.fichier = open(chemin, 'wb', buffering=0)
+        self.fichier.write(self.debut)
+        for action in actions or ():
+            self.ajouter(*action)
+
+    @property
+    def instantane_du(self):
+        """bool: True si assez d'actions ont été écrites depuis le dernier instantané pour en écrire un autre"""
+        return self.intervalle is not None and self.actions_depuis_instantane >= self.intervalle
+
+    def ajouter(self, type_action, rangee_x, colonne_y, temps):
+        """
+        Ajoute une action à la fin du journal.
+
+        Args:
+            type_action (int): ACTION_DEVOILER, ACTION_POSER_DRAPEAU ou ACTION_ENLEVER_DRAPEAU
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+            temps (int): Temps du chronomètre, en millisecondes
+        """
+        enregistrement = ENREGISTREMENT_ACTION.pack(type_action, rangee_x, colonne_y, temps)
+        self.fichier.write(enregistrement)
+        self.enregistrements_actions += enregistrement
+        self.actions_depuis_instantane += 1
+        if self.actions is not None:
+            self.actions.append(Action(type_action, rangee_x, colonne_y, temps))
+
+    @staticmethod
+    def encoder_instantane(tableau, compteur, chrono):
+        """
+        Encode l'enregistrement d'un instantané de la partie.
+
+        Args:
+            tableau (Tableau): Le tableau de la partie
+            compteur (int): Nombre de tours joués
+            chrono (int): Temps de jeu, en secondes
+
+        Returns:
+            bytes: L'enregistrement, suivi de la sauvegarde binaire de la partie
+        """
+        donnees = encoder_partie(tableau, compteur, chrono)
+        return ENREGISTREMENT_INSTANTANE.pack(TYPE_INSTANTANE, len(donnees)) + donnees
+
+    def ecrire_instantane(self, tableau, compteur, chrono):
+        """
+        Réécrit le journal avec un nouvel instantané de la partie: le début du journal, toutes les actions (pour
+        pouvoir rejouer la partie), puis l'instantané, qui remplace le précédent. Le nouveau journal est écrit à
+        côté, puis remplace l'ancien d'un seul coup: un arrêt brutal laisse l'un ou l'autre, jamais un mélange.
+        Le tableau doit être dans un état stable (aucun dévoilement progressif en cours): une reprise rejoue les
+        actions suivantes à partir de cet état.
+
+        Args:
+            tableau (Tableau): Le tableau de la partie
+            compteur (int): Nombre de tours joués
+            chrono (int): Temps de jeu, en secondes
+        """
+        temporaire = self.chemin + '.tmp'
+        with open(temporaire, 'wb') as fichier:
+            fichier.write(self.debut)
+            fichier.write(self.enregistrements_actions)
+            fichier.write(self.encoder_instantane(tableau, compteur, chrono))
+
+        self.fichier.close()
+        os.replace(temporaire, self.chemin)
+        self.fichier = open(self.chemin, 'ab', buffering=0)
+        self.actions_depuis_instantane = 0
+
+    def fermer(self):
+        """
+        Ferme le fichier du journal.
+        """
+        self.fichier.close()
+
+
+def lire_journal(donnees):
+    """
+    Lit le contenu d'un journal. Un enregistrement tronqué (écrit à moitié lors d'un arrêt brutal) termine la
+    lecture: il est ignoré, comme tout ce qui le suit.
+
+    Args:
+        donnees (bytes): Le contenu du fichier du journal
+
+    Returns:
+        tuple: Les dimensions (rangées, colonnes), le nombre de mines et la graine du tableau, suivis de la
+               liste des enregistrements (Action, Instantane ou ReferencePartieProjetee), dans l'ordre du journal
+
+    Raises:
+        ValueError: Si ce n'est pas un journal, si sa version n'est pas reconnue ou si un enregistrement est
+                    corrompu (type inconnu ou case à l'extérieur du tableau)
+    """
+    if len(donnees) < ENTETE_JOURNAL.size or donnees[:len(SIGNATURE_JOURNAL)] != SIGNATURE_JOURNAL:
+        raise ValueError("Ce fichier n'est pas un journal de partie")
+
+    _, version, dimension_rangee, dimension_colonne, nombre_mines, graine = ENTETE_JOURNAL.unpack_from(donnees)
+    if version != VERSION_JOURNAL:
+        raise ValueError(f'Version de journal non reconnue: {version}')
+    valider_dimensions(dimension_rangee, dimension_colonne, nombre_mines)
+
+    enregistrements = []
+    position = ENTETE_JOURNAL.size
+    while position < len(donnees):
+
+        if donnees[position] == TYPE_PARTIE_PROJETEE:
+            if position + ENREGISTREMENT_PARTIE_PROJETEE.size > len(donnees):
+                break
+            _, compteur, chrono, taille = ENREGISTREMENT_PARTIE_PROJETEE.unpack_from(donnees, position)
+            debut = position + ENREGISTREMENT_PARTIE_PROJETEE.size
+            if debut + taille > len(donnees):
+                break
+            enregistrements.append(ReferencePartieProjetee(bytes(donnees[debut:debut + taille]).decode('utf-8'),
+                                                           compteur, chrono))
+            position = debut + taille
+
+        elif donnees[position] == TYPE_INSTANTANE:
+            if position + ENREGISTREMENT_INSTANTANE.size > len(donnees):
+                break
+            taille = ENREGISTREMENT_INSTANTANE.unpack_from(donnees, position)[1]
+            debut = position + ENREGISTREMENT_INSTANTANE.size
+            if debut + taille > len(donnees):
+                break
+            enregistrements.append(Instantane(donnees[debut:debut + taille]))
+            position = debut + taille
+
+        else:
+            if position + ENREGISTREMENT_ACTION.size > len(donnees):
+                break
+            action = Action(*ENREGISTREMENT_ACTION.unpack_from(donnees, position))
+            if action.type not in TYPES_ACTIONS or not (1 <= action.rangee_x <= dimension_rangee and
+                                                        1 <= action.colonne_y <= dimension_colonne):
+                raise ValueError('Journal corrompu')
+            enregistrements.append(action)
+            position += ENREGISTREMENT_ACTION.size
+
+    return dimension_rangee, dimension_colonne, nombre_mines, graine, enregistrements
+
+
+def appliquer_action(tableau, action):
+    """
+    Applique une action du journal à un tableau. Poser (ou enlever) un drapeau qui l'est déjà ne change rien.
+
+    Args:
+        tableau (Tableau): Le tableau de la partie
+        action (Action): L'action
+    """
+    if action.type == ACTION_DEVOILER:
+        tableau.devoiler_case(action.rangee_x, action.colonne_y)
+    elif tableau.obtenir_case(action.rangee_x, action.colonne_y).a_drapeau != (action.type == ACTION_POSER_DRAPEAU):
+        tableau.basculer_drapeau(action.rangee_x, action.colonne_y)
+
+
+def rejouer_partie(donnees):
+    """
+    Rejoue une partie du début, action par action (générateur): par exemple, pour revoir une partie terminée.
+    Si la partie a été reprise d'une sauvegarde, elle est rejouée à partir du premier instantané; les autres
+    instantanés sont ignorés.
+
+    Args:
+        donnees (bytes): Le contenu du fichier du journal
+
+    Returns:
+        generator: Les actions, chacune suivie du tableau (toujours le même) après l'action, sous forme de
+                   tuples (Action, Tableau)
+
+    Raises:
+        ValueError: Si le journal n'est pas valide, ou si c'est celui d'une partie projetée (son état au début
+                    du journal n'est pas connu)
+    """
+    dimension_rangee, dimension_colonne, nombre_mines, graine, enregistrements = lire_journal(donnees)
+    if enregistrements and isinstance(enregistrements[0], ReferencePartieProjetee):
+        raise ValueError('Une partie projetée ne peut pas être rejouée')
+
+    if enregistrements and isinstance(enregistrements[0], Instantane):
+        tableau = decoder_partie(enregistrements[0].donnees)[0]
+    else:
+        tableau = Tableau(dimension_rangee, dimension_colonne, nombre_mines, graine)
+
+    for enregistrement in enregistrements:
+        if isinstance(enregistrement, Action):
+            appliquer_action(tableau, enregistrement)
+            yield enregistrement, tableau
+
+
+def recuperer_partie(chemin):
+    """
+    Reprend une partie interrompue à partir de son journal: on part du dernier instantané (ou d'un tableau
+    neuf, s'il n'y en a pas) et on rejoue les actions qui le suivent. Chaque dévoilement journalisé compte pour
+    un tour (seuls les dévoilements qui ont compté pour un tour sont journalisés).
+
+    Une partie projetée est plutôt rouverte: sa grille contient déjà les actions (qui sont rejouées quand même,
+    au cas où les dernières écritures auraient été perdues, ce qui ne change rien sinon).
+
+    Args:
+        chemin (str): Le chemin du fichier du journal
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int), le temps de jeu (int, en secondes) et la
+               partie projetée rouverte (PartieProjetee, ou None)
+
+    Raises:
+        ValueError: Si le fichier n'est pas un journal valide (ou si la partie projetée n'est pas valide)
+        OSError: Si la partie projetée ne peut pas être rouverte
+    """
+    with open(chemin, 'rb') as fichier:
+        donnees = fichier.read()
+    dimension_rangee, dimension_colonne, nombre_mines, graine, enregistrements = lire_journal(donnees)
+
+    # le dernier instantané (ou la partie projetée), et les actions qui le suivent
+    partie_projetee = None
+    debut = max((numero for numero, enregistrement in enumerate(enregistrements)
+                 if not isinstance(enregistrement, Action)), default=None)
+    if debut is None:
+        tableau, compteur, chrono = Tableau(dimension_rangee, dimension_colonne, nombre_mines, graine), 0, 0
+    elif isinstance(enregistrements[debut], ReferencePartieProjetee):
+        partie_projetee = PartieProjetee(enregistrements[debut].chemin)
+        tableau, (_, compteur, chrono) = partie_projetee.tableau, enregistrements[debut]
+    else:
+        tableau, compteur, chrono = decoder_partie(enregistrements[debut].donnees)
+    enregistrements = enregistrements[debut + 1:] if debut is not None else enregistrements
+
+    for action in enregistrements:
+        appliquer_action(tableau, action)
+        if action.type == ACTION_DEVOILER:
+            compteur += 1
+        chrono = max(chrono, action.temps // 1000)
+
+    return tableau, compteur, chrono, partie_projetee
+
+
+def encoder_partie_coups(tableau, actions, compteur=0, chrono=0):
+    """
+    Encode une partie dans le format de sauvegarde par coups: l'en-tête d'une sauvegarde binaire (voir le
+    module sauvegarde), suivi d'un coup de quatre octets par action. Le temps des actions n'est pas gardé.
+
+    Args:
+        tableau (Tableau): Le tableau de la partie
+        actions (list): Toutes les actions de la partie, depuis le tableau neuf (voir JournalPartie.actions)
+        compteur (int): Nombre de tours joués
+        chrono (int): Temps de jeu, en secondes
+
+    Returns:
+        bytes: Le contenu du fichier de sauvegarde
+    """
+    nombre_colonnes = tableau.dimension_colonne
+    entete = ENTETE.pack(SIGNATURE, VERSION_COUPS, 0, tableau.dimension_rangee, nombre_colonnes,
+                         tableau.nombre_mines, tableau.graine, compteur, chrono)
+    coups = [((action.rangee_x - 1) * nombre_colonnes + action.colonne_y - 1) << BITS_TYPE_COUP | action.type
+             for action in actions]
+    return entete + Struct(f'<{len(coups)}I').pack(*coups)
+
+
+def decoder_partie_coups(donnees):
+    """
+    Décode une partie sauvegardée dans le format par coups: on rejoue ses actions sur un tableau neuf, qui
+    place ses mines à partir de sa graine et de la première case dévoilée (voir Tableau.initialiser_tableau).
+
+    Args:
+        donnees (bytes): Le contenu du fichier de sauvegarde
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int), le temps de jeu (int) et la liste des
+               actions rejouées (pour continuer à sauvegarder la partie par ses coups)
+
+    Raises:
+        ValueError: Si ce n'est pas une sauvegarde par coups, ou si elle est tronquée ou corrompue
+    """
+    if len(donnees) < ENTETE.size or donnees[:len(SIGNATURE)] != SIGNATURE:
+        raise ValueError("Ce fichier n'est pas une sauvegarde de partie")
+
+    (_, version, _, dimension_rangee, dimension_colonne, nombre_mines, graine,
+     compteur, chrono) = ENTETE.unpack_from(donnees)
+    if version != VERSION_COUPS:
+        raise ValueError(f'Version de sauvegarde non reconnue: {version}')
+    valider_dimensions(dimension_rangee, dimension_colonne, nombre_mines)
+
+    nombre_coups, reste = divmod(len(donnees) - ENTETE.size, 4)
+    if reste:
+        raise ValueError('Sauvegarde tronquée ou corrompue')
+
+    actions = []
+    for coup in Struct(f'<{nombre_coups}I').unpack_from(donnees, ENTETE.size):
+        numero_case, type_action = coup >> BITS_TYPE_COUP, coup & ((1 << BITS_TYPE_COUP) - 1)
+        if numero_case >= dimension_rangee * dimension_colonne or type_action not in TYPES_ACTIONS:
+            raise ValueError('Sauvegarde tronquée ou corrompue')
+        rangee, colonne = divmod(numero_case, dimension_colonne)
+        actions.append(Action(type_action, rangee + 1, colonne + 1, 0))
+
+    tableau = Tableau(dimension_rangee, dimension_colonne, nombre_mines, graine)
+    for action in actions:
+        appliquer_action(tableau, action)
+    return tableau, compteur, chrono, actions
+
+
+def enregistrer_partie_coups(chemin, tableau, actions, compteur=0, chrono=0):
+    """
+    Enregistre une partie dans le format de sauvegarde par coups.
+
+    Args:
+        chemin (str): Le chemin du fichier
+        tableau (Tableau): Le tableau de la partie
+        actions (list): Toutes les actions de la partie, depuis le tableau neuf (voir JournalPartie.actions)
+        compteur (int): Nombre de tours joués
+        chrono (int): Temps de jeu, en secondes
+    """
+    with open(chemin, 'wb') as fichier:
+        fichier.write(encoder_partie_coups(tableau, actions, compteur, chrono))
+
+
+def est_partie_coups(chemin):
+    """
+    Vérifie si un fichier est une sauvegarde dans le format par coups (seul son en-tête est lu).
+
+    Args:
+        chemin (str): Le chemin du fichier
+
+    Returns:
+        bool: True si le fichier peut être ouvert avec charger_partie_coups, False autrement
+    """
+    with open(chemin, 'rb') as fichier:
+        debut = fichier.read(ENTETE.size)
+    return len(debut) == ENTETE.size and debut.startswith(SIGNATURE) and ENTETE.unpack(debut)[1] == VERSION_COUPS
+
+
+def charger_partie_coups(chemin):
+    """
+    Charge une partie sauvegardée dans le format par coups (voir decoder_partie_coups).
+
+    Args:
+        chemin (str): Le chemin du fichier
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int), le temps de jeu (int) et la liste des
+               actions rejouées
+    """
+    with open(chemin, 'rb') as fichier:
+        return decoder_partie_coups(fichier.read())
+
+
+#### Tests unitaires ###
+
+def jouer_partie(tableau, journal, nombre_actions, graine=0):
+    """
+    Joue une partie au hasard (pour les tests et le banc d'essai): des dévoilements de cases sans mine, et des
+    drapeaux posés puis parfois enlevés. Chaque action est journalisée, avec un instantané lorsqu'il est dû.
+
+    Returns:
+        int: Le nombre de tours joués
+    """
+    from random import Random
+
+    hasard = Random(graine)
+    compteur = 0
+    for numero in range(nombre_actions):
+        rangee_x = hasard.randint(1, tableau.dimension_rangee)
+        colonne_y = hasard.randint(1, tableau.dimension_colonne)
+        case = tableau.obtenir_case(rangee_x, colonne_y)
+
+        if numero % 4 == 3 and not case.est_devoilee:
+            type_action = ACTION_ENLEVER_DRAPEAU if case.a_drapeau else ACTION_POSER_DRAPEAU
+            tableau.basculer_drapeau(rangee_x, colonne_y)
+        elif (not tableau.mines_placees or not case.est_minee) and tableau.devoiler_case(rangee_x, colonne_y):
+            type_action = ACTION_DEVOILER
+            compteur += 1
+        else:
+            continue
+
+        journal.ajouter(type_action, rangee_x, colonne_y, numero * 250)
+        if journal.instantane_du:
+            journal.ecrire_instantane(tableau, compteur, numero // 4)
+    return compteur
+
+def test_recuperer_partie():
+    import os
+    from tempfile import TemporaryDirectory
+
+    with TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'journal.dmj')
+
+        # avec ou sans instantanés, la partie reprise est celle qui a été jouée
+        for intervalle in (10, 10 ** 6):
+            tableau = Tableau(30, 20, 90, graine=4)
+            journal = JournalPartie(chemin, tableau, intervalle=intervalle)
+            compteur = jouer_partie(tableau, journal, 200)
+            journal.fermer()
+
+            tableau_repris, compteur_repris, chrono, partie_projetee = recuperer_partie(chemin)
+            assert tableau_repris.grille == tableau.grille and compteur_repris == compteur and chrono > 0
+            assert tableau_repris.nombre_cases_sans_mine_a_devoiler == tableau.nombre_cases_sans_mine_a_devoiler
+            assert partie_projetee is None
+
+        # une action écrite à moitié (arrêt brutal) est ignorée
+        taille = os.path.getsize(chemin)
+        assert taille == ENTETE_JOURNAL.size + len(journal.enregistrements_actions)
+        os.truncate(chemin, taille - 1)
+        with open(chemin, 'rb') as fichier:
+            enregistrements = lire_journal(fichier.read())[-1]
+        assert enregistrements[-1] == Action(*ENREGISTREMENT_ACTION.unpack_from(journal.enregistrements_actions,
+                                                                                 -2 * ENREGISTREMENT_ACTION.size))
+        recuperer_partie(chemin)
+
+        # le journal ne garde que le dernier instantané: sa taille ne dépend que du nombre d'actions
+        instantane = len(JournalPartie.encoder_instantane(tableau, 0, 0))
+        tableau = Tableau(30, 20, 90, graine=4)
+        journal = JournalPartie(chemin, tableau, intervalle=10)
+        jouer_partie(tableau, journal, 200)
+        journal.fermer()
+        assert os.path.getsize(chemin) <= ENTETE_JOURNAL.size + len(journal.enregistrements_actions) + instantane
+        assert not os.path.exists(chemin + '.tmp')
+        with open(chemin, 'rb') as fichier:
+            enregistrements = lire_journal(fichier.read())[-1]
+        assert sum(isinstance(enregistrement, Instantane) for enregistrement in enregistrements) == 1
+
+        # un fichier qui n'est pas un journal est refusé
+        trop_de_mines = ENTETE_JOURNAL.pack(SIGNATURE_JOURNAL, VERSION_JOURNAL, 2, 2, 5, 0)
+        for donnees_invalides in (b'', b'DMNR' + bytes(30), trop_de_mines):
+            try:
+                lire_journal(donnees_invalides)
+                assert False
+            except ValueError:
+                pass
+
+        # une action corrompue (type inconnu ou case hors du tableau) est refusée, plutôt que d'être appliquée
+        entete = ENTETE_JOURNAL.pack(SIGNATURE_JOURNAL, VERSION_JOURNAL, 30, 20, 90, 4)
+        for action_invalide in ((ACTION_POSER_DRAPEAU, 31, 1, 0), (ACTION_DEVOILER, 1, 0, 0), (7, 1, 1, 0)):
+            with open(chemin, 'wb') as fichier:
+                fichier.write(entete + ENREGISTREMENT_ACTION.pack(*action_invalide))
+            try:
+                recuperer_partie(chemin)
+                assert False
+            except ValueError:
+                pass
+
+def test_rejouer_partie():
+    import os
+    from tempfile import TemporaryDirectory
+
+    with TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'journal.dmj')
+        tableau = Tableau(16, 16, 40, graine=9)
+        journal = JournalPartie(chemin, tableau, intervalle=7)
+        jouer_partie(tableau, journal, 150, graine=1)
+        journal.fermer()
+
+        # la partie est rejouée action par action, jusqu'au même tableau
+        with open(chemin, 'rb') as fichier:
+            etapes = list(rejouer_partie(fichier.read()))
+        assert len(etapes) > 20 and etapes[-1][1].grille == tableau.grille
+
+        # une partie déjà commencée commence par un instantané, d'où elle est rejouée
+        journal = JournalPartie(chemin, tableau, compteur=3, chrono=8)
+        journal.ajouter(ACTION_POSER_DRAPEAU, 1, 1, 9000)
+        journal.fermer()
+        tableau.basculer_drapeau(1, 1)
+        with open(chemin, 'rb') as fichier:
+            (action, tableau_rejoue), = rejouer_partie(fichier.read())
+        assert action == Action(ACTION_POSER_DRAPEAU, 1, 1, 9000) and tableau_rejoue.grille == tableau.grille
+        assert recuperer_partie(chemin)[1:3] == (3, 9)
+
+def test_partie_coups():
+    import os
+    from tempfile import TemporaryDirectory
+    from sauvegarde import charger_partie
+
+    with TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'journal.dmj')
+        tableau = Tableau(40, 30, 150, graine=6)
+        journal = JournalPartie(chemin, tableau)
+        compteur = jouer_partie(tableau, journal, 300, graine=2)
+        journal.fermer()
+
+        # quatre octets par action plutôt que trois bits par case; la partie rejouée est la même
+        donnees = encoder_partie_coups(tableau, journal.actions, compteur, 12)
+        assert len(donnees) == ENTETE.size + 4 * len(journal.actions)
+        tableau_rejoue, compteur_rejoue, chrono, actions = decoder_partie_coups(donnees)
+        assert tableau_rejoue.grille == tableau.grille and (compteur_rejoue, chrono) == (compteur, 12)
+        assert tableau_rejoue.nombre_cases_sans_mine_a_devoiler == tableau.nombre_cases_sans_mine_a_devoiler
+
+        # charger_partie ouvre aussi les sauvegardes par coups
+        chemin = os.path.join(dossier, 'partie.dmn')
+        enregistrer_partie_coups(chemin, tableau, actions, compteur, 12)
+        assert est_partie_coups(chemin) and charger_partie(chemin)[0].grille == tableau.grille
+
+        # le journal d'une partie ouverte reprend ses coups (sans instantané), et on peut continuer à la
+        # sauvegarder par coups
+        journal = JournalPartie(os.path.join(dossier, 'journal.dmj'), tableau_rejoue, actions=actions)
+        jouer_partie(tableau_rejoue, journal, 50, graine=3)
+        journal.fermer()
+        assert decoder_partie_coups(encoder_partie_coups(tableau_rejoue, journal.actions))[0].grille == \
+            tableau_rejoue.grille
+
+        # un journal qui commence par un instantané ne connaît pas les coups de la partie
+        journal = JournalPartie(os.path.join(dossier, 'journal.dmj'), tableau_rejoue)
+        journal.fermer()
+        assert journal.actions is None
+
+        trop_de_mines = ENTETE.pack(SIGNATURE, VERSION_COUPS, 0, 2, 2, 5, 0, 0, 0)
+        sans_colonne = ENTETE.pack(SIGNATURE, VERSION_COUPS, 0, 2, 0, 0, 0, 0, 0) + bytes(4)
+        for donnees_invalides in (donnees[:-1], donnees[:ENTETE.size] + b'\xff' * 4, trop_de_mines, sans_colonne):
+            try:
+                decoder_partie_coups(donnees_invalides)
+                assert False
+            except ValueError:
+                pass
+
+def test_partie_projetee():
+    import os
+    from tempfile import TemporaryDirectory
+    from sauvegarde import enregistrer_partie_projetable
+
+    with TemporaryDirectory() as dossier:
+        chemin, chemin_partie = os.path.join(dossier, 'journal.dmj'), os.path.join(dossier, 'partie.dmn')
+        tableau = Tableau(30, 20, 90, graine=5)
+        tableau.devoiler_case(15, 10)
+        enregistrer_partie_projetable(chemin_partie, tableau, compteur=1, chrono=4)
+
+        # le journal d'une partie projetée y fait référence, sans jamais d'instantané
+        partie = PartieProjetee(chemin_partie)
+        journal = JournalPartie(chemin, partie.tableau, 1, 4, intervalle=10, partie_projetee=partie)
+        compteur = jouer_partie(partie.tableau, journal, 200, graine=7)
+        journal.fermer()
+        assert not journal.instantane_du and journal.actions is None
+        with open(chemin, 'rb') as fichier:
+            donnees = fichier.read()
+        enregistrements = lire_journal(donnees)[-1]
+        assert enregistrements[0] == ReferencePartieProjetee(os.path.abspath(chemin_partie), 1, 4)
+        assert not any(isinstance(enregistrement, Instantane) for enregistrement in enregistrements)
+
+        # la reprise rouvre la partie projetée, sans jamais en avoir enregistré l'en-tête
+        grille = bytes(partie.tableau.grille)
+        cases_a_devoiler = partie.tableau.nombre_cases_sans_mine_a_devoiler
+        partie.fermer()
+        tableau_repris, compteur_repris, chrono, partie_reprise = recuperer_partie(chemin)
+        assert bytes(tableau_repris.grille) == grille and compteur_repris == compteur + 1 and chrono > 4
+        assert tableau_repris.nombre_cases_sans_mine_a_devoiler == cases_a_devoiler
+        partie_reprise.fermer()
+
+        try:
+            list(rejouer_partie(donnees))
+            assert False
+        except ValueError:
+            pass
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_recuperer_partie()
+    test_rejouer_partie()
+    test_partie_coups()
+    test_partie_projetee()
+    print('Tests réussis!')
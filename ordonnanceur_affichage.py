@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe OrdonnanceurAffichage. Plutôt que de modifier la fenêtre à chaque
+changement (un clic, une étape d'un dévoilement, une seconde du chronomètre), on note ce qui a changé et on
+applique tous les changements ensemble, au plus une fois par image.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+from time import monotonic
+
+# Durée minimale (en secondes) entre deux mises à jour de l'affichage (environ 60 images par seconde)
+DUREE_IMAGE = 0.016
+
+
+class OrdonnanceurAffichage:
+    """
+    Ordonnanceur des mises à jour de l'affichage: les textes des étiquettes (compteur de tours, chronomètre,
+    score) et les cases du canevas à redessiner. Un texte n'est appliqué que s'il diffère de celui qui est
+    affiché, et seul le dernier texte demandé pour une étiquette compte. Les widgets sont placés (pack) une
+    seule fois, à la création de la fenêtre: changer un texte ne demande pas de les replacer.
+
+    Attributes:
+        canevas (CanevasTableau): Le canevas dont on redessine les cases (sa méthode after planifie les mises
+                                  à jour)
+        duree_image (float): Durée minimale entre deux mises à jour, en secondes
+        textes (dict): Les textes à appliquer, par widget
+        textes_affiches (dict): Les derniers textes appliqués, par widget
+        cases (list): Les indices des cases à redessiner
+        redessiner_fenetre (bool): True s'il y a plus de cases à redessiner que la fenêtre du canevas n'en
+                                   contient (on redessine alors toute la fenêtre)
+        tache (str): L'identifiant de la prochaine mise à jour planifiée (ou None)
+        derniere_mise_a_jour (float): Le moment de la dernière mise à jour (horloge monotone)
+        nombre_mises_a_jour (int): Nombre de mises à jour appliquées
+    """
+
+    def __init__(self, canevas, duree_image=DUREE_IMAGE):
+        """
+        Initialisation d'un ordonnanceur sans changement en attente.
+
+        Args:
+            canevas (CanevasTableau): Le canevas dont on redessine les cases
+            duree_image (float): Durée minimale entre deux mises à jour, en secondes (par défaut, DUREE_IMAGE)
+        """
+        self.canevas = canevas
+        self.duree_image = duree_image
+        self.textes = {}
+        self.textes_affiches = {}
+        self.cases = []
+        self.redessiner_fenetre = False
+        self.tache = None
+        self.derniere_mise_a_jour = 0.0
+        self.nombre_mises_a_jour = 0
+
+    def planifier(self):
+        """
+        Planifie la prochaine mise à jour (si ce n'est pas déjà fait), au plus tôt une image après la
+        précédente.
+        """
+        if self.tache is None:
+            delai = self.derniere_mise_a_jour + self.duree_image - monotonic()
+            self.tache = self.canevas.after(max(0, int(delai * 1000)), self.appliquer)
+
+    def changer_texte(self, widget, texte):
+        """
+        Demande de changer le texte d'un widget à la prochaine mise à jour.
+
+        Args:
+            widget (Widget): Le widget (par exemple, une étiquette ou un bouton)
+            texte (str): Son nouveau texte
+        """
+        self.textes[widget] = texte
+        self.planifier()
+
+    def ajouter_cases(self, indices):
+        """
+        Demande de redessiner des cases à la prochaine mise à jour.
+
+        Args:
+            indices (list): Les indices des cases dans la grille du tableau
+        """
+        if not self.redessiner_fenetre:
+            self.cases += indices
+            if len(self.cases) > self.canevas.compter_cases_fenetre():
+                self.cases = []
+                self.redessiner_fenetre = True
+        self.planifier()
+
+    def oublier_cases(self):
+        """
+        Oublie les cases à redessiner, par exemple lorsque le canevas change de tableau (il redessine alors
+        toute sa fenêtre).
+        """
+        self.cases = []
+        self.redessiner_fenetre = False
+
+    def appliquer(self):
+        """
+        Applique tous les changements en attente: les cases, puis les textes qui ont changé.
+        """
+        self.tache = None
+        self.derniere_mise_a_jour = monotonic()
+        self.nombre_mises_a_jour += 1
+
+        if self.redessiner_fenetre:
+            self.canevas.redessiner()
+        elif self.cases:
+            self.canevas.dessiner_cases(self.cases)
+        self.oublier_cases()
+
+        for widget, texte in self.textes.items():
+            if self.textes_affiches.get(widget) != texte:
+                widget['text'] = texte
+                self.textes_affiches[widget] = texte
+        self.textes.clear()
+
+    def annuler(self):
+        """
+        Abandonne les changements en attente et la mise à jour planifiée.
+        """
+        self.oublier_cases()
+        self.textes.clear()
+        if self.tache is not None:
+            self.canevas.after_cancel(self.tache)
+            self.tache = None
+
+
+#### Tests unitaires ###
+
+class CanevasSansAffichage:
+    """
+    Remplace un CanevasTableau pour les tests: les mises à jour planifiées avec after sont exécutées par
+    executer(), et les cases dessinées sont comptées.
+    """
+
+    def __init__(self, nombre_cases_fenetre):
+        self.nombre_cases_fenetre = nombre_cases_fenetre
+        self.planifiees = {}
+        self.cases_dessinees = []
+        self.fenetres_redessinees = 0
+
+    def after(self, delai, fonction):
+        identifiant = str(len(self.planifiees) + 1)
+        self.planifiees[identifiant] = fonction
+        return identifiant
+
+    def after_cancel(self, identifiant):
+        del self.planifiees[identifiant]
+
+    def executer(self):
+        while self.planifiees:
+            self.planifiees.pop(next(iter(self.planifiees)))()
+
+    def compter_cases_fenetre(self):
+        return self.nombre_cases_fenetre
+
+    def dessiner_cases(self, indices):
+        self.cases_dessinees.append(list(indices))
+
+    def redessiner(self):
+        self.fenetres_redessinees += 1
+
+
+class EtiquetteSansAffichage(dict):
+    """
+    Remplace une étiquette Tkinter pour les tests: compte les changements de texte.
+    """
+
+    changements = 0
+
+    def __setitem__(self, cle, valeur):
+        self.changements += 1
+        super().__setitem__(cle, valeur)
+
+    __hash__ = object.__hash__
+
+
+def test_regroupement():
+
+    canevas = CanevasSansAffichage(100)
+    ordonnanceur = OrdonnanceurAffichage(canevas)
+    compteur, chrono = EtiquetteSansAffichage(), EtiquetteSansAffichage()
+
+    # plusieurs changements avant la mise à jour: une seule mise à jour, avec le dernier texte de chacun
+    for tour in range(1, 11):
+        ordonnanceur.changer_texte(compteur, 'Tour: ' + str(tour))
+        ordonnanceur.ajouter_cases([tour])
+    ordonnanceur.changer_texte(chrono, 'Temps: 3 secs')
+    assert len(canevas.planifiees) == 1
+    canevas.executer()
+    assert ordonnanceur.nombre_mises_a_jour == 1
+    assert compteur == {'text': 'Tour: 10'} and compteur.changements == 1
+    assert canevas.cases_dessinees == [list(range(1, 11))]
+
+    # un texte identique à celui qui est affiché n'est pas appliqué de nouveau
+    ordonnanceur.changer_texte(chrono, 'Temps: 3 secs')
+    canevas.executer()
+    assert chrono.changements == 1 and ordonnanceur.nombre_mises_a_jour == 2
+
+def test_redessiner_fenetre():
+
+    canevas = CanevasSansAffichage(100)
+    ordonnanceur = OrdonnanceurAffichage(canevas)
+
+    # plus de cases que la fenêtre n'en contient: on redessine la fenêtre, sans garder la liste des cases
+    for debut in range(0, 1000, 50):
+        ordonnanceur.ajouter_cases(list(range(debut, debut + 50)))
+    assert ordonnanceur.redessiner_fenetre and not ordonnanceur.cases
+    canevas.executer()
+    assert canevas.fenetres_redessinees == 1 and not canevas.cases_dessinees
+
+    # les changements abandonnés ne sont jamais appliqués
+    ordonnanceur.ajouter_cases([1, 2, 3])
+    ordonnanceur.annuler()
+    canevas.executer()
+    assert not canevas.cases_dessinees and ordonnanceur.nombre_mises_a_jour == 1
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_regroupement()
+    test_redessiner_fenetre()
+    print('Tests réussis!')
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe ReserveTableaux. La réserve garde des tableaux prêts à jouer
+(dont les mines sont déjà placées), préparés par un processus léger en arrière-plan, pour que le début d'une
+partie n'ait pas à attendre la génération du tableau.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+import threading
+from collections import OrderedDict
+from queue import Queue
+from tableau import Tableau
+
+
+class ReserveTableaux:
+    """
+    Réserve de tableaux prégénérés (voir Tableau.pregenerer), classés par préréglage (rangées, colonnes, mines).
+    Chaque fois qu'on prend un tableau d'un préréglage, un processus léger en prépare un autre pour le remplacer.
+    Seuls les préréglages reçus à la création de la réserve sont préparés: une taille personnalisée (peut-être
+    immense) n'est jamais générée en arrière-plan, où elle monopoliserait l'interpréteur (et donc l'interface)
+    pendant toute sa génération; ses tableaux sont créés au besoin, et leurs mines placées au premier dévoilement.
+    Les préréglages sont gardés du plus ancien au plus récemment demandé: lorsque la réserve dépasse sa taille
+    maximale, les tableaux du préréglage demandé le moins récemment sont retirés.
+
+    Attributes:
+        prereglages (frozenset): Les préréglages (rangées, colonnes, mines) que la réserve prépare
+        taille_max (int): Nombre maximal de tableaux prêts dans la réserve
+        tableaux_par_prereglage (int): Nombre de tableaux prêts visés pour chaque préréglage
+        tableaux_prets (OrderedDict): Listes des tableaux prêts, par préréglage (rangées, colonnes, mines),
+                                      du préréglage le moins au plus récemment demandé
+        statistiques (dict): Nombre de tableaux pris dans la réserve (succes), de demandes auxquelles la réserve
+                             n'a pas pu répondre (echecs), de tableaux générés et de tableaux retirés
+        verrou (Lock): Verrou qui protège tableaux_prets et statistiques
+        demandes (Queue): Préréglages à remplir par le processus léger (None pour l'arrêter)
+        processus_leger (Thread): Le processus léger qui génère les tableaux
+    """
+
+    def __init__(self, prereglages=(), taille_max=8, tableaux_par_prereglage=1):
+        """
+        Initialisation de la réserve. Le processus léger commence tout de suite à remplir les préréglages reçus.
+
+        Args:
+            prereglages (iterable): Préréglages (rangées, colonnes, mines) à préparer dès le départ
+            taille_max (int): Nombre maximal de tableaux prêts dans la réserve (par défaut, 8)
+            tableaux_par_prereglage (int): Nombre de tableaux prêts visés pour chaque préréglage (par défaut, 1)
+        """
+        self.prereglages = frozenset(tuple(prereglage) for prereglage in prereglages)
+        self.taille_max = taille_max
+        self.tableaux_par_prereglage = tableaux_par_prereglage
+        self.tableaux_prets = OrderedDict()
+        self.statistiques = {'succes': 0, 'echecs': 0, 'generes': 0, 'retires': 0}
+        self.verrou = threading.Lock()
+        self.demandes = Queue()
+
+        for prereglage in prereglages:
+            self.tableaux_prets[tuple(prereglage)] = []
+            self.demandes.put(tuple(prereglage))
+
+        self.processus_leger = threading.Thread(target=self.remplir, name='reserve_tableaux', daemon=True)
+        self.processus_leger.start()
+
+    def obtenir_tableau(self, dimension_rangee, dimension_colonne, nombre_mines):
+        """
+        Retourne un tableau prêt à jouer. S'il n'y en a pas dans la réserve, on crée un nouveau tableau (dont les
+        mines seront placées au premier dévoilement). Dans les deux cas, si c'est un des préréglages de la
+        réserve, on demande au processus léger de préparer son prochain tableau; une taille personnalisée ne
+        passe pas par la réserve et ne compte pas dans ses statistiques.
+
+        Args:
+            dimension_rangee (int): Nombre de rangées du tableau
+            dimension_colonne (int): Nombre de colonnes du tableau
+            nombre_mines (int): Nombre de mines du tableau
+
+        Returns:
+            Tableau: Un tableau dont aucune case n'a été dévoilée
+        """
+        prereglage = (dimension_rangee, dimension_colonne, nombre_mines)
+        if prereglage not in self.prereglages:
+            return Tableau(dimension_rangee, dimension_colonne, nombre_mines)
+
+        with self.verrou:
+            tableaux = self.tableaux_prets.setdefault(prereglage, [])
+            self.tableaux_prets.move_to_end(prereglage)
+
+            if tableaux:
+                self.statistiques['succes'] += 1
+                tableau = tableaux.pop()
+            else:
+                self.statistiques['echecs'] += 1
+                tableau = None
+
+        self.demandes.put(prereglage)
+        return tableau if tableau is not None else Tableau(dimension_rangee, dimension_colonne, nombre_mines)
+
+    def remplir(self):
+        """
+        Boucle du processus léger: pour chaque préréglage demandé, on génère les tableaux qui manquent, puis on
+        retire les tableaux en trop des préréglages les moins récemment demandés.
+        """
+        while True:
+            prereglage = self.demandes.get()
+            if prereglage is None:
+                self.demandes.task_done()
+                return
+
+            while True:
+                with self.verrou:
+                    tableaux = self.tableaux_prets.get(prereglage)
+                    if tableaux is None or len(tableaux) >= self.tableaux_par_prereglage:
+                        break
+
+                # la génération se fait sans le verrou, pour ne pas bloquer obtenir_tableau
+                tableau = Tableau(*prereglage)
+                tableau.pregenerer()
+
+                with self.verrou:
+                    self.statistiques['generes'] += 1
+                    self.tableaux_prets.setdefault(prereglage, []).append(tableau)
+                    self.evincer()
+
+            self.demandes.task_done()
+
+    def attendre(self):
+        """
+        Attend que le processus léger ait traité toutes les demandes reçues jusqu'ici.
+        """
+        self.demandes.join()
+
+    def evincer(self):
+        """
+        Retire les tableaux des préréglages les moins récemment demandés tant que la réserve dépasse sa taille
+        maximale. Doit être appelée avec le verrou.
+        """
+        while sum(len(tableaux) for tableaux in self.tableaux_prets.values()) > self.taille_max:
+            prereglage, tableaux = next(iter(self.tableaux_prets.items()))
+            self.statistiques['retires'] += len(tableaux)
+            del self.tableaux_prets[prereglage]
+
+    def taux_succes(self):
+        """
+        Calcule la proportion des demandes de tableau auxquelles la réserve a pu répondre.
+
+        Returns:
+            float: Le taux de succès (entre 0 et 1), ou 0 s'il n'y a eu aucune demande
+        """
+        with self.verrou:
+            nombre_demandes = self.statistiques['succes'] + self.statistiques['echecs']
+            return self.statistiques['succes'] / nombre_demandes if nombre_demandes else 0.0
+
+    def fermer(self):
+        """
+        Arrête le processus léger et vide la réserve.
+        """
+        self.demandes.put(None)
+        self.processus_leger.join()
+        with self.verrou:
+            self.tableaux_prets.clear()
+
+
+#### Tests unitaires ###
+
+def test_reserve():
+
+    reserve = ReserveTableaux([(5, 5, 5)])
+    reserve.attendre()
+
+    # le préréglage prévu est prêt: ses mines sont déjà placées
+    tableau = reserve.obtenir_tableau(5, 5, 5)
+    assert tableau.mines_placees and tableau.premier_clic_en_attente
+    assert reserve.statistiques['succes'] == 1
+
+    # un préréglage évincé est d'abord un échec, puis il est prêt de nouveau
+    with reserve.verrou:
+        del reserve.tableaux_prets[(5, 5, 5)]
+    assert not reserve.obtenir_tableau(5, 5, 5).mines_placees
+    reserve.attendre()
+    assert reserve.obtenir_tableau(5, 5, 5).mines_placees
+    assert reserve.taux_succes() == 2 / 3
+
+    # une taille personnalisée n'est jamais préparée en arrière-plan
+    for _ in range(2):
+        assert not reserve.obtenir_tableau(1000, 1000, 150000).mines_placees
+        reserve.attendre()
+    assert (1000, 1000, 150000) not in reserve.tableaux_prets and reserve.statistiques['generes'] == 3
+    assert reserve.taux_succes() == 2 / 3
+    reserve.fermer()
+
+def test_eviction():
+
+    reserve = ReserveTableaux([(5, 5, 5), (6, 6, 6), (7, 7, 7)], taille_max=2)
+    reserve.attendre()
+
+    # le préréglage le moins récemment demandé a été retiré
+    assert list(reserve.tableaux_prets) == [(6, 6, 6), (7, 7, 7)]
+    assert reserve.statistiques['retires'] == 1
+    reserve.fermer()
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_reserve()
+    test_eviction()
+    print('Tests réussis!')
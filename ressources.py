@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe RegistreRessources. Le registre charge (et décode) chaque image
+et chaque son du jeu une seule fois, puis les partage entre toutes les cases et toutes les parties.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+from tkinter import PhotoImage
+
+
+class RegistreRessources:
+    """
+    Registre des ressources (images et sons) du jeu, chargées au premier usage et gardées jusqu'à ce qu'on les
+    libère (à la fermeture du jeu).
+
+    Attributes:
+        maitre (Tk): La fenêtre à laquelle les images sont associées
+        ressources (dict): Les ressources chargées, par clé (le type de ressource et le chemin du fichier)
+        chargements (int): Nombre de fichiers chargés depuis la création du registre
+    """
+
+    def __init__(self, maitre=None):
+        """
+        Initialisation d'un registre vide.
+
+        Args:
+            maitre (Tk): La fenêtre à laquelle les images sont associées (par défaut, la fenêtre principale)
+        """
+        self.maitre = maitre
+        self.ressources = {}
+        self.chargements = 0
+
+    def obtenir(self, cle, charger):
+        """
+        Retourne la ressource associée à une clé, en la chargeant si ce n'est pas déjà fait.
+
+        Args:
+            cle (hashable): La clé de la ressource
+            charger (callable): Fonction sans argument qui charge la ressource
+
+        Returns:
+            object: La ressource
+        """
+        ressource = self.ressources.get(cle)
+        if ressource is None:
+            ressource = self.ressources[cle] = charger()
+            self.chargements += 1
+        return ressource
+
+    def obtenir_image(self, chemin):
+        """
+        Retourne une image (le fichier n'est décodé qu'une seule fois).
+
+        Args:
+            chemin (str): Le chemin du fichier de l'image (.gif ou .png)
+
+        Returns:
+            PhotoImage: L'image
+        """
+        return self.obtenir(('image', chemin), lambda: PhotoImage(master=self.maitre, file=chemin))
+
+    def obtenir_son(self, chemin):
+        """
+        Retourne un son (le fichier n'est chargé qu'une seule fois). Le module pygame n'est importé qu'au
+        premier son demandé.
+
+        Args:
+            chemin (str): Le chemin du fichier du son (.wav)
+
+        Returns:
+            pygame.mixer.Sound: Le son
+        """
+        def charger():
+            import pygame
+            return pygame.mixer.Sound(chemin)
+
+        return self.obtenir(('son', chemin), charger)
+
+    def liberer(self):
+        """
+        Libère toutes les ressources chargées (les images sont retirées de Tk dès qu'elles ne sont plus
+        référencées).
+        """
+        self.ressources.clear()
+
+
+#### Tests unitaires ###
+
+def test_registre():
+
+    registre = RegistreRessources()
+    chargements = []
+
+    def charger():
+        chargements.append(1)
+        return object()
+
+    # la ressource n'est chargée qu'une seule fois, et c'est toujours le même objet qui est retourné
+    ressource = registre.obtenir(('image', 'png/mine.gif'), charger)
+    assert all(registre.obtenir(('image', 'png/mine.gif'), charger) is ressource for _ in range(1000))
+    assert len(chargements) == registre.chargements == 1
+
+    # une fois libérée, elle est rechargée au prochain usage
+    registre.liberer()
+    assert registre.obtenir(('image', 'png/mine.gif'), charger) is not ressource
+    assert registre.chargements == 2
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_registre()
+    print('Tests réussis!')
@@ -0,0 +1,601 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant le format de sauvegarde binaire des parties. Un fichier de sauvegarde contient un en-tête
+(signature, version du format, dimensions et état de la partie), suivi de trois plans de bits: les mines, les
+cases dévoilées et les drapeaux, un bit par case, case par case dans l'ordre des rangées. Le nombre de mines
+voisines n'est pas sauvegardé: il est recalculé à partir des mines (voir Tableau.depuis_etat).
+
+Pour les très grands tableaux, le format projetable (version 2) contient plutôt la grille compacte du tableau
+telle quelle (voir Tableau.grille), un octet par case. Le fichier est projeté en mémoire (mmap) et sert
+directement de grille au tableau (voir PartieProjetee): seules les pages que le joueur consulte sont lues, et
+chaque case dévoilée est écrite sur place.
+
+Une partie peut aussi être sauvegardée par ses coups seulement (version 3): elle est alors rejouée à partir de
+sa graine (voir le module journal).
+
+Les anciennes sauvegardes (un dictionnaire Python écrit en texte) peuvent être importées avec
+importer_partie_texte, sans eval.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+from ast import literal_eval
+from mmap import mmap
+from struct import Struct
+from case import BIT_MINE, BIT_DEVOILEE, BIT_DRAPEAU
+from tableau import Tableau
+
+# Les quatre premiers octets d'un fichier de sauvegarde
+SIGNATURE = b'DMNR'
+
+# Version du format de sauvegarde (à incrémenter à chaque changement de l'en-tête ou des plans)
+VERSION_FORMAT = 1
+
+# Version du format projetable (l'en-tête, puis la grille compacte telle quelle)
+VERSION_GRILLE = 2
+
+# Version du format par coups (l'en-tête, puis les actions du joueur, voir le module journal)
+VERSION_COUPS = 3
+
+# En-tête: signature, version, options, rangées, colonnes, mines, graine, compteur de tours et chronomètre
+ENTETE = Struct('<4sHHIIIQII')
+
+# En-tête du format projetable: le même, suivi du nombre de cases sans mine à dévoiler (qu'on ne peut pas
+# recalculer sans lire toute la grille)
+ENTETE_GRILLE = Struct('<4sHHIIIQIIQ')
+
+# Options de l'en-tête
+OPTION_MINES_PLACEES = 0x01
+OPTION_PREMIER_CLIC_EN_ATTENTE = 0x02
+
+# Ordre des plans de bits dans le fichier
+BITS_PLANS = (BIT_MINE, BIT_DEVOILEE, BIT_DRAPEAU)
+
+# Tables de traduction: d'un octet de la grille vers le chiffre ('0' ou '1') de chacun des plans, et d'un
+# chiffre vers un octet de valeur 0 ou 1
+TABLES_CHIFFRES = {bit: bytes(ord('1') if octet & bit else ord('0') for octet in range(256)) for bit in BITS_PLANS}
+TABLE_UNITES = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def empaqueter_plan(chiffres):
+    """
+    Empaquette un plan de bits: la case i donne le bit i (le bit de poids faible du premier octet est celui
+    de la première case).
+
+    Args:
+        chiffres (bytes): Un chiffre ASCII ('0' ou '1') par case
+
+    Returns:
+        bytes: Le plan de bits (un octet pour huit cases)
+    """
+    return int(chiffres[::-1] or b'0', 2).to_bytes((len(chiffres) + 7) // 8, 'little')
+
+
+def depaqueter_plan(plan, nombre_cases):
+    """
+    Dépaquette un plan de bits (voir empaqueter_plan).
+
+    Args:
+        plan (bytes): Le plan de bits
+        nombre_cases (int): Nombre de cases du plan
+
+    Returns:
+        bytes: Un octet par case, qui vaut 1 si le bit de la case est activé et 0 autrement
+    """
+    chiffres = format(int.from_bytes(plan, 'little'), 'b').zfill(nombre_cases)[::-1][:nombre_cases]
+    return chiffres.encode('ascii').translate(TABLE_UNITES)
+
+
+def valider_dimensions(dimension_rangee, dimension_colonne, nombre_mines):
+    """
+    Valide les dimensions et le nombre de mines lus dans une sauvegarde, avant d'allouer quoi que ce soit.
+
+    Args:
+        dimension_rangee (int): Nombre de rangées du tableau
+        dimension_colonne (int): Nombre de colonnes du tableau
+        nombre_mines (int): Nombre de mines du tableau
+
+    Raises:
+        ValueError: Si le tableau est vide ou s'il a plus de mines que de cases
+    """
+    if dimension_rangee < 1 or dimension_colonne < 1 or not 0 <= nombre_mines <= dimension_rangee * dimension_colonne:
+        raise ValueError("Ce fichier n'est pas une sauvegarde de partie")
+
+
+def extraire_cases(tableau):
+    """
+    Retourne les octets des cases d'un tableau, rangée par rangée, sans la bordure de la grille.
+
+    Args:
+        tableau (Tableau): Le tableau
+
+    Returns:
+        bytes: Un octet par case (voir Tableau.grille)
+    """
+    grille, largeur, nombre_colonnes = tableau.grille, tableau.largeur, tableau.dimension_colonne
+    return b''.join(grille[rangee_x * largeur + 1:rangee_x * largeur + 1 + nombre_colonnes]
+                    for rangee_x in range(1, tableau.dimension_rangee + 1))
+
+
+def encoder_partie(tableau, compteur=0, chrono=0):
+    """
+    Encode une partie dans le format de sauvegarde binaire.
+
+    Args:
+        tableau (Tableau): Le tableau de la partie
+        compteur (int): Nombre de tours joués
+        chrono (int): Temps de jeu, en secondes
+
+    Returns:
+        bytes: Le contenu du fichier de sauvegarde
+    """
+    entete = ENTETE.pack(SIGNATURE, VERSION_FORMAT, obtenir_options(tableau), tableau.dimension_rangee,
+                         tableau.dimension_colonne, tableau.nombre_mines, tableau.graine, compteur, chrono)
+    cases = extraire_cases(tableau)
+    return entete + b''.join(empaqueter_plan(cases.translate(TABLES_CHIFFRES[bit])) for bit in BITS_PLANS)
+
+
+def decoder_partie(donnees):
+    """
+    Décode une partie sauvegardée dans le format binaire.
+
+    Args:
+        donnees (bytes): Le contenu du fichier de sauvegarde
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int) et le temps de jeu (int)
+
+    Raises:
+        ValueError: Si ce n'est pas une sauvegarde, si sa version n'est pas reconnue ou si elle est tronquée
+                    (ou si son plan des mines ne contient pas le nombre de mines de son en-tête)
+    """
+    if len(donnees) < ENTETE.size or donnees[:len(SIGNATURE)] != SIGNATURE:
+        raise ValueError("Ce fichier n'est pas une sauvegarde de partie")
+
+    version = ENTETE.unpack_from(donnees)[1]
+    if version == VERSION_GRILLE:
+        return decoder_partie_grille(donnees)
+    if version == VERSION_COUPS:
+        # le format par coups rejoue la partie (voir le module journal, qui dépend de celui-ci)
+        from journal import decoder_partie_coups
+        return decoder_partie_coups(donnees)[:3]
+    if version != VERSION_FORMAT:
+        raise ValueError(f'Version de sauvegarde non reconnue: {version}')
+
+    (_, _, options, dimension_rangee, dimension_colonne, nombre_mines, graine,
+     compteur, chrono) = ENTETE.unpack_from(donnees)
+    valider_dimensions(dimension_rangee, dimension_colonne, nombre_mines)
+
+    nombre_cases = dimension_rangee * dimension_colonne
+    taille_plan = (nombre_cases + 7) // 8
+    if len(donnees) != ENTETE.size + len(BITS_PLANS) * taille_plan:
+        raise ValueError('Sauvegarde tronquée ou corrompue')
+
+    vue = memoryview(donnees)
+    plans = [depaqueter_plan(vue[ENTETE.size + numero * taille_plan:ENTETE.size + (numero + 1) * taille_plan],
+                             nombre_cases)
+             for numero in range(len(BITS_PLANS))]
+    if options & OPTION_MINES_PLACEES and plans[0].count(1) != nombre_mines:
+        raise ValueError('Sauvegarde tronquée ou corrompue')
+
+    tableau = Tableau.depuis_etat(dimension_rangee, dimension_colonne, nombre_mines, graine, mines=plans[0],
+                                  devoilees=plans[1], drapeaux=plans[2],
+                                  mines_placees=bool(options & OPTION_MINES_PLACEES),
+                                  premier_clic_en_attente=bool(options & OPTION_PREMIER_CLIC_EN_ATTENTE))
+    return tableau, compteur, chrono
+
+
+def obtenir_options(tableau):
+    """
+    Calcule les options de l'en-tête d'une sauvegarde.
+
+    Args:
+        tableau (Tableau): Le tableau de la partie
+
+    Returns:
+        int: Les options (OPTION_MINES_PLACEES, OPTION_PREMIER_CLIC_EN_ATTENTE)
+    """
+    return ((OPTION_MINES_PLACEES if tableau.mines_placees else 0) |
+            (OPTION_PREMIER_CLIC_EN_ATTENTE if tableau.premier_clic_en_attente else 0))
+
+
+def lire_entete_grille(donnees):
+    """
+    Lit et valide l'en-tête d'une sauvegarde dans le format projetable.
+
+    Args:
+        donnees (bytes ou mmap): Le contenu du fichier de sauvegarde
+
+    Returns:
+        tuple: Les champs de l'en-tête (voir ENTETE_GRILLE), sans la signature ni la version
+
+    Raises:
+        ValueError: Si ce n'est pas une sauvegarde dans le format projetable, ou si elle est tronquée
+    """
+    if len(donnees) < ENTETE_GRILLE.size or donnees[:len(SIGNATURE)] != SIGNATURE:
+        raise ValueError("Ce fichier n'est pas une sauvegarde de partie")
+
+    champs = ENTETE_GRILLE.unpack_from(donnees)
+    if champs[1] != VERSION_GRILLE:
+        raise ValueError(f'Version de sauvegarde non reconnue: {champs[1]}')
+
+    dimension_rangee, dimension_colonne = champs[3], champs[4]
+    valider_dimensions(dimension_rangee, dimension_colonne, champs[5])
+    if len(donnees) != ENTETE_GRILLE.size + (dimension_rangee + 2) * (dimension_colonne + 2):
+        raise ValueError('Sauvegarde tronquée ou corrompue')
+    return champs[2:]
+
+
+def creer_tableau_grille(champs, grille):
+    """
+    Crée le tableau d'une sauvegarde dans le format projetable, sur une grille déjà construite. Le nombre de
+    cases à dévoiler est recalculé à partir de la grille: les cases dévoilées d'une partie projetée sont écrites
+    sur place, alors que l'en-tête n'est mis à jour que par PartieProjetee.enregistrer (il est donc périmé si
+    le jeu a été interrompu).
+
+    Args:
+        champs (tuple): Les champs de l'en-tête (voir lire_entete_grille)
+        grille (bytearray ou memoryview): La grille compacte du tableau
+
+    Returns:
+        Tableau: Le tableau, qui utilise directement la grille reçue
+    """
+    options, dimension_rangee, dimension_colonne, nombre_mines, graine = champs[:5]
+    return Tableau.depuis_etat(dimension_rangee, dimension_colonne, nombre_mines, graine, grille=grille,
+                               mines_placees=bool(options & OPTION_MINES_PLACEES),
+                               premier_clic_en_attente=bool(options & OPTION_PREMIER_CLIC_EN_ATTENTE))
+
+
+def decoder_partie_grille(donnees):
+    """
+    Décode une partie sauvegardée dans le format projetable, en copiant sa grille (voir PartieProjetee pour
+    l'utiliser sans la copier).
+
+    Args:
+        donnees (bytes): Le contenu du fichier de sauvegarde
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int) et le temps de jeu (int)
+    """
+    champs = lire_entete_grille(donnees)
+    tableau = creer_tableau_grille(champs, bytearray(memoryview(donnees)[ENTETE_GRILLE.size:]))
+    return tableau, champs[5], champs[6]
+
+
+def enregistrer_partie_projetable(chemin, tableau, compteur=0, chrono=0):
+    """
+    Enregistre une partie dans le format projetable: l'en-tête, puis la grille du tableau telle quelle.
+
+    Args:
+        chemin (str): Le chemin du fichier
+        tableau (Tableau): Le tableau de la partie
+        compteur (int): Nombre de tours joués
+        chrono (int): Temps de jeu, en secondes
+    """
+    with open(chemin, 'wb') as fichier:
+        fichier.write(ENTETE_GRILLE.pack(SIGNATURE, VERSION_GRILLE, obtenir_options(tableau), tableau.dimension_rangee,
+                                         tableau.dimension_colonne, tableau.nombre_mines, tableau.graine, compteur,
+                                         chrono, tableau.nombre_cases_sans_mine_a_devoiler))
+        fichier.write(tableau.grille)
+
+
+def est_partie_projetable(chemin):
+    """
+    Vérifie si un fichier est une sauvegarde dans le format projetable (seul son en-tête est lu).
+
+    Args:
+        chemin (str): Le chemin du fichier
+
+    Returns:
+        bool: True si le fichier peut être ouvert avec PartieProjetee, False autrement
+    """
+    with open(chemin, 'rb') as fichier:
+        debut = fichier.read(ENTETE.size)
+    return len(debut) == ENTETE.size and debut.startswith(SIGNATURE) and ENTETE.unpack(debut)[1] == VERSION_GRILLE
+
+
+class PartieProjetee:
+    """
+    Partie sauvegardée dans le format projetable, ouverte avec mmap: le fichier sert directement de grille au
+    tableau. L'ouverture ne lit que l'en-tête; les cases sont lues par le système au moment où on y accède, et
+    chaque modification du tableau (cases dévoilées, drapeaux) est écrite dans le fichier. Le compteur de
+    tours, le chronomètre et le nombre de cases à dévoiler de l'en-tête sont écrits par enregistrer().
+
+    Attributes:
+        chemin (str): Le chemin du fichier de sauvegarde
+        fichier (file): Le fichier de sauvegarde, ouvert en lecture et écriture
+        projection (mmap): La projection en mémoire du fichier
+        tableau (Tableau): Le tableau de la partie, dont la grille est une vue sur la projection
+        compteur (int): Nombre de tours joués, à l'ouverture
+        chrono (int): Temps de jeu à l'ouverture, en secondes
+    """
+
+    def __init__(self, chemin):
+        """
+        Ouverture d'une partie sauvegardée dans le format projetable.
+
+        Args:
+            chemin (str): Le chemin du fichier
+
+        Raises:
+            ValueError: Si ce n'est pas une sauvegarde dans le format projetable, ou si elle est tronquée
+        """
+        self.chemin = chemin
+        self.fichier = open(chemin, 'r+b')
+        try:
+            self.projection = mmap(self.fichier.fileno(), 0)
+            champs = lire_entete_grille(self.projection)
+        except (OSError, ValueError):
+            self.fichier.close()
+            raise
+
+        self.tableau = creer_tableau_grille(champs, memoryview(self.projection)[ENTETE_GRILLE.size:])
+        self.compteur, self.chrono = champs[5], champs[6]
+
+    def enregistrer(self, compteur, chrono):
+        """
+        Écrit l'état de la partie dans l'en-tête, puis force l'écriture de la projection sur le disque.
+
+        Args:
+            compteur (int): Nombre de tours joués
+            chrono (int): Temps de jeu, en secondes
+        """
+        tableau = self.tableau
+        ENTETE_GRILLE.pack_into(self.projection, 0, SIGNATURE, VERSION_GRILLE, obtenir_options(tableau),
+                                tableau.dimension_rangee, tableau.dimension_colonne, tableau.nombre_mines,
+                                tableau.graine, compteur, chrono, tableau.nombre_cases_sans_mine_a_devoiler)
+        self.projection.flush()
+
+    def fermer(self):
+        """
+        Ferme la projection et le fichier (sans enregistrer l'en-tête). Le tableau ne doit plus être utilisé.
+        """
+        self.tableau.grille.release()
+        self.projection.close()
+        self.fichier.close()
+
+
+def enregistrer_partie(chemin, tableau, compteur=0, chrono=0):
+    """
+    Enregistre une partie dans un fichier de sauvegarde binaire.
+
+    Args:
+        chemin (str): Le chemin du fichier
+        tableau (Tableau): Le tableau de la partie
+        compteur (int): Nombre de tours joués
+        chrono (int): Temps de jeu, en secondes
+    """
+    with open(chemin, 'wb') as fichier:
+        fichier.write(encoder_partie(tableau, compteur, chrono))
+
+
+def charger_partie(chemin):
+    """
+    Charge une partie sauvegardée, d'une seule lecture (même une sauvegarde dans le format projetable, dont la
+    grille est alors copiée). Les anciennes sauvegardes en texte sont importées.
+
+    Args:
+        chemin (str): Le chemin du fichier
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int) et le temps de jeu (int)
+
+    Raises:
+        ValueError: Si le fichier n'est pas une sauvegarde valide
+    """
+    with open(chemin, 'rb') as fichier:
+        donnees = fichier.read()
+
+    if donnees.startswith(SIGNATURE):
+        return decoder_partie(donnees)
+    return importer_partie_texte(donnees.decode('utf-8'))
+
+
+def exporter_partie_texte(tableau, compteur=0, chrono=0):
+    """
+    Écrit une partie dans l'ancien format de sauvegarde en texte: un dictionnaire Python dont l'élément
+    'dictionnaire' associe à chaque case (x, y) la liste [est_minee, est_devoilee, nombre_mines_voisines].
+    Ce format n'est plus utilisé par le jeu; il sert à vérifier l'importation.
+
+    Args:
+        tableau (Tableau): Le tableau de la partie
+        compteur (int): Nombre de tours joués
+        chrono (int): Temps de jeu, en secondes
+
+    Returns:
+        str: Le contenu de l'ancien fichier de sauvegarde
+    """
+    dictionnaire_info_case = {coordonnees: [case.est_minee, case.est_devoilee, case.nombre_mines_voisines]
+                              for coordonnees, case in tableau.dictionnaire_cases.items()}
+    return str({'dimension_colonne': tableau.dimension_colonne, 'dimension_rangee': tableau.dimension_rangee,
+                'nombre_mines': tableau.nombre_mines, 'dictionnaire': dictionnaire_info_case,
+                'compteur': compteur, 'chrono': chrono})
+
+
+def importer_partie_texte(texte):
+    """
+    Importe une partie sauvegardée dans l'ancien format en texte (voir exporter_partie_texte). Le texte est lu
+    avec literal_eval, qui n'accepte que des valeurs littérales (jamais du code). Chaque case est validée:
+    l'ancien format contient toutes les cases du tableau, une seule fois, aux coordonnées du tableau, et
+    exactement le nombre de mines annoncé.
+
+    Args:
+        texte (str): Le contenu de l'ancien fichier de sauvegarde
+
+    Returns:
+        tuple: Le tableau (Tableau), le nombre de tours joués (int) et le temps de jeu (int)
+
+    Raises:
+        ValueError: Si le texte n'est pas une sauvegarde valide
+    """
+    try:
+        contenu_partie = literal_eval(texte)
+        dimension_rangee = int(contenu_partie['dimension_rangee'])
+        dimension_colonne = int(contenu_partie['dimension_colonne'])
+        nombre_mines = int(contenu_partie['nombre_mines'])
+        dictionnaire_info_case = dict(contenu_partie['dictionnaire'])
+        compteur, chrono = int(contenu_partie['compteur']), int(contenu_partie['chrono'])
+
+        valider_dimensions(dimension_rangee, dimension_colonne, nombre_mines)
+        if len(dictionnaire_info_case) != dimension_rangee * dimension_colonne:
+            raise ValueError
+
+        mines = bytearray(dimension_rangee * dimension_colonne)
+        devoilees = bytearray(dimension_rangee * dimension_colonne)
+        for (rangee_x, colonne_y), (est_minee, est_devoilee, _) in dictionnaire_info_case.items():
+            if not (1 <= rangee_x <= dimension_rangee and 1 <= colonne_y <= dimension_colonne):
+                raise ValueError
+            numero = (rangee_x - 1) * dimension_colonne + colonne_y - 1
+            mines[numero], devoilees[numero] = bool(est_minee), bool(est_devoilee)
+        if mines.count(1) != nombre_mines:
+            raise ValueError
+
+    except (SyntaxError, TypeError, KeyError, ValueError, MemoryError, RecursionError):
+        raise ValueError("Ce fichier n'est pas une sauvegarde de partie")
+
+    # les anciennes sauvegardes étaient faites après le premier clic, les mines étaient donc placées
+    tableau = Tableau.depuis_etat(dimension_rangee, dimension_colonne, nombre_mines, 0, mines=mines,
+                                  devoilees=devoilees)
+    return tableau, compteur, chrono
+
+
+#### Tests unitaires ###
+
+def test_plans():
+
+    for nombre_cases in (0, 1, 7, 8, 9, 1000):
+        chiffres = bytes(ord('1') if numero % 3 == 0 else ord('0') for numero in range(nombre_cases))
+        plan = empaqueter_plan(chiffres)
+        assert len(plan) == (nombre_cases + 7) // 8
+        assert depaqueter_plan(plan, nombre_cases) == chiffres.translate(TABLE_UNITES)
+
+def test_aller_retour():
+
+    # une partie en cours: des cases dévoilées, des drapeaux et des cases encore cachées
+    tableau = Tableau(30, 17, 60, graine=5)
+    tableau.devoiler_case(15, 8)
+    tableau.basculer_drapeau(1, 1)
+    tableau.basculer_drapeau(30, 17)
+
+    donnees = encoder_partie(tableau, compteur=3, chrono=42)
+    assert len(donnees) == ENTETE.size + 3 * ((30 * 17 + 7) // 8)
+
+    tableau_charge, compteur, chrono = decoder_partie(donnees)
+    assert (compteur, chrono) == (3, 42)
+    assert tableau_charge.grille == tableau.grille
+    assert tableau_charge.graine == tableau.graine and tableau_charge.mines_placees
+    assert tableau_charge.nombre_cases_sans_mine_a_devoiler == tableau.nombre_cases_sans_mine_a_devoiler
+
+    # une partie pas encore commencée: les mines seront placées au premier clic
+    tableau_charge, _, _ = decoder_partie(encoder_partie(Tableau(4, 4, 3, graine=1)))
+    assert not tableau_charge.mines_placees
+    assert tableau_charge.devoiler_case(1, 1) == Tableau(4, 4, 3, graine=1).devoiler_case(1, 1)
+
+    # un fichier qui n'est pas une sauvegarde (ou qui est tronqué, ou dont l'en-tête est invalide) est refusé
+    sans_colonne = ENTETE.pack(SIGNATURE, VERSION_FORMAT, 0, 4, 0, 0, 1, 0, 0)
+    trop_de_mines = ENTETE.pack(SIGNATURE, VERSION_FORMAT, 0, 2, 2, 5, 1, 0, 0) + bytes(3)
+    mines_en_trop = ENTETE.pack(SIGNATURE, VERSION_FORMAT, OPTION_MINES_PLACEES, 2, 2, 1, 1, 0, 0) + b'\x03\x00\x00'
+    for donnees_invalides in (b'', b'bonjour', donnees[:-1], sans_colonne, trop_de_mines, mines_en_trop):
+        try:
+            decoder_partie(donnees_invalides)
+            assert False
+        except ValueError:
+            pass
+
+def test_importer_partie_texte():
+
+    tableau = Tableau(12, 9, 20, graine=3)
+    tableau.devoiler_case(6, 5)
+
+    # l'ancien format et le nouveau donnent le même tableau, et la partie rétablie peut être gagnée
+    tableau_importe, compteur, chrono = importer_partie_texte(exporter_partie_texte(tableau, 7, 99))
+    assert (compteur, chrono) == (7, 99)
+    assert tableau_importe.grille == tableau.grille
+    assert decoder_partie(encoder_partie(tableau_importe))[0].grille == tableau.grille
+    assert tableau_importe.nombre_cases_sans_mine_a_devoiler == tableau.nombre_cases_sans_mine_a_devoiler
+
+    for coordonnees, case in tableau.dictionnaire_cases.items():
+        if not case.est_minee:
+            tableau_importe.devoiler_case(*coordonnees)
+    assert not tableau_importe.contient_cases_a_devoiler()
+
+    # le texte n'est jamais exécuté, et une case invalide (hors du tableau, mal formée) est refusée
+    tableau_valide = Tableau(2, 2, 1, graine=1)
+    tableau_valide.devoiler_case(1, 1)
+    texte_valide = exporter_partie_texte(tableau_valide)
+    importer_partie_texte(texte_valide)
+    for texte in ("__import__('os').getcwd()", texte_valide.replace('(2, 2)', '(0, 2)'),
+                  texte_valide.replace('(2, 2)', '(3, 2)'), texte_valide.replace('(2, 2)', "'a'"),
+                  texte_valide.replace('(2, 2): [', '(2, 2): [[], '),
+                  texte_valide.replace("'nombre_mines': 1", "'nombre_mines': 5"),
+                  texte_valide.replace("'nombre_mines': 1", "'nombre_mines': 2"),
+                  texte_valide.replace('[True, False, 0]', '[False, False, 0]'),
+                  texte_valide.replace("'dimension_rangee': 2", "'dimension_rangee': 0")):
+        try:
+            importer_partie_texte(texte)
+            assert False, texte
+        except ValueError:
+            pass
+
+def test_partie_projetee():
+    import os
+    from tempfile import TemporaryDirectory
+
+    tableau = Tableau(40, 25, 100, graine=8)
+    tableau.devoiler_case(20, 12)
+
+    with TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'partie.dmn')
+        enregistrer_partie_projetable(chemin, tableau, compteur=1, chrono=5)
+        assert est_partie_projetable(chemin)
+        assert os.path.getsize(chemin) == ENTETE_GRILLE.size + len(tableau.grille)
+
+        # la grille du tableau est le fichier lui-même; les cases dévoilées y sont écrites sur place
+        partie = PartieProjetee(chemin)
+        assert partie.tableau.grille == tableau.grille and (partie.compteur, partie.chrono) == (1, 5)
+        for coordonnees, case in tableau.dictionnaire_cases.items():
+            if not case.est_minee:
+                partie.tableau.devoiler_case(*coordonnees)
+                tableau.devoiler_case(*coordonnees)
+        partie.enregistrer(2, 9)
+        partie.fermer()
+
+        # une partie interrompue (sans enregistrer l'en-tête) est rouverte avec le bon nombre de cases à dévoiler
+        chemin_interrompue = os.path.join(dossier, 'interrompue.dmn')
+        tableau_interrompu = Tableau(30, 30, 100, graine=3)
+        tableau_interrompu.devoiler_case(15, 15)
+        enregistrer_partie_projetable(chemin_interrompue, tableau_interrompu)
+        coordonnees = next(coordonnees for coordonnees, case in tableau_interrompu.dictionnaire_cases.items()
+                           if not case.est_minee and not case.est_devoilee)
+        tableau_interrompu.devoiler_case(*coordonnees)
+        interrompue = PartieProjetee(chemin_interrompue)
+        interrompue.tableau.devoiler_case(*coordonnees)
+        interrompue.fermer()
+        interrompue = PartieProjetee(chemin_interrompue)
+        assert interrompue.tableau.nombre_cases_sans_mine_a_devoiler == \
+            tableau_interrompu.nombre_cases_sans_mine_a_devoiler
+        interrompue.fermer()
+
+        # la partie rouverte (ici, copiée) est gagnée
+        tableau_charge, compteur, chrono = charger_partie(chemin)
+        assert tableau_charge.grille == tableau.grille and (compteur, chrono) == (2, 9)
+        assert not tableau_charge.contient_cases_a_devoiler()
+
+        # une sauvegarde compacte n'est pas projetable
+        enregistrer_partie(chemin, tableau)
+        assert not est_partie_projetable(chemin)
+        try:
+            PartieProjetee(chemin)
+            assert False
+        except ValueError:
+            pass
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_plans()
+    test_aller_retour()
+    test_importer_partie_texte()
+    test_partie_projetee()
+    print('Tests réussis!')
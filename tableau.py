@@ -5,16 +5,297 @@ Module contenant la description de la classe Tableau. Un tableau est utilisé po
 Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
 """
 
-from case import Case
-from random import randint
-from sys import setrecursionlimit
+from case import VueCase, MASQUE_VOISINES, BIT_MINE, BIT_DEVOILEE, BIT_DRAPEAU, BIT_BORDURE
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from random import getrandbits
+from sys import maxsize
+from generateur import GenerateurMines
+from evenements import BusEvenements, CasesDevoilees, DrapeauBascule, PartieGagnee, PartiePerdue, TableauReinitialise
+
+# Nombre d'octets de la grille traités à la fois lors du calcul des mines voisines
+TAILLE_BANDE = 1 << 22
+
+# Nombre de cases au-delà duquel on ne précalcule pas de table de voisins (elle coûte près de 150 octets par case)
+TAILLE_MAX_TABLE_VOISINS = 1 << 16
+
+# Nombre de tables de voisins (une par dimension de tableau) conservées en mémoire
+NOMBRE_MAX_TABLES_VOISINS = 8
+
+# Nombre de cases explorées par tranche d'un dévoilement en cascade progressif (voir devoiler_par_tranches)
+TAILLE_TRANCHE = 4096
+
+# Table de traduction qui ne garde que le bit du drapeau de chaque octet
+TABLE_DRAPEAUX = bytes(octet & BIT_DRAPEAU for octet in range(256))
+
+# Table de traduction qui donne 1 pour une case dévoilée sans mine (hors de la bordure), et 0 autrement
+TABLE_DEVOILEES_SANS_MINE = bytes(1 if octet & (BIT_DEVOILEE | BIT_MINE | BIT_BORDURE) == BIT_DEVOILEE else 0
+                                  for octet in range(256))
+
+# Table de traduction qui donne 1 pour une case cachée sans mine (hors de la bordure), et 0 autrement
+TABLE_CACHEES_SANS_MINE = bytes(1 if not octet & (BIT_DEVOILEE | BIT_MINE | BIT_BORDURE) else 0
+                                for octet in range(256))
+
+
+class TableVoisins:
+    """
+    Table d'adjacence précalculée des cases d'un tableau, au format CSR: les indices (dans la grille) des
+    voisins de la case d'indice i sont voisins[debuts[i]:debuts[i + 1]]. La table ne dépend que des dimensions
+    du tableau; elle est construite une seule fois et partagée par tous les tableaux de la même taille
+    (voir obtenir_table_voisins).
+
+    Attributes:
+        largeur (int): Nombre d'octets d'une rangée de la grille
+        debuts (array): Position, dans voisins, du premier voisin de chaque case de la grille
+        voisins (array): Indices des cases voisines, case par case, dans l'ordre de la grille
+        coordonnees_voisins (list): Pour chaque indice de la grille, le tuple des coordonnées (x, y) des cases
+                                    voisines, prêt à être retourné par obtenir_voisins
+    """
+
+    def __init__(self, dimension_rangee, dimension_colonne):
+        """
+        Construction de la table d'adjacence.
+
+        Args:
+            dimension_rangee (int): Nombre de rangées du tableau
+            dimension_colonne (int): Nombre de colonnes du tableau
+        """
+        largeur = dimension_colonne + 2
+        self.largeur = largeur
+        deplacements = (-largeur - 1, -largeur, -largeur + 1, -1, 1, largeur - 1, largeur, largeur + 1)
+
+        # numéros de colonne et de rangée valides (les cases de la bordure n'ont pas de voisins)
+        colonnes_valides = range(1, dimension_colonne + 1)
+        rangees_valides = range(1, dimension_rangee + 1)
+
+        self.debuts = array('I', [0])
+        self.voisins = array('I')
+        coordonnees = [divmod(indice, largeur) for indice in range((dimension_rangee + 2) * largeur)]
+
+        for indice, (rangee_x, colonne_y) in enumerate(coordonnees):
+
+            if rangee_x in rangees_valides and colonne_y in colonnes_valides:
+                for deplacement in deplacements:
+                    rangee_voisin, colonne_voisin = coordonnees[indice + deplacement]
+                    if rangee_voisin in rangees_valides and colonne_voisin in colonnes_valides:
+                        self.voisins.append(indice + deplacement)
+
+            self.debuts.append(len(self.voisins))
+
+        self.coordonnees_voisins = [tuple(coordonnees[indice_voisin]
+                                          for indice_voisin in self.obtenir_indices_voisins(indice))
+                                    for indice in range(len(coordonnees))]
+
+    def obtenir_indices_voisins(self, indice):
+        """
+        Retourne les indices des cases voisines d'une case.
+
+        Args:
+            indice (int): Position de la case dans la grille
+
+        Returns:
+            array: Les indices (dans la grille) des cases voisines
+        """
+        return self.voisins[self.debuts[indice]:self.debuts[indice + 1]]
+
+    def obtenir_voisins(self, indice):
+        """
+        Retourne les coordonnées des cases voisines d'une case.
+
+        Args:
+            indice (int): Position de la case dans la grille
+
+        Returns:
+            list: Les coordonnées (tuple x, y) des cases voisines
+        """
+        return list(self.coordonnees_voisins[indice])
+
+
+@lru_cache(maxsize=NOMBRE_MAX_TABLES_VOISINS)
+def obtenir_table_voisins(dimension_rangee, dimension_colonne):
+    """
+    Retourne la table d'adjacence partagée des tableaux d'une dimension donnée. La table est construite au premier
+    appel, puis conservée dans une cache bornée (les dimensions les moins récemment utilisées en sont retirées).
+
+    Args:
+        dimension_rangee (int): Nombre de rangées du tableau
+        dimension_colonne (int): Nombre de colonnes du tableau
+
+    Returns:
+        TableVoisins: La table d'adjacence, ou None si le tableau est trop grand pour qu'on la précalcule
+    """
+    if dimension_rangee * dimension_colonne > TAILLE_MAX_TABLE_VOISINS:
+        return None
+    return TableVoisins(dimension_rangee, dimension_colonne)
+
+
+def construire_grille(mines, largeur):
+    """
+    Construit la grille compacte d'un tableau à partir de la grille de ses mines. Le nombre de mines voisines
+    de toutes les cases est calculé en une seule passe, comme une convolution 3x3 sur la grille des mines:
+    chaque bande de rangées est lue comme un seul grand entier (un octet par case), et les décalages de cet
+    entier additionnent les huit voisins de toutes les cases à la fois. Comme une case a au plus huit mines
+    voisines, les sommes ne débordent jamais d'un octet à l'autre.
+
+    Args:
+        mines (bytearray): Grille (bordure incluse) qui vaut 1 pour chaque case minée et 0 ailleurs
+        largeur (int): Nombre d'octets d'une rangée de la grille
+
+    Returns:
+        bytearray: La grille compacte (nombre de mines voisines, BIT_MINE et BIT_BORDURE de chaque case)
+    """
+    grille = bytearray(len(mines))
+    hauteur = len(mines) // largeur
+    rangees_par_bande = max(1, TAILLE_BANDE // largeur)
+
+    for premiere_rangee in range(0, hauteur, rangees_par_bande):
+        derniere_rangee = min(hauteur, premiere_rangee + rangees_par_bande)
+
+        # on lit aussi la rangée qui précède et celle qui suit la bande, pour les voisins de ses extrémités
+        debut = max(0, premiere_rangee - 1) * largeur
+        fin = min(hauteur, derniere_rangee + 1) * largeur
+        taille = fin - debut
+
+        bande = int.from_bytes(mines[debut:fin], 'little')
+
+        # somme des trois cases de chaque rangée, puis des trois rangées, moins la case elle-même
+        horizontal = bande + (bande << 8) + (bande >> 8)
+        voisines = horizontal + (horizontal << 8 * largeur) + (horizontal >> 8 * largeur) - bande
+
+        # on ajoute le bit de mine (1 devient BIT_MINE) et on retire les octets décalés hors de la bande
+        resultat = (voisines + bande * BIT_MINE) & ((1 << 8 * taille) - 1)
+        resultat = resultat.to_bytes(taille, 'little')
+
+        grille[premiere_rangee * largeur:derniere_rangee * largeur] = \
+            resultat[premiere_rangee * largeur - debut:derniere_rangee * largeur - debut]
+
+    marquer_bordure(grille, largeur)
+
+    return grille
+
+
+def generer_region(dimension_rangee, dimension_colonne, nombre_mines, graine, numeros_proteges,
+                   premiere_rangee, derniere_rangee):
+    """
+    Génère une bande de rangées de la grille compacte d'un tableau (voir Tableau.grille), indépendamment du
+    reste du tableau. Le rang de chacune des cases de la bande (et des rangées qui l'entourent, pour le nombre
+    de mines voisines) est calculé directement, ce qui permet de répartir les bandes d'un très grand tableau
+    entre plusieurs processus: une fois recollées, elles donnent exactement la grille de Tableau.initialiser_tableau.
+
+    Args:
+        dimension_rangee (int): Nombre de rangées du tableau
+        dimension_colonne (int): Nombre de colonnes du tableau
+        nombre_mines (int): Nombre de mines du tableau
+        graine (int): La graine du tableau
+        numeros_proteges (list): Numéros des cases qui ne doivent pas être minées
+        premiere_rangee (int): Numéro de la première rangée de la bande (à partir de 1)
+        derniere_rangee (int): Numéro de la rangée qui suit la bande
+
+    Returns:
+        bytes: Les octets des rangées de la bande, bordure de gauche et de droite incluse
+    """
+    largeur = dimension_colonne + 2
+    generateur = GenerateurMines(graine, dimension_rangee * dimension_colonne)
+    seuil = generateur.calculer_seuil(nombre_mines, numeros_proteges)
+    numeros_proteges = set(numeros_proteges)
+    obtenir_rang = generateur.obtenir_rang
+
+    # grille des mines de la bande, avec une rangée de plus de chaque côté
+    mines = bytearray((derniere_rangee - premiere_rangee + 2) * largeur)
+    for rangee_x in range(max(1, premiere_rangee - 1), min(dimension_rangee, derniere_rangee) + 1):
+        debut_rangee = (rangee_x - premiere_rangee + 1) * largeur
+        premier_numero = (rangee_x - 1) * dimension_colonne
+
+        for colonne_y in range(1, dimension_colonne + 1):
+            numero_case = premier_numero + colonne_y - 1
+            if obtenir_rang(numero_case) < seuil and numero_case not in numeros_proteges:
+                mines[debut_rangee + colonne_y] = 1
+
+    # la première et la dernière rangée ne servent qu'au calcul des mines voisines
+    return bytes(construire_grille(mines, largeur)[largeur:-largeur])
+
+
+def encadrer(cases, dimension_rangee, dimension_colonne):
+    """
+    Ajoute une bordure nulle autour des cases d'un tableau, pour obtenir la disposition de Tableau.grille.
+
+    Args:
+        cases (bytes): Un octet par case, rangée par rangée
+        dimension_rangee (int): Nombre de rangées du tableau
+        dimension_colonne (int): Nombre de colonnes du tableau
+
+    Returns:
+        bytearray: La grille (bordure incluse), qui vaut 0 sur la bordure
+    """
+    largeur = dimension_colonne + 2
+    grille = bytearray(largeur * (dimension_rangee + 2))
+    for rangee_x in range(1, dimension_rangee + 1):
+        debut = rangee_x * largeur + 1
+        grille[debut:debut + dimension_colonne] = cases[(rangee_x - 1) * dimension_colonne:rangee_x * dimension_colonne]
+    return grille
+
+
+def marquer_bordure(grille, largeur):
+    """
+    Marque (BIT_BORDURE) les cases sentinelles qui entourent le tableau dans une grille.
+
+    Args:
+        grille (bytearray): La grille à modifier
+        largeur (int): Nombre d'octets d'une rangée de la grille
+    """
+    hauteur = len(grille) // largeur
+    grille[:largeur] = bytes([BIT_BORDURE]) * largeur
+    grille[-largeur:] = bytes([BIT_BORDURE]) * largeur
+    grille[::largeur] = bytes([BIT_BORDURE]) * hauteur
+    grille[largeur - 1::largeur] = bytes([BIT_BORDURE]) * hauteur
+
+
+class DictionnaireCases(Mapping):
+    """
+    Dictionnaire (en lecture seule) des cases d'un tableau, conservé pour compatibilité avec le code qui
+    accède aux cases par leurs coordonnées. Aucune case n'y est stockée: chaque accès retourne une VueCase
+    sur l'octet correspondant de la grille compacte du tableau.
+
+    Attributes:
+        tableau (Tableau): Le tableau dont on expose les cases
+    """
+
+    def __init__(self, tableau):
+        """
+        Initialisation du dictionnaire de cases.
+
+        Args:
+            tableau (Tableau): Le tableau dont on expose les cases
+        """
+        self.tableau = tableau
+
+    def __getitem__(self, coordonnees):
+        rangee_x, colonne_y = coordonnees
+        if not self.tableau.valider_coordonnees(rangee_x, colonne_y):
+            raise KeyError(coordonnees)
+        return VueCase(self.tableau.grille, self.tableau.obtenir_indice(rangee_x, colonne_y))
+
+    def __iter__(self):
+        for rangee_x in range(1, self.tableau.dimension_rangee + 1):
+            for colonne_y in range(1, self.tableau.dimension_colonne + 1):
+                yield rangee_x, colonne_y
+
+    def __len__(self):
+        return self.tableau.dimension_rangee * self.tableau.dimension_colonne
+
+    def __contains__(self, coordonnees):
+        try:
+            rangee_x, colonne_y = coordonnees
+        except (TypeError, ValueError):
+            return False
+        return self.tableau.valider_coordonnees(rangee_x, colonne_y)
 
-# on change la limite de récursion pour pouvoir afficher un tableau de 39x39, par exemple
-setrecursionlimit(10**6)
 
 class Tableau():
     """
-    Tableau du jeu de démineur, implémenté avec un dictionnaire de cases.
+    Tableau du jeu de démineur, implémenté avec une grille compacte d'un octet par case.
     
     Warning:
         Si vous ajoutez des attributs à la classe Tableau, n'oubliez pas de les documenter ici.
@@ -23,20 +304,40 @@ class Tableau():
         dimension_rangee (int): Nombre de rangées du tableau complet
         dimension_colonne (int): Nombre de colonnes du tableau complet
         nombre_mines (int): Nombre de mines cachées dans le tableau complet
+        graine (int): La graine à partir de laquelle les mines sont placées (voir GenerateurMines)
 
         nombre_cases_sans_mine_a_devoiler (int) : Nombre de cases sans mine qui n'ont pas encore été dévoilées
             Initialement, ce nombre est égal à dimension_rangee * dimension_colonne - nombre_mines
 
-        dictionnaire_cases (dict): Un dictionnaire de case en suivant le format suivant:
+        mines_placees (bool): True si les mines ont été placées. Elles ne le sont qu'au premier dévoilement,
+            de façon à ce que la première case dévoilée et ses voisines ne soient pas minées.
+        premier_clic_en_attente (bool): True si les mines ont été placées d'avance (voir pregenerer) et que la
+            zone du premier clic n'a pas encore été protégée.
+
+        largeur (int): Nombre d'octets d'une rangée de la grille (dimension_colonne + 2, bordure incluse)
+        deplacements_voisins (tuple): Les huit déplacements (en indices de la grille) vers les cases voisines
+
+        grille (bytearray): Les cases du tableau, rangée par rangée, entourées d'une bordure de cases
+            sentinelles (BIT_BORDURE). La case (x, y) se trouve à l'indice x * largeur + y, ce qui permet
+            de garder la numérotation à partir de 1. Chaque octet contient le nombre de mines voisines
+            (MASQUE_VOISINES) et les bits BIT_MINE, BIT_DEVOILEE et BIT_DRAPEAU (voir le module case).
+            La grille n'est allouée qu'au premier accès, et elle ne contient aucune mine tant que les mines
+            n'ont pas été placées. Ce peut aussi être une vue (memoryview) sur un fichier de sauvegarde projeté
+            en mémoire (voir remplacer_grille).
+
+        dictionnaire_cases (DictionnaireCases): Un dictionnaire de case en suivant le format suivant:
             Les clés sont les positions du tableau sous la forme d'un tuple (x, y), 
                 x étant le numéro de la rangée, y étant le numéro de la colonne.
-            Les valeurs sont des objets de la classe Case.
+            Les valeurs sont des vues (VueCase) sur la grille, créées au moment de l'accès.
 
              { (1,1) : case1 ,
               (1,2) : case2 ,
               ... }
+
+        evenements (BusEvenements): Le bus sur lequel le tableau publie ses évènements (cases dévoilées,
+            drapeaux, fin de la partie), une liste par action (voir le module evenements)
     """
-    def __init__(self, dimension_rangee=5, dimension_colonne=5, nombre_mines=3):
+    def __init__(self, dimension_rangee=5, dimension_colonne=5, nombre_mines=3, graine=None):
         """ Initialisation d'un objet tableau.
         
         Attributes:
@@ -44,8 +345,13 @@ class Tableau():
             dimension_colonne (int): Nombre de colonnes du tableau (valeur par défaut: 5)
             nombre_cases (int): Nombre de cases total du tableau (valeur par défaut: 25)
             nombre_mines (int): Nombre de mines cachées dans le tableau (valeur par défaut: 5)
-            dictionnaire_cases (dict): Dictionnaire contenant comme clés des coordonnées (x,y)
-                                        associée à un object Case comme élément. (Vide par défaut)
+            graine (int): La graine qui détermine la position des mines (par défaut, choisie au hasard)
+            grille (bytearray): Grille compacte qui contient l'état de toutes les cases (allouée au premier accès)
+            mines_placees (bool): False, car les mines ne sont placées qu'au premier dévoilement
+            premier_clic_en_attente (bool): False (voir pregenerer)
+            dictionnaire_cases (DictionnaireCases): Dictionnaire contenant comme clés des coordonnées (x,y)
+                                        associée à une vue sur la case comme élément.
+            evenements (BusEvenements): Un bus sans abonné (voir associer_evenements)
 
         """ 
 
@@ -53,10 +359,19 @@ class Tableau():
         self.dimension_colonne = dimension_colonne
         self.nombre_mines = nombre_mines
 
-        # Le dictionnaire de case, vide au départ, qui est rempli par la fonction initialiser_tableau().
-        self.dictionnaire_cases = {}
+        # Deux tableaux de même dimension et de même graine ont les mêmes mines (pour le même premier clic)
+        self.graine = getrandbits(64) if graine is None else graine
 
-        self.initialiser_tableau()
+        # La grille de cases, entourée de sa bordure, qui est remplie par la fonction initialiser_tableau()
+        # lors du premier dévoilement. Rien n'est alloué avant le premier accès à la grille.
+        self.largeur = self.dimension_colonne + 2
+        self.deplacements_voisins = (-self.largeur - 1, -self.largeur, -self.largeur + 1, -1,
+                                     1, self.largeur - 1, self.largeur, self.largeur + 1)
+        self._grille = None
+        self.mines_placees = False
+        self.premier_clic_en_attente = False
+        self.dictionnaire_cases = DictionnaireCases(self)
+        self.evenements = BusEvenements()
 
         # nombre de cases total du tableau (incluant les mines)
         self.nombre_cases = self.dimension_rangee * self.dimension_colonne
@@ -64,6 +379,118 @@ class Tableau():
         # nombre de cases à dévoiler (en excluant les mines)
         self.nombre_cases_sans_mine_a_devoiler = self.nombre_cases - self.nombre_mines
 
+    @classmethod
+    def depuis_etat(cls, dimension_rangee, dimension_colonne, nombre_mines, graine=None, grille=None, mines=None,
+                    devoilees=None, drapeaux=None, mines_placees=True, premier_clic_en_attente=False,
+                    cases_a_devoiler=None):
+        """
+        Construit un tableau d'un seul coup à partir de l'état de ses cases (par exemple, celui d'une partie
+        sauvegardée), sans placer de mines au hasard et sans toucher aux cases une à une (l'équivalent de
+        from_state). L'état est soit la grille compacte, déjà construite, soit les plans des cases: le nombre
+        de mines voisines est alors recalculé à partir des mines (voir construire_grille), puis les bits des
+        cases dévoilées et des drapeaux sont ajoutés à la grille.
+
+        Le nombre de cases sans mine à dévoiler est recalculé à partir de la grille, sauf si on le reçoit: une
+        partie rétablie peut être gagnée. Si les mines sont placées, ce sont les cases cachées sans mine de la
+        grille qui sont comptées, plutôt que de se fier à nombre_mines.
+
+        Args:
+            dimension_rangee (int): Nombre de rangées du tableau
+            dimension_colonne (int): Nombre de colonnes du tableau
+            nombre_mines (int): Nombre de mines du tableau
+            graine (int): La graine du tableau (par défaut, choisie au hasard)
+            grille (bytearray ou memoryview): La grille compacte, bordure incluse (voir remplacer_grille)
+            mines (bytes): Sinon, le plan des mines (un octet de valeur 0 ou 1 par case, rangée par rangée)
+            devoilees (bytes): Le plan des cases dévoilées (par défaut, aucune)
+            drapeaux (bytes): Le plan des drapeaux (par défaut, aucun)
+            mines_placees (bool): True si les mines sont placées (par défaut)
+            premier_clic_en_attente (bool): True si la zone du premier clic reste à protéger (voir pregenerer)
+            cases_a_devoiler (int): Le nombre de cases sans mine à dévoiler, s'il est connu
+
+        Returns:
+            Tableau: Le tableau, qui utilise directement la grille reçue (s'il y a lieu)
+        """
+        tableau = cls(dimension_rangee, dimension_colonne, nombre_mines, graine)
+
+        if grille is None:
+            taille = tableau.largeur * (dimension_rangee + 2)
+            bits = int.from_bytes(construire_grille(encadrer(mines, dimension_rangee, dimension_colonne),
+                                                    tableau.largeur), 'little')
+            for plan, bit in ((devoilees, BIT_DEVOILEE), (drapeaux, BIT_DRAPEAU)):
+                if plan is not None:
+                    bits |= int.from_bytes(encadrer(plan, dimension_rangee, dimension_colonne), 'little') * bit
+            grille = bytearray(bits.to_bytes(taille, 'little'))
+
+        tableau.remplacer_grille(grille)
+        tableau.mines_placees = mines_placees
+        tableau.premier_clic_en_attente = premier_clic_en_attente
+
+        if cases_a_devoiler is None:
+            octets = grille if isinstance(grille, bytearray) else bytes(grille)
+            if mines_placees:
+                cases_a_devoiler = octets.translate(TABLE_CACHEES_SANS_MINE).count(1)
+            else:
+                cases_a_devoiler = tableau.nombre_cases - nombre_mines - octets.translate(
+                    TABLE_DEVOILEES_SANS_MINE).count(1)
+        tableau.nombre_cases_sans_mine_a_devoiler = cases_a_devoiler
+        return tableau
+
+    @property
+    def grille(self):
+        """bytearray: La grille compacte des cases, allouée (vide, avec sa bordure) au premier accès"""
+        if self._grille is None:
+            self._grille = bytearray(self.largeur * (self.dimension_rangee + 2))
+            marquer_bordure(self._grille, self.largeur)
+        return self._grille
+
+    def remplacer_grille(self, grille):
+        """
+        Remplace la grille du tableau par une grille déjà construite, sans la copier: par exemple, une vue
+        (memoryview) sur un fichier de sauvegarde projeté en mémoire (voir PartieProjetee), dont les pages ne
+        sont lues qu'au besoin et dans laquelle chaque modification du tableau est écrite sur place.
+
+        Args:
+            grille (bytearray ou memoryview): La grille compacte, bordure incluse (voir Tableau.grille)
+        """
+        assert len(grille) == self.largeur * (self.dimension_rangee + 2)
+        self._grille = grille
+
+    def associer_evenements(self, evenements):
+        """
+        Publie désormais les évènements du tableau sur un autre bus (par exemple, celui de l'interface, qui
+        survit aux parties), en y annonçant d'abord que ce tableau remplace le précédent.
+
+        Args:
+            evenements (BusEvenements): Le bus des évènements
+        """
+        self.evenements = evenements
+        evenements.publier([TableauReinitialise(self)])
+
+    def obtenir_indice(self, rangee_x, colonne_y):
+        """
+        Calcule la position dans la grille de la case dont les coordonnées sont reçues en argument.
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case (entre 0 et dimension_rangee + 1)
+            colonne_y (int): Numéro de la colonne de la case (entre 0 et dimension_colonne + 1)
+
+        Returns:
+            int: L'indice de la case dans la grille
+        """
+        return rangee_x * self.largeur + colonne_y
+
+    def obtenir_coordonnees(self, indice):
+        """
+        Calcule les coordonnées de la case qui se trouve à un indice donné de la grille.
+
+        Args:
+            indice (int): Position de la case dans la grille
+
+        Returns:
+            tuple: Les coordonnées (x, y) de la case
+        """
+        return divmod(indice, self.largeur)
+
     def valider_coordonnees(self, rangee_x, colonne_y):
         """
         Valide les coordonnées reçues en argument. Les coordonnées sont considérées valides si elles se trouvent bien
@@ -119,6 +546,11 @@ class Tableau():
             sont reçues en argument
         """
 
+        # pour une case du tableau, on lit directement ses voisins dans la table partagée, s'il y en a une
+        table_voisins = obtenir_table_voisins(self.dimension_rangee, self.dimension_colonne)
+        if table_voisins is not None and self.valider_coordonnees(rangee_x, colonne_y):
+            return table_voisins.obtenir_voisins(self.obtenir_indice(rangee_x, colonne_y))
+
         # coordonnées des cases voisines relatives aux coordonnées données en argument
         voisinage = ((-1, -1), (-1, 0), (-1, 1),
                       (0, -1),          (0, 1),
@@ -140,44 +572,214 @@ class Tableau():
 
         return liste_coordonnees_cases_voisines
 
-    def initialiser_tableau(self):
+    def obtenir_indices_voisins(self, indice):
+        """
+        Retourne les indices (dans la grille) des cases voisines d'une case du tableau. Les indices sont lus
+        dans la table d'adjacence partagée par les tableaux de même dimension; pour un tableau trop grand pour
+        avoir une table, on les calcule à partir des déplacements vers les cases voisines.
+
+        Args:
+            indice (int): Position dans la grille d'une case du tableau (hors de la bordure)
+
+        Returns:
+            array ou list: Les indices des cases voisines, dans le même ordre que obtenir_voisins
+        """
+        table_voisins = obtenir_table_voisins(self.dimension_rangee, self.dimension_colonne)
+
+        if table_voisins is not None:
+            return table_voisins.obtenir_indices_voisins(indice)
+
+        grille = self.grille
+        return [indice + deplacement for deplacement in self.deplacements_voisins
+                if not grille[indice + deplacement] & BIT_BORDURE]
+
+    def initialiser_tableau(self, rangee_x=None, colonne_y=None, nombre_processus=1):
         """
         Initialise le tableau à son contenu initial en suivant les étapes suivantes:
-            1) On crée chacune des cases du tableau (cette étape est programmée pour vous).
-            2) On y ajoute ensuite les mines dans certaines cases qui sont choisies au hasard
-                (attention de ne pas choisir deux fois la même case!).
-                - À chaque fois qu'on ajoute une mine dans une case, on obtient la liste de 
-                  ses voisins (pour se faire, utilisez la méthode obtenir_voisins)
-                - Pour chaque voisin, on appelle la méthode ajouter_une_mine_voisine de la case correspondante.
+            1) On choisit les cases qui contiennent une mine à partir de la graine du tableau: le générateur
+                (voir GenerateurMines) donne un rang à chaque case, et les mines sont les cases de plus petit
+                rang. On parcourt seulement les rangs des cases minées, ou ceux des cases sans mine lorsque les
+                mines occupent plus de la moitié du tableau, ce qui se fait en O(M).
+                - Si on reçoit les coordonnées de la première case dévoilée, cette case et ses voisines ne
+                  reçoivent pas de mine (ou seulement cette case, si le tableau est trop dense).
+            2) On construit la grille compacte du tableau: le nombre de mines voisines de toutes les cases
+                est calculé d'un seul coup par la fonction construire_grille. Les drapeaux déjà posés sont
+                conservés, et la grille est remplacée sur place pour que les vues sur les cases restent valides.
+
+        Avec plusieurs processus, la grille est plutôt générée par bandes de rangées réparties entre les
+        processus (voir generer_region), puis recollée. Le résultat est identique, octet par octet.
+
+        Cette méthode est appelée par devoiler_case lors du premier dévoilement.
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la première case dévoilée (None si aucune)
+            colonne_y (int): Numéro de la colonne de la première case dévoilée (None si aucune)
+            nombre_processus (int): Nombre de processus qui génèrent la grille (par défaut, 1)
+        """
+
+        largeur = self.largeur
+        hauteur = self.dimension_rangee + 2
+        nombre_colonnes = self.dimension_colonne
+        nombre_cases = self.dimension_rangee * nombre_colonnes
+
+        # Cases protégées: la première case dévoilée et ses voisines
+        zone_protegee = [] if rangee_x is None else self.obtenir_zone_protegee(rangee_x, colonne_y)
+        numeros_proteges = [self.obtenir_numero_case(indice) for indice in zone_protegee]
+
+        if nombre_processus > 1:
+            nouvelle_grille = self.generer_grille_parallele(numeros_proteges, nombre_processus)
+
+        else:
+            generateur = GenerateurMines(self.graine, nombre_cases)
+            seuil = generateur.calculer_seuil(self.nombre_mines, numeros_proteges)
+
+            # Si le tableau est dense, on place des mines partout et on enlève celles des cases de rang élevé
+            if 2 * self.nombre_mines > nombre_cases:
+                rangee_minee = b'\x00' + b'\x01' * nombre_colonnes + b'\x00'
+                mines = bytearray(largeur) + bytearray(rangee_minee * self.dimension_rangee) + bytearray(largeur)
+                rangs, valeur = range(seuil, nombre_cases), 0
+            else:
+                mines = bytearray(largeur * hauteur)
+                rangs, valeur = range(seuil), 1
+
+            obtenir_numero_case = generateur.obtenir_numero_case
+            for rang in rangs:
+                rangee, colonne = divmod(obtenir_numero_case(rang), nombre_colonnes)
+                mines[(rangee + 1) * largeur + colonne + 1] = valeur
+
+            # les cases protégées n'ont jamais de mine
+            for indice in zone_protegee:
+                mines[indice] = 0
+
+            nouvelle_grille = construire_grille(mines, largeur)
+            del mines
+
+        # On conserve les drapeaux qui ont été posés avant le placement des mines (une grille projetée en
+        # mémoire n'a pas de méthode translate: on la copie d'abord)
+        grille = self.grille
+        drapeaux = (grille if isinstance(grille, bytearray) else bytes(grille)).translate(TABLE_DRAPEAUX)
+        if drapeaux.strip(b'\x00'):
+            taille = len(nouvelle_grille)
+            nouvelle_grille = (int.from_bytes(nouvelle_grille, 'little') |
+                               int.from_bytes(drapeaux, 'little')).to_bytes(taille, 'little')
+
+        self.grille[:] = nouvelle_grille
+        self.mines_placees = True
+        self.premier_clic_en_attente = False
+
+    def obtenir_numero_case(self, indice):
+        """
+        Calcule le numéro (pour le générateur de mines) de la case qui se trouve à un indice de la grille.
+        Les cases sont numérotées de 0 à nombre_cases - 1, rangée par rangée.
+
+        Args:
+            indice (int): Position de la case dans la grille
+
+        Returns:
+            int: Le numéro de la case
+        """
+        rangee_x, colonne_y = divmod(indice, self.largeur)
+        return (rangee_x - 1) * self.dimension_colonne + colonne_y - 1
+
+    def obtenir_zone_protegee(self, rangee_x, colonne_y):
+        """
+        Retourne les cases qui ne doivent pas être minées lorsque la première case dévoilée est (x, y): cette
+        case et ses voisines, ou seulement cette case s'il n'y a pas assez de cases sans mine dans le tableau
+        (aucune s'il n'y en a pas du tout).
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la première case dévoilée
+            colonne_y (int): Numéro de la colonne de la première case dévoilée
+
+        Returns:
+            list: Les indices (dans la grille) des cases protégées
         """
+        nombre_cases_sans_mine = self.dimension_rangee * self.dimension_colonne - self.nombre_mines
+        indice_premiere_case = self.obtenir_indice(rangee_x, colonne_y)
+        zone_protegee = [indice_premiere_case] + [indice_premiere_case + deplacement
+                                                  for deplacement in self.deplacements_voisins
+                                                  if not self.grille[indice_premiere_case + deplacement] & BIT_BORDURE]
 
-        # On remplit les cases du tableau
-        for rangee_x in range(1, self.dimension_rangee+1):
-            for colonne_y in range(1, self.dimension_colonne+1):
-                coordonnees = (rangee_x, colonne_y)
-                self.dictionnaire_cases[coordonnees] = Case()
+        if nombre_cases_sans_mine < len(zone_protegee):
+            zone_protegee = [indice_premiere_case] if nombre_cases_sans_mine > 0 else []
 
-        compteur_mines = 0
+        return zone_protegee
 
-        liste_coordonnes_mines = []
+    def pregenerer(self):
+        """
+        Place les mines d'avance, avant de connaître la première case dévoilée (par exemple, dans un processus
+        léger en arrière-plan). Au premier dévoilement, proteger_premier_clic n'a alors qu'à déplacer les
+        quelques mines de la zone protégée.
+        """
+        self.initialiser_tableau()
+        self.premier_clic_en_attente = True
 
-        while compteur_mines < self.nombre_mines:
+    def proteger_premier_clic(self, rangee_x, colonne_y):
+        """
+        Modifie un tableau prégénéré pour que la première case dévoilée et ses voisines ne soient pas minées.
+        Les mines d'un tableau prégénéré sont les cases de rang plus petit que nombre_mines; avec la zone
+        protégée, ce sont les cases non protégées de rang plus petit que le seuil (voir calculer_seuil). On
+        enlève donc les mines de la zone protégée et on ajoute celles des cases de rang entre nombre_mines et
+        le seuil, en mettant à jour le nombre de mines voisines autour de chacune. Le résultat est identique à
+        celui de initialiser_tableau(rangee_x, colonne_y), en ne touchant qu'une vingtaine de cases.
 
-                coordonnees_mine = (randint(1, self.dimension_rangee), randint(1, self.dimension_colonne))
+        Args:
+            rangee_x (int) : Numéro de la rangée de la première case dévoilée
+            colonne_y (int): Numéro de la colonne de la première case dévoilée
+        """
+        grille = self.grille
+        zone_protegee = self.obtenir_zone_protegee(rangee_x, colonne_y)
+        generateur = GenerateurMines(self.graine, self.dimension_rangee * self.dimension_colonne)
+        seuil = generateur.calculer_seuil(self.nombre_mines, [self.obtenir_numero_case(indice)
+                                                              for indice in zone_protegee])
+
+        mines_enlevees = [indice for indice in zone_protegee if grille[indice] & BIT_MINE]
+        mines_ajoutees = []
+        for rang in range(self.nombre_mines, seuil):
+            rangee, colonne = divmod(generateur.obtenir_numero_case(rang), self.dimension_colonne)
+            indice = (rangee + 1) * self.largeur + colonne + 1
+            if indice not in zone_protegee:
+                mines_ajoutees.append(indice)
+
+        for indices, variation in ((mines_enlevees, -1), (mines_ajoutees, 1)):
+            for indice in indices:
+                grille[indice] ^= BIT_MINE
+                for deplacement in self.deplacements_voisins:
+                    if not grille[indice + deplacement] & BIT_BORDURE:
+                        grille[indice + deplacement] += variation
+
+        self.premier_clic_en_attente = False
+
+    def generer_grille_parallele(self, numeros_proteges, nombre_processus):
+        """
+        Génère la grille du tableau par bandes de rangées, réparties entre plusieurs processus.
+
+        Args:
+            numeros_proteges (list): Numéros des cases qui ne doivent pas être minées
+            nombre_processus (int): Nombre de processus qui génèrent la grille
+
+        Returns:
+            bytearray: La grille compacte du tableau
+        """
+        largeur = self.largeur
+        nouvelle_grille = bytearray(largeur * (self.dimension_rangee + 2))
 
-                if coordonnees_mine not in liste_coordonnes_mines:
+        # quelques bandes par processus, pour mieux répartir le travail
+        nombre_bandes = min(self.dimension_rangee, 4 * nombre_processus)
+        limites = [1 + self.dimension_rangee * i // nombre_bandes for i in range(nombre_bandes + 1)]
+        bandes = list(zip(limites[:-1], limites[1:]))
 
-                    liste_coordonnes_mines.append(coordonnees_mine)
-                    self.dictionnaire_cases[coordonnees_mine].ajouter_mine()
-                    compteur_mines += 1
+        with ProcessPoolExecutor(nombre_processus) as executeur:
+            regions = executeur.map(generer_region,
+                                    *zip(*[(self.dimension_rangee, self.dimension_colonne, self.nombre_mines,
+                                            self.graine, numeros_proteges, premiere_rangee, derniere_rangee)
+                                           for premiere_rangee, derniere_rangee in bandes]))
 
-                    # on trouve toutes les cases voisines de la mine
-                    liste_voisins = self.obtenir_voisins(coordonnees_mine[0], coordonnees_mine[1])
+            for (premiere_rangee, derniere_rangee), region in zip(bandes, regions):
+                nouvelle_grille[premiere_rangee * largeur:derniere_rangee * largeur] = region
 
-                    # On itère sur chaque case voisine
-                    for voisin in liste_voisins:
-                        # Pour chaque case près d'une mine ,on incrémente son nombre de 1
-                        self.dictionnaire_cases[voisin].ajouter_une_mine_voisine()
+        marquer_bordure(nouvelle_grille, largeur)
+        return nouvelle_grille
 
     def valider_coordonnees_a_devoiler(self, rangee_x, colonne_y):
         """
@@ -314,38 +916,128 @@ class Tableau():
         """
         Méthode qui dévoile le contenu de la case dont les coordonnées sont reçues en argument. Si la case ne
         contient pas de mine, on décrémente l'attribut qui représente le nombre de cases sans mine à dévoiler. 
-        Aussi, si cette case n'est voisine d'aucune mine, on dévoile ses voisins. 
+        Aussi, si cette case n'est voisine d'aucune mine, on dévoile ses voisins.
+
+        Lors du premier dévoilement, on place d'abord les mines (voir initialiser_tableau) de façon à ce que
+        la case dévoilée et ses voisines n'en contiennent pas.
+
+        Le dévoilement en cascade se fait avec une pile de cases à explorer plutôt que par récursion, ce qui
+        permet d'ouvrir une région vide de n'importe quelle taille (voir devoiler_par_tranches).
        
         Args:
             rangee_x (int) : Numéro de la rangée de la case à dévoiler
             colonne_y (int): Numéro de la colonne de la case à dévoiler
+
+        Returns:
+            list: Les indices (dans la grille) des cases nouvellement dévoilées, sans doublon. La liste est vide
+                  si la case contient une mine ou si elle était déjà dévoilée.
         """
+        cases_devoilees = []
+        for tranche in self.devoiler_par_tranches(rangee_x, colonne_y, None):
+            cases_devoilees += tranche
+        return cases_devoilees
+
+    def devoiler_par_tranches(self, rangee_x, colonne_y, taille_tranche=TAILLE_TRANCHE):
+        """
+        Dévoile une case comme devoiler_case, mais par tranches (générateur): le dévoilement en cascade s'arrête
+        après avoir exploré taille_tranche cases et reprend au prochain appel de next(). Entre deux tranches, le
+        tableau est dans un état cohérent (les cases retournées sont dévoilées et comptées): on peut donc
+        dessiner une très grande cascade progressivement, et même dévoiler d'autres cases entre deux tranches.
+
+        Chaque tranche est publiée sur self.evenements (CasesDevoilees, suivi de PartieGagnee s'il ne reste plus
+        de case sans mine à dévoiler); une case minée publie plutôt PartiePerdue.
 
-        # on vérifie d'abord si la case n'est pas minée
-        if not self.contient_mine(rangee_x, colonne_y):
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case à dévoiler
+            colonne_y (int): Numéro de la colonne de la case à dévoiler
+            taille_tranche (int): Nombre de cases explorées par tranche (None pour tout dévoiler d'un coup)
+
+        Returns:
+            generator: Les listes des indices des cases dévoilées par chacune des tranches (aucune liste si la
+                       case contient une mine ou si elle était déjà dévoilée)
+        """
 
-            # on trouve ensuite les coordonnées de la case grâce aux arguments donnés
-            coordonnees_case = (rangee_x, colonne_y)
+        if not self.mines_placees and self.valider_coordonnees(rangee_x, colonne_y):
+            self.initialiser_tableau(rangee_x, colonne_y)
 
-            # on trouve l'objet Case associé aux coordonnées données
-            case = self.dictionnaire_cases[coordonnees_case]
+        elif self.premier_clic_en_attente and self.valider_coordonnees(rangee_x, colonne_y):
+            self.proteger_premier_clic(rangee_x, colonne_y)
 
-            # on dévoile la case et on décrémente l'attribut du nombre de cases sans mines à dévoiler
-            case.est_devoilee = True
-            self.nombre_cases_sans_mine_a_devoiler -= 1
+        grille = self.grille
+        voisinage = self.deplacements_voisins
+        indice = self.obtenir_indice(rangee_x, colonne_y)
+        etat = grille[indice]
 
-            # si la case n'est voisine d'aucune mine (valeur de 0) on dévoile ses voisins
-            if case.nombre_mines_voisines == 0:
-                liste_voisins = self.obtenir_voisins(rangee_x, colonne_y)
+        # on ne dévoile pas une mine, ni une case déjà dévoilée
+        if etat & (BIT_MINE | BIT_DEVOILEE | BIT_BORDURE):
+            if etat & BIT_MINE and not etat & BIT_DEVOILEE:
+                self.evenements.publier([PartiePerdue(indice)])
+            return
 
-                for voisin in liste_voisins:
-                    case_voisine = self.dictionnaire_cases[voisin]
+        grille[indice] = etat | BIT_DEVOILEE
+        cases_devoilees = [indice]
 
-                # pour chaque case voisine qui n'a pas encore été dévoilée, on la dévoile
-                    if not case_voisine.est_devoilee:
+        # si la case n'est voisine d'aucune mine (valeur de 0) on devra dévoiler ses voisins
+        cases_a_explorer = [] if etat & MASQUE_VOISINES else [indice]
 
-                        # effet cascade via la récursion
-                        self.devoiler_case(voisin[0], voisin[1])
+        # effet cascade: les voisins d'une case à 0 ne peuvent pas être minés, on les dévoile tous
+        while True:
+            for _ in range(maxsize if taille_tranche is None else taille_tranche):
+                if not cases_a_explorer:
+                    break
+                indice = cases_a_explorer.pop()
+
+                for deplacement in voisinage:
+                    indice_voisin = indice + deplacement
+                    etat = grille[indice_voisin]
+
+                    # pour chaque case voisine qui n'a pas encore été dévoilée (en ignorant la bordure), on la dévoile
+                    if not etat & (BIT_DEVOILEE | BIT_BORDURE):
+                        grille[indice_voisin] = etat | BIT_DEVOILEE
+                        cases_devoilees.append(indice_voisin)
+
+                        if not etat & MASQUE_VOISINES:
+                            cases_a_explorer.append(indice_voisin)
+
+            # on décrémente l'attribut du nombre de cases sans mines à dévoiler
+            self.nombre_cases_sans_mine_a_devoiler -= len(cases_devoilees)
+
+            # les évènements de la tranche sont publiés ensemble
+            if self.evenements.abonnes:
+                evenements = [CasesDevoilees(cases_devoilees)]
+                if self.nombre_cases_sans_mine_a_devoiler == 0:
+                    evenements.append(PartieGagnee())
+                self.evenements.publier(evenements)
+
+            yield cases_devoilees
+
+            if not cases_a_explorer:
+                return
+            cases_devoilees = []
+
+    def basculer_drapeau(self, rangee_x, colonne_y):
+        """
+        Méthode qui pose un drapeau sur la case dont les coordonnées sont reçues en argument, ou qui l'enlève
+        s'il y en avait déjà un. On ne peut pas mettre de drapeau sur une case déjà dévoilée. Le changement est
+        publié sur self.evenements (DrapeauBascule).
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+
+        Returns:
+            bool: True si la case a maintenant un drapeau, False autrement.
+        """
+        indice = self.obtenir_indice(rangee_x, colonne_y)
+
+        if self.grille[indice] & (BIT_DEVOILEE | BIT_BORDURE):
+            return False
+
+        self.grille[indice] ^= BIT_DRAPEAU
+        drapeau = bool(self.grille[indice] & BIT_DRAPEAU)
+        if self.evenements.abonnes:
+            self.evenements.publier([DrapeauBascule(indice, drapeau)])
+        return drapeau
 
     def contient_mine(self, rangee_x, colonne_y):
         """
@@ -377,6 +1069,67 @@ class Tableau():
 
 #### Tests unitaires (à compléter) ###
 
+def test_construire_grille():
+
+    # une mine au centre d'un tableau 3x3 (largeur 5 avec la bordure)
+    mines = bytearray(25)
+    mines[12] = 1
+    grille = construire_grille(mines, 5)
+    for rangee_x in range(1, 4):
+        for colonne_y in range(1, 4):
+            indice = rangee_x * 5 + colonne_y
+            if indice == 12:
+                assert grille[indice] == BIT_MINE
+            else:
+                assert grille[indice] == 1
+    assert all(grille[indice] & BIT_BORDURE for indice in (0, 4, 5, 9, 20, 24))
+
+def test_initialisation_dense():
+
+    for nombre_mines in (0, 1, 12, 13, 24, 25):
+        tableau_test = Tableau(5, 5, nombre_mines)
+        tableau_test.initialiser_tableau()
+        cases_minees = [coordonnees for coordonnees in tableau_test.dictionnaire_cases
+                        if tableau_test.contient_mine(*coordonnees)]
+        assert len(cases_minees) == nombre_mines
+
+        # chaque nombre de mines voisines correspond bien aux mines placées
+        for coordonnees, case in tableau_test.dictionnaire_cases.items():
+            voisines_minees = [voisin for voisin in tableau_test.obtenir_voisins(*coordonnees)
+                               if voisin in cases_minees]
+            assert case.nombre_mines_voisines == len(voisines_minees)
+
+def test_generer_region():
+
+    # un tableau 3x3 rempli de mines
+    grille = generer_region(3, 3, 9, 5, [], 1, 4)
+    assert len(grille) == 3 * 5
+    assert grille[1:4] == bytes([0x10 | 3, 0x10 | 5, 0x10 | 3])
+    assert grille[0] & BIT_BORDURE and grille[4] & BIT_BORDURE
+
+
+def test_graine():
+
+    # même graine et même premier clic: même tableau; le premier clic et ses voisines restent sans mine
+    tableau_a = Tableau(30, 20, 150, graine=12)
+    tableau_b = Tableau(30, 20, 150, graine=12)
+    tableau_a.devoiler_case(10, 10)
+    tableau_b.devoiler_case(10, 10)
+    assert tableau_a.grille == tableau_b.grille
+
+    tableau_c = Tableau(30, 20, 150, graine=13)
+    tableau_c.devoiler_case(10, 10)
+    assert tableau_a.grille != tableau_c.grille
+
+    # la génération par régions donne exactement la même grille, pour un tableau clairsemé ou dense
+    for nombre_mines in (150, 550):
+        tableau_a = Tableau(30, 20, nombre_mines, graine=12)
+        tableau_a.initialiser_tableau(4, 4)
+        tableau_b = Tableau(30, 20, nombre_mines, graine=12)
+        tableau_b.initialiser_tableau(4, 4, nombre_processus=2)
+        assert tableau_a.grille == tableau_b.grille
+        assert sum(tableau_a.contient_mine(*coordonnees) for coordonnees in tableau_a.dictionnaire_cases) == nombre_mines
+
 def test_initialisation():
     tableau_test = Tableau()
 
@@ -402,6 +1155,29 @@ def test_obtenir_voisins():
     assert (tableau_test.obtenir_voisins(3, 3)) == [(2, 2), (2, 3), (2, 4), (3, 2), (3, 4), (4, 2), (4, 3), (4, 4)]
     assert (tableau_test.obtenir_voisins(1, 3)) == [(1, 2), (1, 4), (2, 2), (2, 3), (2, 4)]
     
+def test_obtenir_voisins_hors_tableau():
+
+    # une case de la bordure (hors du tableau) n'a pour voisines que les cases du tableau qui la touchent
+    tableau_test = Tableau()
+    assert (tableau_test.obtenir_voisins(0, 0)) == [(1, 1)]
+
+def test_table_voisins():
+
+    # tous les tableaux de même dimension partagent la même table
+    assert obtenir_table_voisins(5, 5) is obtenir_table_voisins(5, 5)
+    assert obtenir_table_voisins(5, 5) is not obtenir_table_voisins(5, 6)
+    assert obtenir_table_voisins(TAILLE_MAX_TABLE_VOISINS + 1, 1) is None
+
+    # la table donne les mêmes voisins que les déplacements, avec ou sans table
+    tableau_test = Tableau(4, 7)
+    for coordonnees in tableau_test.dictionnaire_cases:
+        indice = tableau_test.obtenir_indice(*coordonnees)
+        indices_voisins = list(tableau_test.obtenir_indices_voisins(indice))
+        assert [divmod(voisin, tableau_test.largeur) for voisin in indices_voisins] == \
+            tableau_test.obtenir_voisins(*coordonnees)
+        assert indices_voisins == [indice + deplacement for deplacement in tableau_test.deplacements_voisins
+                                   if not tableau_test.grille[indice + deplacement] & BIT_BORDURE]
+    
 def test_valider_coordonnees_a_devoiler():
 
     tableau_test = Tableau()
@@ -428,7 +1204,165 @@ def test_devoiler_case():
     tableau_test.devoiler_case(4, 4)
     assert tableau_test.dictionnaire_cases[(4, 4)].est_devoilee == True
 
+def test_devoiler_case_cascade():
+
+    # sans mine, un seul clic dévoile tout le tableau
+    tableau_test = Tableau(5, 5, 0)
+    cases_devoilees = tableau_test.devoiler_case(1, 1)
+    assert len(cases_devoilees) == len(set(cases_devoilees)) == 25
+    assert not tableau_test.contient_cases_a_devoiler()
+    assert tableau_test.devoiler_case(3, 3) == []
+
+    # la cascade s'arrête aux cases voisines d'une mine
+    tableau_test = Tableau(5, 5, 0)
+    tableau_test.initialiser_tableau()
+    tableau_test.dictionnaire_cases[(1, 5)].ajouter_mine()
+    for voisin in tableau_test.obtenir_voisins(1, 5):
+        tableau_test.dictionnaire_cases[voisin].ajouter_une_mine_voisine()
+    tableau_test.nombre_cases_sans_mine_a_devoiler -= 1
+    cases_devoilees = tableau_test.devoiler_case(5, 1)
+    assert len(cases_devoilees) == 24
+    assert tableau_test.obtenir_indice(1, 5) not in cases_devoilees
+    assert not tableau_test.contient_cases_a_devoiler()
+
+    # une très grande région vide ne cause pas de récursion
+    tableau_test = Tableau(400, 400, 0)
+    assert len(tableau_test.devoiler_case(200, 200)) == 400 * 400
+
+def test_devoiler_par_tranches():
+
+    # par tranches, on dévoile exactement les mêmes cases, et le compteur est à jour après chaque tranche
+    tableau_a = Tableau(60, 60, 300, graine=8)
+    tableau_b = Tableau(60, 60, 300, graine=8)
+    cases_devoilees = tableau_a.devoiler_case(30, 30)
+
+    tranches = []
+    for tranche in tableau_b.devoiler_par_tranches(30, 30, 16):
+        tranches.append(tranche)
+        assert tableau_b.nombre_cases_sans_mine_a_devoiler == \
+            tableau_b.nombre_cases - tableau_b.nombre_mines - sum(map(len, tranches))
+    assert len(tranches) > 1
+    assert sorted(sum(tranches, [])) == sorted(cases_devoilees)
+    assert tableau_a.grille == tableau_b.grille
+
+    # une case déjà dévoilée ne donne aucune tranche
+    assert list(tableau_b.devoiler_par_tranches(30, 30)) == []
+
     
+def test_premier_clic():
+
+    # rien n'est alloué avant le premier accès à la grille
+    tableau_test = Tableau(1000, 1000, 1000)
+    assert tableau_test._grille is None and not tableau_test.mines_placees
+
+    # la première case dévoilée et ses voisines ne sont jamais minées
+    for rangee_x, colonne_y in ((1, 1), (3, 3), (5, 2)):
+        tableau_test = Tableau(5, 5, 16)
+        assert tableau_test.basculer_drapeau(5, 5)
+        tableau_test.devoiler_case(rangee_x, colonne_y)
+        assert tableau_test.mines_placees
+        for coordonnees in [(rangee_x, colonne_y)] + tableau_test.obtenir_voisins(rangee_x, colonne_y):
+            assert not tableau_test.contient_mine(*coordonnees)
+        assert tableau_test.dictionnaire_cases[(rangee_x, colonne_y)].est_devoilee
+        assert sum(tableau_test.contient_mine(*coordonnees) for coordonnees in tableau_test.dictionnaire_cases) == 16
+        assert tableau_test.dictionnaire_cases[(5, 5)].a_drapeau
+
+    # si le tableau est trop dense, seule la première case est protégée
+    tableau_test = Tableau(3, 3, 8)
+    assert tableau_test.devoiler_case(2, 2) == [tableau_test.obtenir_indice(2, 2)]
+    assert not tableau_test.contient_cases_a_devoiler()
+
+def test_pregenerer():
+
+    # un tableau prégénéré devient identique à un tableau généré au premier clic
+    for nombre_mines, (rangee_x, colonne_y) in ((40, (5, 5)), (200, (1, 1)), (395, (10, 10)), (400, (3, 3))):
+        for graine in range(5):
+            tableau_a = Tableau(20, 20, nombre_mines, graine=graine)
+            tableau_a.pregenerer()
+            assert tableau_a.premier_clic_en_attente
+            tableau_a.devoiler_case(rangee_x, colonne_y)
+            assert not tableau_a.premier_clic_en_attente
+
+            tableau_b = Tableau(20, 20, nombre_mines, graine=graine)
+            tableau_b.devoiler_case(rangee_x, colonne_y)
+            assert tableau_a.grille == tableau_b.grille
+            assert tableau_a.nombre_cases_sans_mine_a_devoiler == tableau_b.nombre_cases_sans_mine_a_devoiler
+
+def test_basculer_drapeau():
+
+    tableau_test = Tableau(5, 5, 0)
+    assert tableau_test.basculer_drapeau(2, 2)
+    assert tableau_test.dictionnaire_cases[(2, 2)].a_drapeau
+    assert not tableau_test.basculer_drapeau(2, 2)
+    assert not tableau_test.dictionnaire_cases[(2, 2)].a_drapeau
+
+    # on ne peut pas mettre de drapeau sur une case dévoilée
+    tableau_test.devoiler_case(1, 1)
+    assert not tableau_test.basculer_drapeau(2, 2)
+    assert not tableau_test.dictionnaire_cases[(2, 2)].a_drapeau
+
+def test_evenements():
+    from evenements import BusEvenements
+
+    bus = BusEvenements()
+    actions = []
+    bus.abonner(actions.append)
+
+    tableau = Tableau(3, 3, 1, graine=2)
+    tableau.associer_evenements(bus)
+    assert actions == [[TableauReinitialise(tableau)]]
+
+    # un drapeau, puis un clic sur une case voisine d'une mine: une liste d'évènements par action
+    tableau.initialiser_tableau()
+    x_mine, y_mine = next(coordonnees for coordonnees, case in tableau.dictionnaire_cases.items() if case.est_minee)
+    indice_mine = tableau.obtenir_indice(x_mine, y_mine)
+    tableau.basculer_drapeau(x_mine, y_mine)
+    assert actions[-1] == [DrapeauBascule(indice_mine, True)]
+
+    tableau.devoiler_case(x_mine, y_mine)
+    assert actions[-1] == [PartiePerdue(indice_mine)]
+
+    # les autres cases sont dévoilées (une cascade est publiée d'un seul coup); la dernière termine la partie
+    for rangee_x, colonne_y in tableau.dictionnaire_cases:
+        if not tableau.dictionnaire_cases[rangee_x, colonne_y].est_minee:
+            tableau.devoiler_case(rangee_x, colonne_y)
+    assert actions[-1][-1] == PartieGagnee()
+    assert all(type(action[0]) is CasesDevoilees for action in actions[3:])
+    assert sum(len(action[0].indices) for action in actions[3:]) == 8
+
+    # sans abonné, rien n'est publié (et rien n'est alloué pour les évènements)
+    tableau = Tableau(50, 50, 0)
+    assert not tableau.evenements.abonnes and len(tableau.devoiler_case(1, 1)) == 2500
+
+def test_depuis_etat():
+
+    tableau = Tableau(20, 30, 80, graine=7)
+    tableau.devoiler_case(10, 15)
+    tableau.basculer_drapeau(1, 1)
+
+    # à partir des plans des cases, ou de la grille elle-même: le même tableau, qui peut être gagné
+    plans = [bytes(int(getattr(tableau.dictionnaire_cases[rangee_x, colonne_y], attribut))
+                   for rangee_x in range(1, 21) for colonne_y in range(1, 31))
+             for attribut in ('est_minee', 'est_devoilee', 'a_drapeau')]
+    for tableau_etat in (Tableau.depuis_etat(20, 30, 80, 7, mines=plans[0], devoilees=plans[1], drapeaux=plans[2]),
+                         Tableau.depuis_etat(20, 30, 80, 7, grille=bytearray(tableau.grille))):
+        assert tableau_etat.grille == tableau.grille and tableau_etat.mines_placees
+        assert tableau_etat.nombre_cases_sans_mine_a_devoiler == tableau.nombre_cases_sans_mine_a_devoiler
+        for coordonnees, case in tableau.dictionnaire_cases.items():
+            if not case.est_minee:
+                tableau_etat.devoiler_case(*coordonnees)
+        assert not tableau_etat.contient_cases_a_devoiler()
+
+    # sans cases dévoilées ni drapeaux
+    tableau_etat = Tableau.depuis_etat(3, 3, 1, 0, mines=bytes([0, 0, 0, 0, 1, 0, 0, 0, 0]))
+    assert tableau_etat.obtenir_case(1, 1).nombre_mines_voisines == 1 and tableau_etat.contient_mine(2, 2)
+    assert tableau_etat.nombre_cases_sans_mine_a_devoiler == 8
+
+    # le nombre de cases à dévoiler vient des mines placées, et non du nombre de mines reçu
+    tableau_etat = Tableau.depuis_etat(3, 3, 2, 0, mines=bytes([0, 0, 0, 0, 1, 0, 0, 0, 0]),
+                                       devoilees=bytes([1, 0, 0, 0, 0, 0, 0, 0, 0]))
+    assert tableau_etat.nombre_cases_sans_mine_a_devoiler == 7
+
 def test_case_contient_mine():
 
     tableau_test = Tableau()
@@ -453,16 +1387,30 @@ if __name__ == '__main__':
     # première tentative d'implémentation des méthodes initialiser_tableau et afficher_tableau.
     
     tableau_test = Tableau()
+    tableau_test.initialiser_tableau()
     print('\nTABLEAU:')
     tableau_test.afficher_tableau()
     print('\nSOLUTION:')
     tableau_test.afficher_solution()
 
     print('\nTests unitaires...')
+    test_construire_grille()
+    test_generer_region()
+    test_graine()
     test_initialisation()
+    test_initialisation_dense()
     test_valider_coordonnees()
     test_obtenir_voisins()
+    test_obtenir_voisins_hors_tableau()
+    test_table_voisins()
     test_valider_coordonnees_a_devoiler()
     test_devoiler_case()
+    test_devoiler_case_cascade()
+    test_devoiler_par_tranches()
+    test_premier_clic()
+    test_pregenerer()
+    test_basculer_drapeau()
+    test_evenements()
+    test_depuis_etat()
     test_case_contient_mine()
     print('Tests réussis!')
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+"""
+Module contenant la description de la classe TableauInfini. Un tableau infini n'a pas de dimensions: il est
+découpé en morceaux carrés qui sont générés au besoin à partir d'une graine, et seuls les morceaux récemment
+utilisés sont gardés en mémoire.
+
+Auteurs: Bruce Bouchard, Kevin Jobin, François Dufour
+"""
+
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from random import Random, getrandbits
+from case import VueCase, MASQUE_VOISINES, BIT_MINE, BIT_DEVOILEE, BIT_DRAPEAU, BIT_BORDURE
+from tableau import construire_grille
+
+# Nombre de dispositions de mines de morceaux gardées en cache (pour calculer les mines voisines aux frontières)
+NOMBRE_MAX_MINES_MORCEAUX = 64
+
+# Table de traduction qui ne garde que ce que le joueur a modifié dans un octet (dévoilement et drapeau)
+TABLE_MODIFICATIONS = bytes(octet & (BIT_DEVOILEE | BIT_DRAPEAU) for octet in range(256))
+
+
+@lru_cache(maxsize=NOMBRE_MAX_MINES_MORCEAUX)
+def generer_mines_morceau(graine, morceau_x, morceau_y, taille_morceau, densite):
+    """
+    Génère la disposition des mines d'un morceau. Le résultat ne dépend que des arguments: le même morceau
+    d'un tableau donne toujours les mêmes mines, et on n'a donc jamais besoin de les sauvegarder.
+
+    Args:
+        graine (int): La graine du tableau
+        morceau_x (int): Numéro de la rangée du morceau
+        morceau_y (int): Numéro de la colonne du morceau
+        taille_morceau (int): Nombre de rangées (et de colonnes) d'un morceau
+        densite (float): Probabilité qu'une case contienne une mine
+
+    Returns:
+        bytes: Une valeur par case du morceau, rangée par rangée (1 si la case est minée, 0 sinon)
+    """
+    generateur = Random(f'{graine}:{morceau_x}:{morceau_y}')
+    aleatoire = generateur.random
+    return bytes(aleatoire() < densite for _ in range(taille_morceau * taille_morceau))
+
+
+class TableauInfini:
+    """
+    Tableau du jeu de démineur sans dimensions, découpé en morceaux de taille_morceau x taille_morceau cases.
+    Les coordonnées (x, y) des cases sont des entiers quelconques (négatifs inclus).
+
+    Chaque morceau a sa propre grille compacte, avec la même disposition que celle d'un Tableau (voir
+    Tableau.grille): la bordure de la grille correspond aux cases des morceaux voisins. Les mines d'un morceau
+    sont générées à partir de la graine, et le nombre de mines voisines des cases de sa frontière est calculé
+    à la création du morceau à partir des mines des morceaux voisins (qui n'ont pas besoin d'être créés).
+
+    Les morceaux sont gardés dans une cache LRU. Lorsqu'elle est pleine, le morceau le moins récemment
+    utilisé en est retiré: s'il n'a jamais été modifié, on l'oublie simplement (il sera regénéré), sinon on
+    l'écrit sur le disque, d'où il sera relu au besoin. La mémoire utilisée dépend donc du nombre de morceaux
+    en cache, et non de l'étendue du tableau.
+
+    Attributes:
+        densite (float): Probabilité qu'une case contienne une mine
+        graine (int): La graine à partir de laquelle les mines sont générées
+        taille_morceau (int): Nombre de rangées (et de colonnes) d'un morceau
+        largeur (int): Nombre d'octets d'une rangée de la grille d'un morceau (taille_morceau + 2)
+        deplacements_voisins (tuple): Les huit déplacements (en indices de la grille) vers les cases voisines
+        capacite (int): Nombre maximal de morceaux gardés en mémoire
+        dossier (str): Dossier où sont écrits les morceaux modifiés retirés de la mémoire
+        morceaux (OrderedDict): Les grilles des morceaux en mémoire, du moins au plus récemment utilisé,
+                                par coordonnées (rangée, colonne) de morceau
+        morceaux_modifies (set): Coordonnées des morceaux en mémoire modifiés depuis leur chargement
+        limite_cascade (int): Nombre de cases après lequel un dévoilement en cascade s'arrête (à la frontière
+                              d'un morceau). Sous une densité d'environ 6 %, une cascade peut être infinie.
+        frontiere_cascade (list): Coordonnées des cases où la dernière cascade interrompue s'est arrêtée, qui
+                                  restent à dévoiler (voir continuer_cascade)
+        statistiques (dict): Nombre de morceaux générés, écrits sur le disque et relus du disque
+    """
+
+    def __init__(self, densite=0.15, graine=None, taille_morceau=64, capacite=256, dossier=None,
+                 limite_cascade=1000000):
+        """
+        Initialisation d'un tableau infini. Aucun morceau n'est créé avant d'être utilisé.
+
+        Args:
+            densite (float): Probabilité qu'une case contienne une mine (par défaut, 0.15)
+            graine (int): La graine du tableau (par défaut, une graine choisie au hasard)
+            taille_morceau (int): Nombre de rangées (et de colonnes) d'un morceau (par défaut, 64)
+            capacite (int): Nombre maximal de morceaux gardés en mémoire (par défaut, 256)
+            dossier (str): Dossier où écrire les morceaux retirés de la mémoire (par défaut, un dossier
+                           temporaire qui est supprimé par la méthode fermer)
+            limite_cascade (int): Nombre de cases après lequel un dévoilement en cascade s'arrête
+        """
+        self.densite = densite
+        self.graine = getrandbits(64) if graine is None else graine
+        self.taille_morceau = taille_morceau
+        self.largeur = taille_morceau + 2
+        self.deplacements_voisins = (-self.largeur - 1, -self.largeur, -self.largeur + 1, -1,
+                                     1, self.largeur - 1, self.largeur, self.largeur + 1)
+        self.capacite = max(capacite, 1)
+        self.limite_cascade = limite_cascade
+        self.frontiere_cascade = []
+
+        # Dossier des morceaux écrits sur le disque
+        self.dossier_temporaire = dossier is None
+        self.dossier = tempfile.mkdtemp(prefix='demineur_') if dossier is None else dossier
+        os.makedirs(self.dossier, exist_ok=True)
+
+        self.morceaux = OrderedDict()
+        self.morceaux_modifies = set()
+        self.statistiques = {'generes': 0, 'ecrits': 0, 'relus': 0}
+
+    def obtenir_position(self, rangee_x, colonne_y):
+        """
+        Trouve le morceau qui contient une case et la position de la case dans la grille de ce morceau.
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+
+        Returns:
+            tuple: Les coordonnées (rangée, colonne) du morceau et l'indice de la case dans sa grille
+        """
+        morceau_x, locale_x = divmod(rangee_x, self.taille_morceau)
+        morceau_y, locale_y = divmod(colonne_y, self.taille_morceau)
+        return (morceau_x, morceau_y), (locale_x + 1) * self.largeur + locale_y + 1
+
+    def chemin_morceau(self, coordonnees_morceau):
+        """
+        Retourne le chemin du fichier dans lequel un morceau est écrit lorsqu'il est retiré de la mémoire.
+
+        Args:
+            coordonnees_morceau (tuple): Les coordonnées (rangée, colonne) du morceau
+
+        Returns:
+            str: Le chemin du fichier du morceau
+        """
+        return os.path.join(self.dossier, '{}_{}.bin'.format(*coordonnees_morceau))
+
+    def generer_morceau(self, coordonnees_morceau):
+        """
+        Génère la grille d'un morceau: ses mines, ainsi que celles de la frontière des huit morceaux voisins,
+        sont placées dans une grille de mines, à partir de laquelle construire_grille calcule le nombre de
+        mines voisines de toutes les cases.
+
+        Args:
+            coordonnees_morceau (tuple): Les coordonnées (rangée, colonne) du morceau
+
+        Returns:
+            bytearray: La grille du morceau, dont aucune case n'est dévoilée
+        """
+        taille = self.taille_morceau
+        largeur = self.largeur
+        morceau_x, morceau_y = coordonnees_morceau
+        mines = bytearray(largeur * largeur)
+
+        # pour chaque morceau voisin (et le morceau lui-même), on copie les mines qui touchent le morceau
+        for decalage_x in (-1, 0, 1):
+            for decalage_y in (-1, 0, 1):
+                mines_voisin = generer_mines_morceau(self.graine, morceau_x + decalage_x, morceau_y + decalage_y,
+                                                     taille, self.densite)
+
+                # rangées et colonnes (de la grille du morceau) couvertes par ce voisin
+                rangees = range(taille) if decalage_x == 0 else ([taille - 1] if decalage_x < 0 else [0])
+                colonnes = range(taille) if decalage_y == 0 else ([taille - 1] if decalage_y < 0 else [0])
+
+                for rangee in rangees:
+                    rangee_grille = rangee + 1 + decalage_x * taille
+                    debut_grille = rangee_grille * largeur + colonnes[0] + 1 + decalage_y * taille
+                    debut_voisin = rangee * taille + colonnes[0]
+                    mines[debut_grille:debut_grille + len(colonnes)] = \
+                        mines_voisin[debut_voisin:debut_voisin + len(colonnes)]
+
+        self.statistiques['generes'] += 1
+        return construire_grille(mines, largeur)
+
+    def obtenir_morceau(self, coordonnees_morceau):
+        """
+        Retourne la grille d'un morceau, en la relisant du disque ou en la générant si elle n'est pas en
+        mémoire. Le morceau devient le plus récemment utilisé, et le moins récemment utilisé est retiré de
+        la mémoire si la cache est pleine.
+
+        Args:
+            coordonnees_morceau (tuple): Les coordonnées (rangée, colonne) du morceau
+
+        Returns:
+            bytearray: La grille du morceau
+        """
+        grille = self.morceaux.get(coordonnees_morceau)
+
+        if grille is not None:
+            self.morceaux.move_to_end(coordonnees_morceau)
+            return grille
+
+        chemin = self.chemin_morceau(coordonnees_morceau)
+        if os.path.exists(chemin):
+            with open(chemin, 'rb') as fichier:
+                grille = bytearray(fichier.read())
+            self.statistiques['relus'] += 1
+        else:
+            grille = self.generer_morceau(coordonnees_morceau)
+
+        self.morceaux[coordonnees_morceau] = grille
+
+        while len(self.morceaux) > self.capacite:
+            self.retirer_morceau(next(iter(self.morceaux)))
+
+        return grille
+
+    def retirer_morceau(self, coordonnees_morceau):
+        """
+        Retire un morceau de la mémoire. Le morceau est écrit sur le disque s'il a été modifié; sinon, il
+        pourra être regénéré à partir de la graine (ou relu du disque, s'il y avait déjà été écrit).
+
+        Args:
+            coordonnees_morceau (tuple): Les coordonnées (rangée, colonne) du morceau
+        """
+        grille = self.morceaux.pop(coordonnees_morceau)
+
+        if coordonnees_morceau in self.morceaux_modifies:
+            self.morceaux_modifies.discard(coordonnees_morceau)
+            with open(self.chemin_morceau(coordonnees_morceau), 'wb') as fichier:
+                fichier.write(grille)
+            self.statistiques['ecrits'] += 1
+
+    def obtenir_case(self, rangee_x, colonne_y):
+        """
+        Récupère une case à partir de ses numéros de ligne et de colonne. La vue retournée n'est valide que
+        tant que le morceau de la case est en mémoire.
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+
+        Returns:
+            VueCase: Une vue sur la case
+        """
+        coordonnees_morceau, indice = self.obtenir_position(rangee_x, colonne_y)
+        return VueCase(self.obtenir_morceau(coordonnees_morceau), indice)
+
+    def contient_mine(self, rangee_x, colonne_y):
+        """
+        Méthode qui vérifie si la case dont les coordonnées sont reçues en argument contient une mine.
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+
+        Returns:
+            bool: True si la case contient une mine, False autrement.
+        """
+        coordonnees_morceau, indice = self.obtenir_position(rangee_x, colonne_y)
+        return bool(self.obtenir_morceau(coordonnees_morceau)[indice] & BIT_MINE)
+
+    def basculer_drapeau(self, rangee_x, colonne_y):
+        """
+        Méthode qui pose un drapeau sur une case non dévoilée, ou qui l'enlève s'il y en avait déjà un.
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case
+            colonne_y (int): Numéro de la colonne de la case
+
+        Returns:
+            bool: True si la case a maintenant un drapeau, False autrement.
+        """
+        coordonnees_morceau, indice = self.obtenir_position(rangee_x, colonne_y)
+        grille = self.obtenir_morceau(coordonnees_morceau)
+
+        if grille[indice] & BIT_DEVOILEE:
+            return False
+
+        grille[indice] ^= BIT_DRAPEAU
+        self.morceaux_modifies.add(coordonnees_morceau)
+        return bool(grille[indice] & BIT_DRAPEAU)
+
+    def devoiler_case(self, rangee_x, colonne_y):
+        """
+        Méthode qui dévoile le contenu d'une case et, si elle n'est voisine d'aucune mine, ses voisines en
+        cascade. La cascade est faite morceau par morceau: dans un morceau, elle suit les indices de sa grille
+        comme Tableau.devoiler_case, et les cases atteintes dans la bordure sont mises en attente pour le
+        morceau voisin. Si la cascade dépasse limite_cascade cases, elle s'arrête entre deux morceaux: les cases
+        en attente restent cachées, et sont gardées dans frontiere_cascade pour être dévoilées plus tard (voir
+        continuer_cascade).
+
+        Args:
+            rangee_x (int) : Numéro de la rangée de la case à dévoiler
+            colonne_y (int): Numéro de la colonne de la case à dévoiler
+
+        Returns:
+            list: Les coordonnées (x, y) des cases nouvellement dévoilées. La liste est vide si la case contient
+                  une mine ou si elle était déjà dévoilée.
+        """
+        return self.poursuivre_cascade([(rangee_x, colonne_y)])
+
+    def continuer_cascade(self):
+        """
+        Méthode qui reprend les cascades interrompues par limite_cascade, à partir des cases de leur frontière.
+        La reprise est elle-même limitée: on l'appelle jusqu'à ce que frontiere_cascade soit vide pour obtenir
+        le même tableau qu'une cascade sans limite.
+
+        Returns:
+            list: Les coordonnées (x, y) des cases nouvellement dévoilées (vide s'il n'y avait rien à reprendre)
+        """
+        cases_en_attente, self.frontiere_cascade = self.frontiere_cascade, []
+        return self.poursuivre_cascade(cases_en_attente)
+
+    def poursuivre_cascade(self, cases_en_attente):
+        """
+        Dévoile des cases et leurs voisines en cascade (voir devoiler_case), jusqu'à limite_cascade cases. Les
+        cases qui restent en attente lorsque la limite est atteinte sont ajoutées à frontiere_cascade.
+
+        Args:
+            cases_en_attente (list): Les coordonnées (x, y) des cases à dévoiler (la liste est modifiée)
+
+        Returns:
+            list: Les coordonnées (x, y) des cases nouvellement dévoilées
+        """
+        taille = self.taille_morceau
+        largeur = self.largeur
+        voisinage = self.deplacements_voisins
+
+        cases_devoilees = []
+
+        while cases_en_attente and len(cases_devoilees) < self.limite_cascade:
+            rangee_x, colonne_y = cases_en_attente.pop()
+            coordonnees_morceau, indice = self.obtenir_position(rangee_x, colonne_y)
+            grille = self.obtenir_morceau(coordonnees_morceau)
+            etat = grille[indice]
+
+            # on ne dévoile pas une mine, ni une case déjà dévoilée
+            if etat & (BIT_MINE | BIT_DEVOILEE):
+                continue
+
+            grille[indice] = etat | BIT_DEVOILEE
+            cases_devoilees.append((rangee_x, colonne_y))
+            self.morceaux_modifies.add(coordonnees_morceau)
+
+            if etat & MASQUE_VOISINES:
+                continue
+
+            # coordonnées de la case qui correspond à l'indice 0 de la grille du morceau
+            origine_x = coordonnees_morceau[0] * taille - 1
+            origine_y = coordonnees_morceau[1] * taille - 1
+
+            # effet cascade à l'intérieur du morceau
+            cases_a_explorer = [indice]
+            while cases_a_explorer:
+                indice = cases_a_explorer.pop()
+
+                for deplacement in voisinage:
+                    indice_voisin = indice + deplacement
+                    etat = grille[indice_voisin]
+
+                    if etat & BIT_BORDURE:
+                        # la case voisine appartient à un autre morceau
+                        voisin_x, voisin_y = divmod(indice_voisin, largeur)
+                        cases_en_attente.append((origine_x + voisin_x, origine_y + voisin_y))
+
+                    elif not etat & BIT_DEVOILEE:
+                        grille[indice_voisin] = etat | BIT_DEVOILEE
+                        voisin_x, voisin_y = divmod(indice_voisin, largeur)
+                        cases_devoilees.append((origine_x + voisin_x, origine_y + voisin_y))
+
+                        if not etat & MASQUE_VOISINES:
+                            cases_a_explorer.append(indice_voisin)
+
+        self.frontiere_cascade.extend(cases_en_attente)
+        return cases_devoilees
+
+    def a_ete_modifie(self, coordonnees_morceau):
+        """
+        Indique si le joueur a déjà modifié un morceau (dévoilement ou drapeau), qu'il soit en mémoire ou sur le
+        disque.
+
+        Args:
+            coordonnees_morceau (tuple): Les coordonnées (rangée, colonne) du morceau
+
+        Returns:
+            bool: True si le morceau a été modifié, False autrement.
+        """
+        grille = self.morceaux.get(coordonnees_morceau)
+        if grille is None:
+            return os.path.exists(self.chemin_morceau(coordonnees_morceau))
+        return bool(grille.translate(TABLE_MODIFICATIONS).strip(b'\x00'))
+
+    def fermer(self):
+        """
+        Libère les morceaux en mémoire et supprime le dossier des morceaux, s'il a été créé par le tableau.
+        """
+        self.morceaux.clear()
+        self.morceaux_modifies.clear()
+        if self.dossier_temporaire:
+            shutil.rmtree(self.dossier, ignore_errors=True)
+
+
+#### Tests unitaires ###
+
+def test_morceaux_reproductibles():
+
+    # deux tableaux de même graine ont les mêmes mines, et une case a autant de mines voisines qu'elle en a
+    # réellement, même à la frontière d'un morceau
+    tableau_a = TableauInfini(densite=0.3, graine=7, taille_morceau=4, capacite=2)
+    tableau_b = TableauInfini(densite=0.3, graine=7, taille_morceau=4, capacite=50)
+    for rangee_x in range(-6, 6):
+        for colonne_y in range(-6, 6):
+            assert tableau_a.contient_mine(rangee_x, colonne_y) == tableau_b.contient_mine(rangee_x, colonne_y)
+            mines_voisines = sum(tableau_b.contient_mine(rangee_x + i, colonne_y + j)
+                                 for i in (-1, 0, 1) for j in (-1, 0, 1) if (i, j) != (0, 0))
+            assert tableau_a.obtenir_case(rangee_x, colonne_y).nombre_mines_voisines == mines_voisines
+    assert len(tableau_a.morceaux) == 2
+    tableau_a.fermer()
+    tableau_b.fermer()
+
+def test_cascade_entre_morceaux():
+
+    # sans mine, la cascade traverse les morceaux jusqu'à la limite, en s'arrêtant entre deux morceaux
+    tableau_test = TableauInfini(densite=0, taille_morceau=8, capacite=4, limite_cascade=500)
+    cases_devoilees = tableau_test.devoiler_case(0, 0)
+    assert 500 <= len(cases_devoilees) < 500 + 64
+    assert len(set(cases_devoilees)) == len(cases_devoilees)
+    assert tableau_test.devoiler_case(0, 0) == [] and tableau_test.frontiere_cascade
+
+    # les morceaux modifiés retirés de la mémoire sont écrits sur le disque, puis relus
+    assert tableau_test.statistiques['ecrits'] > 0
+    for rangee_x, colonne_y in cases_devoilees:
+        assert tableau_test.obtenir_case(rangee_x, colonne_y).est_devoilee
+    assert tableau_test.statistiques['relus'] > 0
+    tableau_test.fermer()
+    assert not os.path.exists(tableau_test.dossier)
+
+def test_continuer_cascade():
+
+    # une cascade interrompue, reprise jusqu'au bout, donne le même tableau qu'une cascade sans limite (même si
+    # des morceaux sont écrits sur le disque entre les reprises)
+    tableau_complet = TableauInfini(densite=0.12, graine=13, taille_morceau=8, capacite=10 ** 4)
+    cases_attendues = tableau_complet.devoiler_case(1, 0)
+    assert len(cases_attendues) > 5000 and not tableau_complet.frontiere_cascade
+
+    tableau_test = TableauInfini(densite=0.12, graine=13, taille_morceau=8, capacite=4, limite_cascade=300)
+    cases_devoilees = tableau_test.devoiler_case(1, 0)
+    assert len(cases_devoilees) < 300 + 64 and tableau_test.frontiere_cascade
+    nombre_reprises = 0
+    while tableau_test.frontiere_cascade:
+        cases_devoilees += tableau_test.continuer_cascade()
+        nombre_reprises += 1
+    assert nombre_reprises > 10 and tableau_test.continuer_cascade() == []
+    assert sorted(cases_devoilees) == sorted(cases_attendues)
+    for coordonnees_morceau, grille in tableau_complet.morceaux.items():
+        assert tableau_test.obtenir_morceau(coordonnees_morceau) == grille
+    tableau_complet.fermer()
+    tableau_test.fermer()
+
+def test_drapeau_infini():
+
+    tableau_test = TableauInfini(densite=0, taille_morceau=4, capacite=1)
+    assert not tableau_test.a_ete_modifie((250, 250))
+    assert tableau_test.basculer_drapeau(1000, 1000)
+    tableau_test.obtenir_morceau((0, 0))
+    assert tableau_test.a_ete_modifie((250, 250))
+    assert tableau_test.obtenir_case(1000, 1000).a_drapeau
+    tableau_test.fermer()
+
+
+if __name__ == '__main__':
+
+    print('Tests unitaires...')
+    test_morceaux_reproductibles()
+    test_cascade_entre_morceaux()
+    test_continuer_cascade()
+    test_drapeau_infini()
+    print('Tests réussis!')